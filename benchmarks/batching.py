@@ -0,0 +1,52 @@
+"""
+Benchmarks the prompts/sec of the mock vLLM pipeline with and without micro-batching on CPU. A fixed, serialized
+overhead per generate call stands in for the engine scheduling cost that batching amortizes.
+
+    python -m benchmarks.batching --prompts 256 --threads 32 --batch-windows 0 0.01
+"""
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from einstein.llms.vllm_llm import vLLMPipeline
+
+
+def run(batch_window: float, num_prompts: int, num_threads: int, call_overhead: float) -> float:
+    """Returns the prompts/sec of the mock pipeline with the given batch window."""
+    engine_lock = threading.Lock()
+    pipeline = vLLMPipeline(
+        model_id="mock",
+        llm_max_allowed_memory_in_gb=0,
+        mock=True,
+        batch_window=batch_window,
+    )
+    generate_batch = pipeline.generate_batch
+
+    def slow_generate_batch(prompts, sampling_params=None):
+        with engine_lock:
+            time.sleep(call_overhead)
+        return generate_batch(prompts, sampling_params)
+
+    pipeline.generate_batch = slow_generate_batch
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        list(executor.map(lambda i: pipeline(f"prompt {i}", max_tokens=16), range(num_prompts)))
+    return num_prompts / (time.time() - t0)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--call-overhead", type=float, default=0.005, help="Seconds of serialized overhead per call.")
+    parser.add_argument("--batch-windows", type=float, nargs="+", default=[0.0, 0.01])
+    args = parser.parse_args(args)
+
+    for batch_window in args.batch_windows:
+        prompts_per_second = run(batch_window, args.prompts, args.threads, args.call_overhead)
+        print(f"batch_window={batch_window}: {prompts_per_second:.1f} prompts/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmarks the answer extractor against the regexes it replaces, on typical and adversarial completions.
+
+    python -m benchmarks.extraction
+"""
+import re
+import time
+import random
+from typing import Callable, List
+from einstein.rewards.extraction import answer_text, tokenize_numbers
+from benchmarks.synthetic import make_completion
+
+ORIGINAL_FINAL_ANSWER = re.compile(r"the final answer is\:?\s*(.+)", re.IGNORECASE)
+ORIGINAL_NUMERIC = re.compile(r"[-+]?\d*\.\d+|\d+")
+
+
+def original_extract(completion: str) -> List[str]:
+    match = ORIGINAL_FINAL_ANSWER.search(completion)
+    return ORIGINAL_NUMERIC.findall(match.group(1) if match else completion)
+
+
+def extract(completion: str) -> List[str]:
+    return tokenize_numbers(answer_text(completion))
+
+
+def cases():
+    rng = random.Random(0)
+    size = 2**20
+    return {
+        "typical 4KB": [make_completion(rng, 4096) for _ in range(256)],
+        "1MB of numbers": ["1.5 -2 +3.25 " * (size // 13)],
+        "1MB of signed digits": ["+" + "1" * size],
+        "1MB after marker": ["the final answer is" + "\n" * size],
+        "1MB of prose": ["so we simplify both sides " * (size // 26)],
+    }
+
+
+def timeit(fn: Callable[[str], List[str]], completions: List[str], repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for completion in completions:
+            fn(completion)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    print(f"{'case':>22}  {'regexes ms':>10}  {'extractor ms':>12}  {'speedup':>8}")
+    for name, completions in cases().items():
+        original_time = timeit(original_extract, completions)
+        extractor_time = timeit(extract, completions)
+        print(
+            f"{name:>22}  {original_time * 1e3:>10.2f}  {extractor_time * 1e3:>12.2f}  {original_time / extractor_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
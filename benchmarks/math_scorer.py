@@ -0,0 +1,58 @@
+"""
+Benchmarks the batch math scorer against scoring each completion separately, on long completions with and without
+a final answer statement.
+
+    python -m benchmarks.math_scorer --completions 256 --size 4096
+"""
+import time
+import random
+import argparse
+from typing import List, Tuple
+from einstein.rewards.advanced_math import AdvancedMathModel, BatchMathScorer
+
+WORDS = "we substitute the value into the equation and simplify both sides so that x =".split()
+NUMBERS = ["3.5", "-12", "+7", "0.25", "1000", "42"]
+REFERENCE = "The answer is 42 and 3.5"
+
+
+def make_completions(num_completions: int, size: int, final_answer: bool, seed: int = 0) -> List[str]:
+    """Returns completions of about size characters, mostly words with a number every ten tokens."""
+    rng = random.Random(seed)
+    completions = []
+    for _ in range(num_completions):
+        tokens = [rng.choice(NUMBERS) if rng.random() < 0.1 else rng.choice(WORDS) for _ in range(size)]
+        text = " ".join(tokens)[: size - 40]
+        completions.append(text + (f" The final answer is {rng.randint(0, 100)}" if final_answer else ""))
+    return completions
+
+
+def run(completions: List[str], reference: str = REFERENCE) -> Tuple[float, float]:
+    """Returns the seconds taken to score the completions one by one and as a batch, which must agree."""
+    t0 = time.perf_counter()
+    loop_scores = [AdvancedMathModel.math_score(reference, completion) for completion in completions]
+    loop_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch_scores = BatchMathScorer(reference).score(completions)
+    batch_time = time.perf_counter() - t0
+
+    assert batch_scores == loop_scores, "The batch scorer disagrees with the per-completion scores."
+    return loop_time, batch_time
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--completions", type=int, default=256)
+    parser.add_argument("--size", type=int, default=4096, help="Characters per completion.")
+    args = parser.parse_args(args)
+
+    for final_answer in (True, False):
+        loop_time, batch_time = run(make_completions(args.completions, args.size, final_answer))
+        print(
+            f"final answer={final_answer}: per completion {loop_time * 1e3:.1f} ms | batch {batch_time * 1e3:.1f} ms"
+            f" | speedup {loop_time / batch_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
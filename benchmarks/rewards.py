@@ -0,0 +1,170 @@
+"""
+Benchmarks the reward pipeline on synthetic miner populations.
+
+Each case times RewardResult end to end and each reward model separately, and reports the throughput in
+completions/sec and the peak memory allocated while rewarding. Results can be saved as a baseline and later runs
+compared against it, failing when a case is slower or uses more memory than the baseline by more than a threshold.
+
+    python -m benchmarks.rewards --miners 50 256 --completion-length 1024 4096 --duplicate-ratio 0 0.5
+    python -m benchmarks.rewards --save benchmarks/baseline.json
+    python -m benchmarks.rewards --compare benchmarks/baseline.json --threshold 0.2
+"""
+import sys
+import json
+import time
+import argparse
+import itertools
+import statistics
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List
+from einstein.rewards import RewardPipeline, RewardResult, RewardExecutor, RewardCache
+from benchmarks.synthetic import make_agent, make_response_event
+
+
+@dataclass
+class BenchmarkResult:
+    num_miners: int
+    completion_length: int
+    duplicate_ratio: float
+    total_time: float
+    completions_per_sec: float
+    peak_memory_mb: float
+    model_times: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return f"miners={self.num_miners} length={self.completion_length} duplicates={self.duplicate_ratio}"
+
+
+def run_case(
+    pipeline: RewardPipeline,
+    num_miners: int,
+    completion_length: int,
+    duplicate_ratio: float,
+    repeats: int = 5,
+) -> BenchmarkResult:
+    """Times the median of `repeats` RewardResults on the same synthetic responses, after a warm-up run."""
+    response_event = make_response_event(num_miners, completion_length, duplicate_ratio)
+    agent = make_agent()
+
+    def reward() -> RewardResult:
+        return RewardResult(pipeline, agent=agent, response_event=response_event, device="cpu")
+
+    reward()
+    times = []
+    model_times = defaultdict(list)
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = reward()
+        times.append(time.perf_counter() - t0)
+        for event in result.reward_events + result.penalty_events:
+            model_times[event.model_name].append(event.batch_time)
+
+    tracemalloc.start()
+    reward()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_time = statistics.median(times)
+    return BenchmarkResult(
+        num_miners=num_miners,
+        completion_length=completion_length,
+        duplicate_ratio=duplicate_ratio,
+        total_time=total_time,
+        completions_per_sec=num_miners / total_time,
+        peak_memory_mb=peak_memory / 2**20,
+        model_times={name: statistics.median(values) for name, values in model_times.items()},
+    )
+
+
+def compare(results: List[BenchmarkResult], baseline: List[dict], threshold: float) -> List[str]:
+    """Returns a description of each case that is slower, or uses more memory, than its baseline by more than
+    `threshold` (relative)."""
+    baseline_by_name = {BenchmarkResult(**case).name: BenchmarkResult(**case) for case in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline_by_name.get(result.name)
+        if reference is None:
+            continue
+        for metric in ("total_time", "peak_memory_mb"):
+            value, reference_value = getattr(result, metric), getattr(reference, metric)
+            if value > reference_value * (1 + threshold):
+                regressions.append(
+                    f"{result.name}: {metric} {value:.4g} vs {reference_value:.4g} ({value / reference_value - 1:+.0%})"
+                )
+    return regressions
+
+
+def format_table(results: List[BenchmarkResult]) -> str:
+    models = sorted({name for result in results for name in result.model_times})
+    header = ["miners", "length", "duplicates", "total ms", "completions/s", "peak MB"] + [f"{m} ms" for m in models]
+    rows = [
+        [
+            str(result.num_miners),
+            str(result.completion_length),
+            f"{result.duplicate_ratio:.2f}",
+            f"{result.total_time * 1e3:.2f}",
+            f"{result.completions_per_sec:,.0f}",
+            f"{result.peak_memory_mb:.2f}",
+        ]
+        + [f"{result.model_times.get(m, float('nan')) * 1e3:.2f}" for m in models]
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows)
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--miners", type=int, nargs="+", default=[50, 256])
+    parser.add_argument("--completion-length", type=int, nargs="+", default=[1024, 4096])
+    parser.add_argument("--duplicate-ratio", type=float, nargs="+", default=[0.0, 0.5])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--reward-workers", type=int, default=0, help="Worker processes of the reward executor.")
+    parser.add_argument("--reward-model-threads", type=int, default=1, help="Threads applying the models.")
+    parser.add_argument(
+        "--reward-cache-size", type=int, default=0, help="Size of the reward cache. Repeats are then served by it."
+    )
+    parser.add_argument("--save", type=str, help="Saves the results as a JSON baseline.")
+    parser.add_argument("--compare", type=str, help="Compares the results with a JSON baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args(args)
+
+    pipeline = RewardPipeline(
+        selected_tasks=["math"],
+        device="cpu",
+        executor=RewardExecutor(max_workers=args.reward_workers) if args.reward_workers > 0 else None,
+        model_executor=(
+            ThreadPoolExecutor(max_workers=args.reward_model_threads) if args.reward_model_threads > 1 else None
+        ),
+        cache=RewardCache(maxsize=args.reward_cache_size) if args.reward_cache_size > 0 else None,
+    )
+
+    results = [
+        run_case(pipeline, num_miners, completion_length, duplicate_ratio, repeats=args.repeats)
+        for num_miners, completion_length, duplicate_ratio in itertools.product(
+            args.miners, args.completion_length, args.duplicate_ratio
+        )
+    ]
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions against baseline:\n" + "\n".join(regressions))
+            return 1
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Benchmarks the sparse moving average update of the validator scores against the dense update it replaces.
+
+    python -m benchmarks.scores --uids 256 1024 4096 --sample-size 50
+"""
+import time
+import argparse
+import torch
+from einstein.utils.scores import MovingAverageScores
+
+ALPHA = 0.05
+DECAY = 0.001
+
+
+def dense_update(scores: torch.FloatTensor, rewards: torch.FloatTensor, uids: list) -> torch.FloatTensor:
+    """The original update. Both updates include the formatting of their debug log lines, which is done whether or
+    not debug logging is enabled."""
+    step_rewards = scores.scatter(0, torch.tensor(uids.tolist()), rewards)
+    f"Scattered rewards: {rewards}"
+    scores = ALPHA * step_rewards + (1 - ALPHA) * scores
+    scores = (scores - DECAY).clamp(min=0)
+    f"Updated moving avg scores: {scores}"
+    return scores
+
+
+def sparse_update(scores: MovingAverageScores, rewards: torch.FloatTensor, uids: list) -> MovingAverageScores:
+    updated = scores.update(rewards, uids)
+    f"Updated moving avg scores: {dict(zip(uids.tolist(), (round(score, 4) for score in updated.tolist())))}"
+    return scores
+
+
+def run(num_uids: int, sample_size: int, steps: int):
+    generator = torch.Generator().manual_seed(0)
+    samples = [
+        (torch.rand(sample_size, generator=generator), torch.randperm(num_uids, generator=generator)[:sample_size])
+        for _ in range(steps)
+    ]
+
+    dense = torch.zeros(num_uids)
+    t0 = time.perf_counter()
+    for rewards, uids in samples:
+        dense = dense_update(dense, rewards, uids)
+    dense_time = (time.perf_counter() - t0) / steps
+
+    sparse = MovingAverageScores(torch.zeros(num_uids), alpha=ALPHA, decay=DECAY)
+    t0 = time.perf_counter()
+    for rewards, uids in samples:
+        sparse = sparse_update(sparse, rewards, uids)
+    sparse_time = (time.perf_counter() - t0) / steps
+
+    t0 = time.perf_counter()
+    scores = sparse.materialize()
+    materialize_time = time.perf_counter() - t0
+
+    assert torch.allclose(scores, dense, atol=1e-5)
+    return dense_time, sparse_time, materialize_time
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uids", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--sample-size", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=1000)
+    args = parser.parse_args(args)
+
+    print(f"{'uids':>6}  {'dense us/step':>13}  {'sparse us/step':>14}  {'speedup':>8}  {'materialize us':>14}")
+    for num_uids in args.uids:
+        dense_time, sparse_time, materialize_time = run(num_uids, args.sample_size, args.steps)
+        print(
+            f"{num_uids:>6}  {dense_time * 1e6:>13.1f}  {sparse_time * 1e6:>14.1f}  {dense_time / sparse_time:>7.1f}x  {materialize_time * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
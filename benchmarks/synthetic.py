@@ -0,0 +1,81 @@
+import random
+import torch
+from types import SimpleNamespace
+from typing import List
+from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
+from einstein.protocol import StreamCoreSynapse
+from einstein.tasks.math import MathTask
+
+WORDS = "we substitute the value into the equation and simplify both sides so that x = y + z".split()
+NUMBERS = ["3.5", "-12", "+7", "0.25", "1000", "42", "1/2", "2*0.25"]
+REFERENCE = "42"
+
+
+def make_completion(rng: random.Random, length: int) -> str:
+    """Random reasoning text of about `length` characters, usually ending with a final answer."""
+    tokens = []
+    size = 0
+    while size < length:
+        token = rng.choice(NUMBERS) if rng.random() < 0.1 else rng.choice(WORDS)
+        tokens.append(token)
+        size += len(token) + 1
+    text = " ".join(tokens)[:length]
+    if rng.random() < 0.8:
+        text += f" The final answer is {rng.choice(['42', '41', '0.5', '6*7', '1/2'])}"
+    return text
+
+
+def make_stream_result(rng: random.Random, uid: int, completion: str, chunk_size: int) -> SynapseStreamResult:
+    chunks = [completion[i : i + chunk_size] for i in range(0, len(completion), chunk_size)]
+    timings = []
+    elapsed = rng.uniform(0.1, 1.0)
+    for _ in chunks:
+        timings.append(elapsed)
+        elapsed += rng.expovariate(50)
+    return SynapseStreamResult(
+        uid=uid,
+        accumulated_chunks=chunks,
+        accumulated_chunks_timings=timings,
+        # A few miners send their whole completion at once, which the streaming penalty catches.
+        tokens_per_chunk=[len(chunk) // 4 for chunk in chunks],
+        synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion),
+    )
+
+
+def make_response_event(
+    num_miners: int = 50,
+    completion_length: int = 1024,
+    duplicate_ratio: float = 0.0,
+    seed: int = 0,
+) -> DendriteResponseEvent:
+    """Builds a DendriteResponseEvent of `num_miners` synthetic responses.
+
+    Args:
+        num_miners (int): The number of responses.
+        completion_length (int): The approximate number of characters of each completion.
+        duplicate_ratio (float): The fraction of the responses that copy the completion of another response, as
+            miners running the same reference model do.
+        seed (int): The seed of the random generator.
+    """
+    rng = random.Random(seed)
+    num_unique = max(1, round(num_miners * (1 - duplicate_ratio)))
+    unique_completions = [make_completion(rng, completion_length) for _ in range(num_unique)]
+    completions = unique_completions + [rng.choice(unique_completions) for _ in range(num_miners - num_unique)]
+    rng.shuffle(completions)
+
+    stream_results = [
+        make_stream_result(rng, uid, completion, chunk_size=rng.choice([16, 64, 1024, 4096]))
+        for uid, completion in enumerate(completions)
+    ]
+    return DendriteResponseEvent(stream_results, uids=torch.arange(num_miners), timeout=10)
+
+
+def make_agent(reference: str = REFERENCE) -> SimpleNamespace:
+    """Minimal agent with the reward definitions of the math task."""
+    task = SimpleNamespace(
+        reference=reference,
+        reward_definition=MathTask.reward_definition,
+        penalty_definition=MathTask.penalty_definition,
+        global_penalty_definition=MathTask.global_penalty_definition,
+    )
+    return SimpleNamespace(task=task, challenge="What is 6 * 7?")
@@ -0,0 +1,71 @@
+"""
+Benchmarks the token accounting of the streamed chunks of a step, per chunk (previous behaviour) vs batched once each
+stream has ended, in every token_count_mode. Uses a locally trained BPE tokenizer so that it runs offline.
+
+    python -m benchmarks.tokens --miners 64 --words 400 --chunk-size 12
+"""
+import time
+import random
+import argparse
+from typing import List
+from einstein.utils.tokens import TOKEN_COUNT_MODES, count_tokens
+
+WORDS = ["the", "final", "answer", "is", "x", "=", "solve", "equation", "integral", "of", "42", "3.14", "\\frac{1}{2}"]
+
+
+def make_streams(num_miners: int, num_words: int, chunk_size: int, seed: int = 0) -> List[List[str]]:
+    """Returns the chunks of the stream of each miner."""
+    rng = random.Random(seed)
+    completions = [" ".join(rng.choices(WORDS, k=num_words)) for _ in range(num_miners)]
+    return [
+        [completion[i : i + chunk_size] for i in range(0, len(completion), chunk_size)] for completion in completions
+    ]
+
+
+def make_tokenizer(streams: List[List[str]]):
+    """Trains a small BPE tokenizer on the streamed completions."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    backend = Tokenizer(models.BPE(unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel()
+    backend.train_from_iterator(
+        ["".join(chunks) for chunks in streams], trainers.BpeTrainer(vocab_size=500, special_tokens=["[UNK]"])
+    )
+    return PreTrainedTokenizerFast(tokenizer_object=backend)
+
+
+def run(mode: str, streams: List[List[str]], tokenizer, repeats: int = 5) -> float:
+    """Returns the seconds per step of counting the tokens of every stream in the given mode, or per chunk."""
+    if mode == "per-chunk":
+        def count(chunks):
+            return [len(tokenizer.tokenize(chunk)) for chunk in chunks]
+    else:
+        def count(chunks):
+            return count_tokens(tokenizer, chunks, mode=mode)
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for chunks in streams:
+            count(chunks)
+    return (time.perf_counter() - t0) / repeats
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--miners", type=int, default=64)
+    parser.add_argument("--words", type=int, default=400, help="Words per completion.")
+    parser.add_argument("--chunk-size", type=int, default=12, help="Characters per streamed chunk.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(args)
+
+    streams = make_streams(args.miners, args.words, args.chunk_size)
+    tokenizer = make_tokenizer(streams)
+    num_chunks = sum(len(chunks) for chunks in streams)
+    for mode in ("per-chunk",) + TOKEN_COUNT_MODES:
+        elapsed = run(mode, streams, tokenizer, args.repeats)
+        print(f"{mode:>10}: {elapsed * 1e3:7.2f} ms per step ({num_chunks / elapsed:,.0f} chunks/sec)")
+
+
+if __name__ == "__main__":
+    main()
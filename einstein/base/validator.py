@@ -1,18 +1,24 @@
 import sys
-import copy
+import time
 import torch
 import asyncio
 import argparse
 import threading
 import bittensor as bt
 
-from typing import List
+from typing import Callable, Dict, List, Optional, Set
 from traceback import print_exception
 
 from einstein.base.neuron import BaseNeuron
 from einstein.mock import MockDendrite
 from einstein.utils.config import add_validator_args
 from einstein.utils.exceptions import MaxRetryError
+from einstein.utils.logging import log_event
+from einstein.utils.misc import serialize_exception_to_string, ttl_get_block
+from einstein.utils.inflight import InFlightRegistry
+from einstein.utils.uids import build_uid_index, changed_uids, metagraph_fingerprint
+from einstein.utils.sampler import LatencyAwareSampler
+from einstein.utils.scores import MovingAverageScores
 
 class BaseValidatorNeuron(BaseNeuron):
     """
@@ -28,7 +34,11 @@ class BaseValidatorNeuron(BaseNeuron):
         super().__init__(config=config)
 
         # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
+        # Per uid hashes of the hotkeys and axons, compared on every sync to find the uids that changed.
+        self.metagraph_fingerprint = metagraph_fingerprint(self.metagraph.hotkeys, self.metagraph.axons)
+        # Available miners, rebuilt on every metagraph sync.
+        self.uid_index = build_uid_index(self)
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         
@@ -38,10 +48,30 @@ class BaseValidatorNeuron(BaseNeuron):
             self.dendrite = bt.dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
+        # Miners that are still answering a previous request are held back from new ones.
+        self.in_flight = InFlightRegistry()
+        # Response statistics of the miners, used to pick fast and reliable miners for organic requests.
+        self.miner_sampler = LatencyAwareSampler(timeout=self.config.neuron.timeout)
+        # Work scheduled outside of a forward (e.g. scoring of organic requests). Holds references until completion.
+        self.background_tasks: Set[asyncio.Task] = set()
+        # Caps the organic requests whose scoring outlives their forward (see `--neuron.max_background_scoring`).
+        self.background_slots = asyncio.Semaphore(max(1, self.config.neuron.max_background_scoring))
+
         # Set up initial scoring weights for validation
         bt.logging.info("Building validation weights.")
-        self.scores = torch.zeros(
-            self.metagraph.n, dtype=torch.float32, device=self.device
+        # Guards self.scores, which is shared by all concurrent forwards and the sync path.
+        self.scores_lock = threading.RLock()
+        # Duration in seconds of the last forward completed by each concurrency slot.
+        self.forward_slot_times: Dict[int, float] = {}
+        # Duration in seconds of each operation of the last background chain maintenance.
+        self.maintenance_times: Dict[str, float] = {}
+        # Block last read by the background chain maintenance, or None when it is not running (see `block`).
+        self.maintenance_block: Optional[int] = None
+        # Moving average scores, kept on the CPU and updated only for the sampled uids (see `scores`).
+        self.moving_average = MovingAverageScores(
+            torch.zeros(self.metagraph.n, dtype=torch.float32),
+            alpha=self.config.neuron.moving_average_alpha,
+            decay=self.config.neuron.decay_alpha,
         )
 
         # Init sync with the network. Updates the metagraph.
@@ -89,6 +119,7 @@ class BaseValidatorNeuron(BaseNeuron):
         This function performs the following primary tasks:
         1. Check for registration on the Bittensor network.
         2. Continuously forwards queries to the miners on the network, rewarding their responses and updating the scores accordingly.
+           Up to `neuron.num_concurrent_forwards` forwards are kept in flight at any time (see `run_concurrent_forwards`).
         3. Periodically resynchronizes with the chain; updating the metagraph with the latest network state and setting weights.
 
         The essence of the validator's operations is in the forward function, which is called every step. The forward function is responsible for querying the network and scoring the responses.
@@ -120,35 +151,7 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # This loop maintains the validator's operations until intentionally stopped.
         try:
-            while True:
-                bt.logging.info(f"step({self.step}) block({self.block})")
-                
-                forward_timeout = self.config.neuron.forward_max_time
-                try:
-                    task = self.loop.create_task(self.forward())
-                    self.loop.run_until_complete(
-                        asyncio.wait_for(task, timeout=forward_timeout)
-                    )
-                except torch.cuda.OutOfMemoryError as e:
-                    bt.logging.error(f"Out of memory error: {e}")
-                    continue
-                except MaxRetryError as e:
-                    bt.logging.error(f"MaxRetryError: {e}")
-                    continue
-                except asyncio.TimeoutError as e:
-                    bt.logging.error(
-                        f"Forward timeout: Task execution exceeded {forward_timeout} seconds and was cancelled.: {e}"
-                    )
-                    continue
-
-                # Check if we should exit.
-                if self.should_exit:
-                    break
-
-                # Sync metagraph and potentially set weights.
-                self.sync()
-
-                self.step += 1
+            self.loop.run_until_complete(self.run_concurrent_forwards())
 
         # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
@@ -162,6 +165,138 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.debug(print_exception(type(err), err, err.__traceback__))
             self.should_exit = True
 
+    async def run_concurrent_forwards(self):
+        """
+        Keeps `neuron.num_concurrent_forwards` forward passes in flight, starting a new one as soon as any of them finishes.
+
+        Every completed forward is followed by a step increment and, unless chain maintenance runs in the background
+        (see `run_maintenance`), by a sync. Forwards that fail with a recoverable error (out of memory, max retries,
+        timeout) are logged and their slot is refilled without syncing.
+        Per-slot step times are kept in `self.forward_slot_times` and the overall forward throughput is logged on completion.
+        """
+        num_slots = max(1, self.config.neuron.num_concurrent_forwards)
+        forward_timeout = self.config.neuron.forward_max_time
+        in_flight: Dict[asyncio.Task, tuple] = {}
+        run_start_time = time.time()
+        completed_forwards = 0
+        background_maintenance = self.config.neuron.maintenance_interval > 0
+        maintenance_task = None
+        if background_maintenance:
+            # From now on, the subtensor connection is only used by the maintenance thread.
+            self.maintenance_block = self.subtensor.get_current_block()
+            maintenance_task = asyncio.ensure_future(self.run_maintenance())
+
+        try:
+            while in_flight or not self.should_exit:
+                busy_slots = {slot for slot, _ in in_flight.values()}
+                for slot in range(num_slots):
+                    if self.should_exit or slot in busy_slots:
+                        continue
+                    bt.logging.info(f"step({self.step}) block({self.block}) slot({slot})")
+                    task = asyncio.ensure_future(
+                        asyncio.wait_for(self.forward(), timeout=forward_timeout)
+                    )
+                    in_flight[task] = (slot, time.time())
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(
+                    in_flight.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    slot, start_time = in_flight.pop(task)
+                    step_time = time.time() - start_time
+                    self.forward_slot_times[slot] = step_time
+                    try:
+                        task.result()
+                    except torch.cuda.OutOfMemoryError as e:
+                        bt.logging.error(f"Out of memory error: {e}")
+                        continue
+                    except MaxRetryError as e:
+                        bt.logging.error(f"MaxRetryError: {e}")
+                        continue
+                    except asyncio.TimeoutError as e:
+                        bt.logging.error(
+                            f"Forward timeout: Task execution exceeded {forward_timeout} seconds and was cancelled.: {e}"
+                        )
+                        continue
+
+                    completed_forwards += 1
+                    bt.logging.info(
+                        f"slot({slot}) step({self.step}) finished in {step_time:.2f}s | "
+                        f"{completed_forwards / (time.time() - run_start_time):.3f} forwards/s over {num_slots} slot(s)"
+                    )
+
+                    # Check if we should exit.
+                    if self.should_exit:
+                        continue
+
+                    if not background_maintenance:
+                        # Sync metagraph and potentially set weights.
+                        self.sync()
+
+                    self.step += 1
+        finally:
+            # Never leave orphaned forwards or background scoring behind when the loop is interrupted.
+            for task in list(in_flight) + list(self.background_tasks):
+                task.cancel()
+            if maintenance_task is not None:
+                maintenance_task.cancel()
+                self.maintenance_block = None
+
+    def run_maintenance_step(self) -> Dict[str, float]:
+        """Runs the chain operations of `sync` and returns the duration in seconds of each operation that ran."""
+        timings = {}
+        self.maintenance_block = self.subtensor.get_current_block()
+
+        def timed(name: str, operation: Callable[[], None]):
+            t0 = time.time()
+            operation()
+            timings[name] = time.time() - t0
+
+        timed("check_registered", self.check_registered)
+        if self.should_sync_metagraph():
+            timed("resync_metagraph", self.resync_metagraph)
+        if self.should_set_weights():
+            timed("set_weights", self.set_weights)
+        timed("save_state", self.save_state)
+        return timings
+
+    async def run_maintenance(self):
+        """
+        Runs the chain maintenance (registration check, metagraph resync, weight setting and state saving) every
+        `neuron.maintenance_interval` seconds on a worker thread, so that the forwards never wait on chain RPCs.
+        Scores keep being updated meanwhile: set_weights and save_state work on a snapshot of them. A failed round is
+        logged and retried at the next interval. The subtensor connection is not thread-safe, so it is only used by
+        this thread: the other threads read the block it last fetched (see `block`).
+        """
+        interval = self.config.neuron.maintenance_interval
+        while not self.should_exit:
+            await asyncio.sleep(interval)
+            t0 = time.time()
+            try:
+                timings = await asyncio.to_thread(self.run_maintenance_step)
+            except Exception as e:
+                bt.logging.error(f"Chain maintenance failed: {serialize_exception_to_string(e)}")
+                continue
+
+            self.maintenance_times = timings
+            bt.logging.info(
+                f"Chain maintenance done in {time.time() - t0:.2f}s: "
+                + ", ".join(f"{name}={duration:.2f}s" for name, duration in timings.items())
+            )
+            log_event(self, {"step": self.step, **{f"{name}_time": t for name, t in timings.items()}})
+
+    @property
+    def block(self) -> int:
+        """Current block. While chain maintenance runs in the background, this is the block it read at the start of
+        its last round, at most `neuron.maintenance_interval` seconds old, so that no other thread uses the
+        subtensor connection."""
+        if self.maintenance_block is not None:
+            return self.maintenance_block
+        return ttl_get_block(self)
+
     def run_in_background_thread(self):
         """
         Starts the validator's operations in a background thread upon entering the context.
@@ -215,15 +350,19 @@ class BaseValidatorNeuron(BaseNeuron):
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
         """
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if torch.isnan(self.scores).any():
+        # Weights are computed from a snapshot, as forwards may keep updating the scores meanwhile.
+        with self.scores_lock:
+            scores = self.scores.clone()
+
+        # Check if the scores contain any NaN values and log a warning if they do.
+        if torch.isnan(scores).any():
             bt.logging.warning(
                 "Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
 
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
-        raw_weights = torch.nn.functional.normalize(self.scores, p=1, dim=0)
+        raw_weights = torch.nn.functional.normalize(scores, p=1, dim=0)
 
         bt.logging.debug("raw_weights", raw_weights)
         bt.logging.debug("raw_weight_uids", self.metagraph.uids)
@@ -270,35 +409,45 @@ class BaseValidatorNeuron(BaseNeuron):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         # bt.logging.info("\033[1;33mResyncing the metagraph...\033[0m")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
-
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
-
-        # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        # Stakes and permits may change without the axons changing, so the uid index is always rebuilt.
+        self.uid_index = build_uid_index(self)
+
+        # Check if the hotkeys or axons of any uid have changed.
+        previous_fingerprint = self.metagraph_fingerprint
+        self.metagraph_fingerprint = metagraph_fingerprint(self.metagraph.hotkeys, self.metagraph.axons)
+        changed, replaced = changed_uids(previous_fingerprint, self.metagraph_fingerprint)
+        if not len(changed):
             return
 
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph updated ({len(changed)} uids changed, {len(replaced)} hotkeys replaced), re-syncing hotkeys, "
+            "dendrite pool and moving averages"
         )
-        # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
-
-        # Check to see if the metagraph has changed size.
-        # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys):
-            # Update the size of the moving average scores.
-            new_moving_average = torch.zeros((self.metagraph.n)).to(self.device)
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
+        with self.scores_lock:
+            # Zero out all hotkeys that have been replaced.
+            self.moving_average.zero(replaced)
+
+            # Check to see if the metagraph has changed size.
+            # If so, we need to add new hotkeys and moving averages.
+            if len(self.hotkeys) < len(self.metagraph.hotkeys):
+                self.moving_average.resize(self.metagraph.n)
+        self.miner_sampler.reset(replaced.tolist())
 
         # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
+
+    @property
+    def scores(self) -> torch.FloatTensor:
+        """Moving average scores of every uid, with the decay of all the steps applied."""
+        with self.scores_lock:
+            return self.moving_average.materialize()
+
+    @scores.setter
+    def scores(self, scores: torch.FloatTensor):
+        with self.scores_lock:
+            self.moving_average.reset(scores)
 
     def update_scores(self, rewards: torch.FloatTensor, uids: List[int]):
         """Performs exponential moving average on the scores based on the rewards received from the miners."""
@@ -309,33 +458,27 @@ class BaseValidatorNeuron(BaseNeuron):
             # Replace any NaN values in rewards with 0.
             rewards = torch.nan_to_num(rewards, 0)
 
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        step_rewards = self.scores.scatter(
-            0, torch.tensor(uids).to(self.device), rewards.to(self.device)
-        ).to(self.device)
-        bt.logging.debug(f"Scattered rewards: {rewards}")
-
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha = self.config.neuron.moving_average_alpha
-        self.scores = alpha * step_rewards + (1 - alpha) * self.scores
-        self.scores = (self.scores - self.config.neuron.decay_alpha).clamp(min=0)
-        bt.logging.debug(f"Updated moving avg scores: {self.scores}")
+        with self.scores_lock:
+            # Only the sampled uids are updated, assumes uids are mutually exclusive.
+            scores = self.moving_average.update(rewards, uids)
+        # Formatting tensors is slow, so only the scores of the sampled uids are logged, as plain floats.
+        uids = uids.tolist() if torch.is_tensor(uids) else list(uids)
+        bt.logging.debug(
+            f"Updated moving avg scores: {dict(zip(uids, (round(score, 4) for score in scores.tolist())))}"
+        )
 
     def save_state(self):
         """Saves the state of the validator to a file."""
         bt.logging.info("Saving validator state.")
 
-        # Save the state of the validator to file.
-        torch.save(
-            {
+        # Save a snapshot of the state of the validator to file, without holding up score updates while writing.
+        with self.scores_lock:
+            state = {
                 "step": self.step,
-                "scores": self.scores,
+                "scores": self.scores.clone(),
                 "hotkeys": self.hotkeys,
-            },
-            self.config.neuron.full_path + "/state.pt",
-        )
+            }
+        torch.save(state, self.config.neuron.full_path + "/state.pt")
 
     def load_state(self):
         """Loads the state of the validator from a file."""
@@ -346,3 +489,5 @@ class BaseValidatorNeuron(BaseNeuron):
         self.step = state["step"]
         self.scores = state["scores"]
         self.hotkeys = state["hotkeys"]
+        # The uids whose hotkey changed since the state was saved are zeroed on the next resync.
+        self.metagraph_fingerprint = metagraph_fingerprint(self.hotkeys, self.metagraph.axons)
@@ -11,7 +11,9 @@ from .tools.datasets import Context
 from transformers import Pipeline
 
 
-def create_task(llm_pipeline: Pipeline, task_name: str, problem: str) -> Task:
+def create_task(
+    llm_pipeline: Pipeline, task_name: str, problem: str, create_reference: bool = True
+) -> Task:
     math_based_tasks = ["math"]
 
     if task_name in math_based_tasks:
@@ -32,7 +34,9 @@ def create_task(llm_pipeline: Pipeline, task_name: str, problem: str) -> Task:
                 stats={}
             )
             task = MathTask(llm_pipeline=llm_pipeline, context=context)
-            
+            if not create_reference:
+                return task
+
             # generate_reference() function only works if static_reference is False
             _static_ref = task.static_reference
             task.static_reference = False
@@ -1,6 +1,7 @@
+import copy
 import torch
 import bittensor as bt
-from typing import List
+from typing import Dict, List
 from dataclasses import dataclass
 from einstein.protocol import StreamCoreSynapse
 from einstein.utils.misc import serialize_exception_to_string
@@ -13,6 +14,8 @@ class SynapseStreamResult:
     accumulated_chunks_timings: List[float] = None
     tokens_per_chunk: List[int] = None
     synapse: StreamCoreSynapse = None
+    # Reward model name -> IncrementalScorer that scored the completion while it was streamed.
+    scorers: Dict = None
 
 
 class DendriteResponseEvent:
@@ -55,6 +58,47 @@ class DendriteResponseEvent:
             self.stream_results_all_chunks_timings.append(stream_result.accumulated_chunks_timings)
             self.stream_results_all_tokens_per_chunk.append(stream_result.tokens_per_chunk)
 
+        # Index of each response's completion in the distinct completions, built by hashing the completions.
+        unique_index = {}
+        completion_inverse = []
+        self.unique_first_response = []
+        for i, completion in enumerate(self.completions):
+            index = unique_index.setdefault(completion, len(unique_index))
+            if index == len(self.unique_first_response):
+                self.unique_first_response.append(i)
+            completion_inverse.append(index)
+        self.completion_inverse = torch.LongTensor(completion_inverse)
+        self.unique_completions = list(unique_index)
+
+        # Incremental scorers are only usable for a reward model if every response was scored by one.
+        scorer_names = [set(stream_result.scorers or {}) for stream_result in stream_results]
+        common_names = set.intersection(*scorer_names) if scorer_names else set()
+        self.incremental_scorers = {
+            name: [stream_result.scorers[name] for stream_result in stream_results]
+            for name in common_names
+        }
+
+    @property
+    def has_duplicate_completions(self) -> bool:
+        return len(self.unique_completions) < len(self.completions)
+
+    def completions_event(self, indices: List[int]) -> "DendriteResponseEvent":
+        """Shallow copy of the event holding only the completions and uids of the responses at `indices`, which must
+        have distinct completions. The other per-response fields are left as is, so it is only meant for
+        completion-only reward models."""
+        event = copy.copy(self)
+        event.uids = self.uids[torch.LongTensor(indices).to(self.uids.device)]
+        event.completions = [self.completions[i] for i in indices]
+        event.unique_completions = event.completions
+        event.unique_first_response = list(range(len(indices)))
+        event.completion_inverse = torch.arange(len(indices))
+        event.incremental_scorers = {}
+        return event
+
+    def unique_completions_event(self) -> "DendriteResponseEvent":
+        """Event holding only the distinct completions, and the uid of their first response."""
+        return self.completions_event(self.unique_first_response)
+
     def __state_dict__(self):
         return {
             "uids": self.uids.tolist(),
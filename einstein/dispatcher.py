@@ -0,0 +1,192 @@
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import numpy as np
+import bittensor as bt
+from collections import defaultdict, deque
+from enum import IntEnum
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from einstein.protocol import StreamCoreSynapse
+from einstein.utils.exceptions import QueueFullError
+
+
+class RequestPriority(IntEnum):
+    """Priority classes of API requests. Lower values are served first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+    @classmethod
+    def parse(cls, value) -> "RequestPriority":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown request priority {value!r}. Please choose from {[p.name.lower() for p in cls]}")
+        return cls(value)
+
+
+@dataclass(order=True)
+class DispatchRequest:
+    """An API request waiting to be serviced by the validator loop."""
+
+    priority: int
+    sequence: int
+    input_synapse: StreamCoreSynapse = field(compare=False)
+    deadline: float = field(compare=False)
+    future: asyncio.Future = field(compare=False, repr=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False, repr=False)
+    created_at: float = field(default_factory=time.time, compare=False)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.deadline
+
+    @property
+    def remaining_time(self) -> float:
+        return max(0.0, self.deadline - time.time())
+
+    def set_result(self, output_synapse: StreamCoreSynapse):
+        """Resolves the request from any thread."""
+        self.loop.call_soon_threadsafe(self._resolve, output_synapse, None)
+
+    def set_exception(self, exception: BaseException):
+        """Fails the request from any thread."""
+        self.loop.call_soon_threadsafe(self._resolve, None, exception)
+
+    def _resolve(self, output_synapse: StreamCoreSynapse, exception: BaseException):
+        # The requester may already have given up on the request (deadline or disconnect).
+        if self.future.done():
+            return
+        if exception is not None:
+            self.future.set_exception(exception)
+        else:
+            self.future.set_result(output_synapse)
+
+
+class RequestDispatcher:
+    """
+    Thread-safe, bounded priority queue between the API server event loop and the validator loop.
+
+    The API server awaits `submit`, which fails fast with a QueueFullError when the queue is full and with an
+    asyncio.TimeoutError once the request deadline has passed. The validator loop polls `get_nowait` and resolves
+    the returned request, which wakes the awaiting API server coroutine through `call_soon_threadsafe`, so no worker
+    thread is ever blocked waiting for a response.
+    """
+
+    def __init__(self, maxsize: int = 64, default_timeout: float = 60):
+        self.maxsize = maxsize
+        self.default_timeout = default_timeout
+        self._heap: List[DispatchRequest] = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    async def submit(
+        self,
+        synapse: StreamCoreSynapse,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: float = None,
+    ) -> StreamCoreSynapse:
+        """Queues a request and waits until the validator loop has serviced it.
+
+        Raises:
+            QueueFullError: If the queue already holds `maxsize` requests.
+            asyncio.TimeoutError: If the request was not serviced before its deadline.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.default_timeout if timeout is None else timeout
+        request = DispatchRequest(
+            priority=int(RequestPriority.parse(priority)),
+            sequence=next(self._sequence),
+            input_synapse=synapse,
+            deadline=time.time() + timeout,
+            future=loop.create_future(),
+            loop=loop,
+        )
+
+        with self._lock:
+            if len(self._heap) >= self.maxsize:
+                self._purge()
+            if len(self._heap) >= self.maxsize:
+                raise QueueFullError(f"Request queue is full ({self.maxsize} requests pending)")
+            heapq.heappush(self._heap, request)
+
+        return await asyncio.wait_for(request.future, timeout=timeout)
+
+    def _purge(self):
+        """Drops the requests that can no longer be serviced, so that they do not count towards `maxsize`.
+        Must be called with the lock held."""
+        live = []
+        for request in self._heap:
+            if request.future.done():
+                continue
+            if request.expired:
+                request.set_exception(asyncio.TimeoutError("Request deadline exceeded before it was serviced"))
+                continue
+            live.append(request)
+        heapq.heapify(live)
+        self._heap = live
+
+    def get_nowait(self) -> Optional[DispatchRequest]:
+        """Pops the highest priority request that can still be serviced, or None if there is none.
+
+        Requests whose deadline has passed, or whose requester has stopped waiting, are dropped.
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return None
+                request = heapq.heappop(self._heap)
+
+            if request.future.done():
+                continue
+            if request.expired:
+                bt.logging.warning(f"Dropping expired API request {request.sequence} (priority {request.priority})")
+                request.set_exception(asyncio.TimeoutError("Request deadline exceeded before it was serviced"))
+                continue
+            return request
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(qsize={self.qsize()}, maxsize={self.maxsize})"
+
+
+class LatencyTracker:
+    """Rolling window of request latencies per label (e.g. the organic mode), reported as percentiles."""
+
+    def __init__(self, window: int = 1000, percentiles: tuple = (50, 99)):
+        self.window = window
+        self.percentiles = percentiles
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, label: str, latency: float):
+        with self._lock:
+            self._latencies[label].append(latency)
+
+    def percentile(self, label: str, q: float) -> float:
+        with self._lock:
+            latencies = list(self._latencies.get(label, []))
+        return float(np.percentile(latencies, q)) if latencies else float("nan")
+
+    def __state_dict__(self) -> Dict[str, float]:
+        return {
+            f"api_latency_p{q}_{label}": self.percentile(label, q)
+            for label in list(self._latencies)
+            for q in self.percentiles
+        }
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.__state_dict__()})"
@@ -5,13 +5,21 @@ import asyncio
 import traceback
 import numpy as np
 import bittensor as bt
-from typing import List, Dict, Awaitable
+import torch
+from typing import List, Dict, Awaitable, Callable, Optional, Tuple
 from einstein.agent import HumanAgent
-from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
 from einstein.conversation import create_task
+from einstein.tasks import Task
+from einstein.dispatcher import DispatchRequest
+from einstein.prefetch import encode_challenge
+from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
 from einstein.protocol import StreamCoreSynapse, ClientRequestSynapse
-from einstein.rewards import RewardResult
+from einstein.rewards import RewardResult, IncrementalScorer
+from einstein.rewards.advanced_math import AdvancedMathModel
 from einstein.utils.uids import get_random_uids
+from einstein.utils.inflight import InFlightRegistry
+from einstein.utils.sampler import LatencyAwareSampler
+from einstein.utils.tokens import count_tokens
 from einstein.utils.logging import log_event
 from einstein.utils.misc import async_log, serialize_exception_to_string
 from transformers import PreTrainedTokenizerFast as Tokenizer
@@ -20,12 +28,8 @@ from dataclasses import dataclass
 import urllib.parse
 
 SINGLE_TURN_TASKS = ['sentiment', 'translation']
-
-@async_log
-async def generate_reference(agent):
-    loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, agent.task.generate_reference, agent.llm_pipeline)
-    return result
+# Seconds to wait before retrying a step that failed.
+RETRY_DELAY = 1.0
 
 @async_log
 async def execute_dendrite_call(dendrite_call):
@@ -33,8 +37,23 @@ async def execute_dendrite_call(dendrite_call):
     return responses
 
 
-async def process_stream(uid: int, async_iterator: Awaitable, tokenizer: Tokenizer) -> SynapseStreamResult:
-    """Process a single response asynchronously."""
+async def process_stream(
+    uid: int,
+    async_iterator: Awaitable,
+    tokenizer: Tokenizer,
+    nonce: str = None,
+    in_flight: InFlightRegistry = None,
+    scorers: Dict[str, IncrementalScorer] = None,
+    token_count_mode: str = "exact",
+) -> SynapseStreamResult:
+    """Process a single response asynchronously.
+
+    The uid is released from the in-flight registry under the nonce of its request as soon as its stream ends. If the
+    stream timed out or failed, the miner may still be generating the response, so the uid is held for the cooldown
+    of the registry instead.
+    Incremental scorers consume the chunks as they arrive, so that their rewards are ready when the stream ends.
+    Only the chunk timings are recorded per chunk; tokens are counted for all the chunks at once when the stream ends.
+    """
     synapse = None  # Initialize chunk with a default value
     exception = None
     accumulated_chunks = []
@@ -47,11 +66,9 @@ async def process_stream(uid: int, async_iterator: Awaitable, tokenizer: Tokeniz
             if isinstance(chunk, str):
                 accumulated_chunks.append(chunk)
                 accumulated_chunks_timings.append(time.time() - start_time)
-                
-                tokens_in_chunk = len(tokenizer.tokenize(chunk))
-                accumulated_tokens_per_chunk.append(tokens_in_chunk)
-                
-                bt.logging.debug(f"\nchunk for uid {uid}: {chunk}")
+
+                for scorer in (scorers or {}).values():
+                    scorer.update(chunk)
 
         # Assuming last chunk of async_iterator holds the last value yielded as a StreamingSynapse
         synapse = chunk
@@ -72,23 +89,86 @@ async def process_stream(uid: int, async_iterator: Awaitable, tokenizer: Tokeniz
 
         synapse = failed_synapse
     finally:
-        return SynapseStreamResult(
-            accumulated_chunks=accumulated_chunks,
-            accumulated_chunks_timings=accumulated_chunks_timings,
-            tokens_per_chunk=accumulated_tokens_per_chunk,
-            synapse=synapse,
-            uid=uid,
-            exception=exception
-        )
+        # Also runs when the stream task is cancelled, in which case the CancelledError propagates.
+        if in_flight is not None:
+            ended = (
+                exception is None
+                and isinstance(synapse, StreamCoreSynapse)
+                and synapse.dendrite.status_code != 408
+            )
+            if ended:
+                in_flight.release(uid, nonce)
+            else:
+                in_flight.hold(uid, nonce)
+
+    completion = synapse.completion
+    try:
+        accumulated_tokens_per_chunk = count_tokens(tokenizer, accumulated_chunks, mode=token_count_mode)
+    except Exception as e:
+        bt.logging.error(f"Failed to count the tokens of uid {uid}: {e}")
+    bt.logging.debug(f"Stream of uid {uid} ended after {len(accumulated_chunks)} chunks in {time.time() - start_time:.2f}s")
+    if scorers:
+        # Final scoring may parse the answer (see EquivalenceEngine), which is kept off the event loop.
+        scorers = await asyncio.to_thread(finalize_scorers, uid, scorers, completion)
+    return SynapseStreamResult(
+        accumulated_chunks=accumulated_chunks,
+        accumulated_chunks_timings=accumulated_chunks_timings,
+        tokens_per_chunk=accumulated_tokens_per_chunk,
+        synapse=synapse,
+        uid=uid,
+        exception=exception,
+        scorers=scorers,
+    )
+
+
+def finalize_scorers(
+    uid: int, scorers: Dict[str, IncrementalScorer], completion: str
+) -> Dict[str, IncrementalScorer]:
+    """Computes the final rewards of the incremental scorers. Scorers that fail are dropped, so that the reward
+    models fall back to batch scoring."""
+    finalized = {}
+    for name, scorer in (scorers or {}).items():
+        try:
+            scorer.finalize(completion)
+            finalized[name] = scorer
+        except Exception as e:
+            bt.logging.error(f"Incremental {name} scoring failed for uid {uid}: {e}")
+    return finalized
+
+
+def make_scorer_factory(self, task: Task) -> Optional[Callable[[], Dict[str, IncrementalScorer]]]:
+    """Returns a factory of incremental scorers for the reward models of a task, or None if its reference is not
+    known yet or none of its reward models can score incrementally."""
+    if task is None or not task.static_reference or not task.reference:
+        return None
+    reward_models = [self.reward_pipeline.get(info["name"]) for info in task.reward_definition]
+    reward_models = [
+        model for model in reward_models
+        if model is not None and model.incremental_scorer(task.reference) is not None
+    ]
+    if not reward_models:
+        return None
+
+    def make_scorers() -> Dict[str, IncrementalScorer]:
+        return {model.name: model.incremental_scorer(task.reference) for model in reward_models}
+
+    return make_scorers
 
 
 @async_log
-async def handle_response(stream_results_dict: Dict[int, Awaitable], tokenizer: Tokenizer) -> List[SynapseStreamResult]:
+async def handle_response(
+    stream_results_dict: Dict[int, Awaitable],
+    tokenizer: Tokenizer,
+    nonce: str = None,
+    in_flight: InFlightRegistry = None,
+) -> List[SynapseStreamResult]:
     """The handle_response function is responsible for creating asyncio tasks around acquiring streamed miner chunks
     and processing them asynchronously. It then pairs the results with their original UIDs and returns a list of StreamResults.
 
     Args:
         responses (Dict[int, Awaitable]): Responses contains awaitables that are used to acquire streamed miner chunks.
+        nonce (str, optional): Nonce of the request, under which the uids are registered as in flight.
+        in_flight (InFlightRegistry, optional): Registry from which each uid is released when its stream ends.
 
     Raises:
         ValueError
@@ -96,24 +176,93 @@ async def handle_response(stream_results_dict: Dict[int, Awaitable], tokenizer:
     Returns:
         List[StreamResult]: DataClass containing the synapse, exception, and uid
     """
+    process_stream_tasks = start_stream_tasks(
+        stream_results_dict, tokenizer, nonce=nonce, in_flight=in_flight
+    )
+    return await gather_stream_results(process_stream_tasks)
+
+
+def start_stream_tasks(
+    stream_results_dict: Dict[int, Awaitable],
+    tokenizer: Tokenizer,
+    nonce: str = None,
+    in_flight: InFlightRegistry = None,
+    scorer_factory: Callable[[], Dict[str, IncrementalScorer]] = None,
+    token_count_mode: str = "exact",
+) -> List[asyncio.Task]:
+    """Schedules one task per miner stream, in the order of the uids. If a scorer factory is given, each stream is
+    scored incrementally by its own scorers."""
     tasks_with_uid = [
         (uid, stream_results_dict[uid]) for uid, _ in stream_results_dict.items()
     ]  # Pair UIDs with their tasks
 
     # Start tasks, preserving order and their associated UIDs
-    process_stream_tasks = [process_stream(uid, resp, tokenizer) for uid, resp in tasks_with_uid]
-    processed_stream_results = await asyncio.gather(*process_stream_tasks, return_exceptions=True) 
-    
-    return processed_stream_results
+    return [
+        asyncio.ensure_future(
+            process_stream(
+                uid,
+                resp,
+                tokenizer,
+                nonce=nonce,
+                in_flight=in_flight,
+                scorers=scorer_factory() if scorer_factory else None,
+                token_count_mode=token_count_mode,
+            )
+        )
+        for uid, resp in tasks_with_uid
+    ]
+
+
+@async_log
+async def gather_stream_results(stream_tasks: List[asyncio.Task]) -> List[SynapseStreamResult]:
+    """Waits for every miner stream to end."""
+    return await asyncio.gather(*stream_tasks, return_exceptions=True)
+
+
+def has_final_answer(result: SynapseStreamResult) -> bool:
+    """Quick answer check: the completion states a final answer."""
+    return AdvancedMathModel.extract_final_answer(result.synapse.completion) is not None
+
+
+async def wait_for_quorum(
+    stream_tasks: List[asyncio.Task],
+    quorum: int,
+    answer_check: Callable[[SynapseStreamResult], bool] = None,
+) -> List[SynapseStreamResult]:
+    """Waits until `quorum` miners have completed a non-empty response, or until one passes `answer_check`.
+
+    The remaining streams are left running, so that they can still be gathered and scored afterwards. If the
+    quorum is not reached, this returns once every stream has ended.
+
+    Args:
+        stream_tasks (List[asyncio.Task]): The tasks processing the miner streams.
+        quorum (int): The number of completed responses to wait for. 0 waits for every stream.
+        answer_check (Callable, optional): Predicate on a completed response that ends the wait early.
+
+    Returns:
+        List[SynapseStreamResult]: The completed responses, in order of completion.
+    """
+    quorum = quorum or len(stream_tasks)
+    completed = []
+    pending = set(stream_tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        passed = False
+        for task in done:
+            result = task.result()
+            if result.exception is not None or not result.synapse.completion:
+                continue
+            completed.append(result)
+            passed = passed or (answer_check is not None and answer_check(result))
+        if passed or len(completed) >= quorum:
+            break
+    return completed
 
 
 @async_log
 async def generate_reference(agent: HumanAgent):
-    loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(
-        None, agent.task.generate_reference, agent.llm_pipeline
-    )
-    return result
+    # Awaits the pipeline's async generation so that stream handling never waits behind the GPU.
+    return await agent.task.agenerate_reference(agent.llm_pipeline)
 
 
 def log_stream_results(stream_results: List[SynapseStreamResult]):
@@ -144,57 +293,85 @@ def log_stream_results(stream_results: List[SynapseStreamResult]):
         )
 
 
-async def run_step(
-    self, agent: HumanAgent, roles: List[str], messages: List[str], k: int, timeout: float, exclude: list = None
-):
-    """Executes a single step of the agent, which consists of:
-    - Getting a list of uids to query
-    - Querying the network
-    - Rewarding the network
-    - Updating the scores
-    - Logging the event
+async def query_miners(
+    self,
+    roles: List[str],
+    messages: List[str],
+    k: int,
+    timeout: float,
+    exclude: list = None,
+    task: Task = None,
+    sampler: LatencyAwareSampler = None,
+) -> Tuple[torch.LongTensor, List[asyncio.Task]]:
+    """Sends the conversation to k available miners and starts handling their streams.
 
     Args:
-        agent (HumanAgent): The agent to run the step for.
         roles (List[str]): The roles for the synapse.
         messages (List[str]): The messages for the synapse.
         k (int): The number of uids to query.
         timeout (float): The timeout for the queries.
         exclude (list, optional): The list of uids to exclude from the query. Defaults to [].
-    """
-    bt.logging.debug("run_step", agent.task.name)
+        task (Task, optional): The task of the query. If its reference is known, the responses are scored while they are streamed.
+        sampler (LatencyAwareSampler, optional): Picks the miners instead of uniform sampling.
 
-    # Record event start time.
-    start_time = time.time()
-    # Get the list of uids to query for this step.
-    uids = get_random_uids(self, k=k, exclude=exclude or []).to(self.device)
+    Returns:
+        Tuple[torch.LongTensor, List[asyncio.Task]]: The queried uids and the tasks processing their streams.
+    """
+    # Get the list of uids to query for this step. Miners that are still busy with a previous request are only
+    # queried if there are not enough idle ones.
+    uids = get_random_uids(
+        self, k=k, exclude=exclude, sampler=sampler, avoid=self.in_flight.busy_uids()
+    ).to(self.device)
     uids_cpu = uids.cpu().tolist()
 
+    # Tag the request with a nonce, under which the queried miners are held back until their streams end.
+    nonce = self.in_flight.new_nonce()
+    self.in_flight.acquire(uids_cpu, nonce, timeout)
+
     axons = [self.metagraph.axons[uid] for uid in uids]
     bt.logging.debug(f"axons: {axons}")
 
     # Directly call dendrite and process responses in parallel
     streams_responses = await self.dendrite(
         axons=axons,
-        synapse=StreamCoreSynapse(roles=roles, messages=messages),
+        synapse=StreamCoreSynapse(roles=roles, messages=messages, request_nonce=nonce),
         timeout=timeout,
         deserialize=False,
         streaming=True,
     )
 
-    # Prepare the task for handling stream responses
+    # Start handling the stream responses
     stream_results_dict = dict(zip(uids_cpu, streams_responses))
     tokenizer = self.llm_pipeline.tokenizer
-    handle_stream_responses_task = asyncio.create_task(handle_response(stream_results_dict, tokenizer))
+    stream_tasks = start_stream_tasks(
+        stream_results_dict,
+        tokenizer,
+        nonce=nonce,
+        in_flight=self.in_flight,
+        scorer_factory=make_scorer_factory(self, task),
+        token_count_mode=self.config.neuron.token_count_mode,
+    )
+    return uids, stream_tasks
 
-    if not agent.task.static_reference:
-        reference_generation_task = generate_reference(agent)
-        _, stream_results = await asyncio.gather(
-            reference_generation_task, handle_stream_responses_task
-        )
-    else:
-        stream_results = await handle_stream_responses_task
 
+async def score_responses(
+    self,
+    agent: HumanAgent,
+    uids: torch.LongTensor,
+    stream_results: List[SynapseStreamResult],
+    timeout: float,
+    start_time: float,
+    update_scores: bool = True,
+) -> Tuple[dict, str]:
+    """Rewards the miner responses, updates the scores and builds the step event.
+
+    Args:
+        update_scores (bool, optional): Whether the rewards update the moving average scores. Must be False when the
+            miners were not sampled uniformly, as the scores would otherwise favour the miners picked more often.
+
+    Returns:
+        Tuple[dict, str]: The step event and the best response.
+    """
     log_stream_results(stream_results)
 
     # Encapsulate the responses in a response event (dataclass)
@@ -203,9 +380,12 @@ async def run_step(
     )
 
     bt.logging.info(f"Created DendriteResponseEvent:\n {response_event}")
+    self.miner_sampler.update(response_event)
     # Reward the responses and get the reward result (dataclass)
     # This contains a list of RewardEvents but can be exported as a dict (column-wise) for logging etc
-    reward_result = RewardResult(
+    # Rewards are computed in a thread, so that the other forwards and streams keep running meanwhile.
+    reward_result = await asyncio.to_thread(
+        RewardResult,
         self.reward_pipeline,
         agent=agent,
         response_event=response_event,
@@ -221,8 +401,9 @@ async def run_step(
         top_response=best_response,
     )
 
-    self.update_scores(reward_result.rewards, uids)
-    
+    if update_scores:
+        self.update_scores(reward_result.rewards, uids)
+
     # Log the step event.
     event = {
         "best": best_response,
@@ -233,12 +414,160 @@ async def run_step(
         **reward_result.__state_dict__(full=self.config.neuron.log_full),
         **response_event.__state_dict__(),
     }
-    
-    top_response = best_response
-    
+
+    return event, best_response
+
+
+async def run_step(
+    self, agent: HumanAgent, roles: List[str], messages: List[str], k: int, timeout: float, exclude: list = None
+):
+    """Executes a single step of the agent, which consists of:
+    - Getting a list of uids to query
+    - Querying the network
+    - Rewarding the network
+    - Updating the scores
+    - Logging the event
+
+    Args:
+        agent (HumanAgent): The agent to run the step for.
+        roles (List[str]): The roles for the synapse.
+        messages (List[str]): The messages for the synapse.
+        k (int): The number of uids to query.
+        timeout (float): The timeout for the queries.
+        exclude (list, optional): The list of uids to exclude from the query. Defaults to [].
+    """
+    bt.logging.debug("run_step", agent.task.name)
+
+    # Record event start time.
+    start_time = time.time()
+    uids, stream_tasks = await query_miners(
+        self, roles=roles, messages=messages, k=k, timeout=timeout, exclude=exclude, task=agent.task
+    )
+    handle_stream_responses_task = gather_stream_results(stream_tasks)
+
+    if not agent.task.static_reference:
+        reference_generation_task = generate_reference(agent)
+        _, stream_results = await asyncio.gather(
+            reference_generation_task, handle_stream_responses_task
+        )
+    else:
+        stream_results = await handle_stream_responses_task
+
+    event, top_response = await score_responses(
+        self, agent, uids, stream_results, timeout=timeout, start_time=start_time
+    )
     return event, top_response
 
 
+def select_fastest_response(stream_results: List[SynapseStreamResult]) -> str:
+    """Returns the non-empty completion of the miner whose stream finished first, or an empty string."""
+    completed = [
+        result
+        for result in stream_results
+        if result.exception is None and result.synapse.completion and result.accumulated_chunks_timings
+    ]
+    if not completed:
+        return ""
+    fastest = min(completed, key=lambda result: result.accumulated_chunks_timings[-1])
+    return fastest.synapse.completion
+
+
+async def score_organic_step(
+    self,
+    agent: HumanAgent,
+    uids: torch.LongTensor,
+    stream_tasks: List[asyncio.Task],
+    timeout: float,
+    start_time: float,
+    api_latency: float,
+):
+    """Generates the reference of an organic request and scores the miners once every stream has ended, after the
+    user has been answered. Stragglers that were not waited for are scored like the others. The rewards only update
+    the scores if the miners were sampled uniformly."""
+    uniform = self.config.neuron.organic_sampler == "uniform"
+    try:
+        # generate_reference() only works if static_reference is False
+        _static_ref = agent.task.static_reference
+        agent.task.static_reference = False
+        try:
+            _, stream_results = await asyncio.gather(
+                agent.task.agenerate_reference(self.llm_pipeline, clean=False),
+                gather_stream_results(stream_tasks),
+            )
+        finally:
+            agent.task.static_reference = _static_ref
+
+        event, _ = await score_responses(
+            self, agent, uids, stream_results, timeout=timeout, start_time=start_time, update_scores=uniform
+        )
+        event["organic_mode"] = "fast"
+        event["scores_updated"] = uniform
+        event["organic_sampler"] = self.config.neuron.organic_sampler
+        event["api_latency"] = api_latency
+        event.update(self.miner_sampler.__state_dict__(uids.tolist()))
+        event.update(self.api_latency.__state_dict__())
+        log_event(self, event)
+    except Exception as e:
+        unexpected_errors = serialize_exception_to_string(e)
+        bt.logging.error(f"Error while scoring organic request: {unexpected_errors}")
+        log_event(self, {"unexpected_errors": unexpected_errors})
+
+
+async def run_organic_step(self, request: DispatchRequest, problem: str):
+    """API fast lane: sends the user's question to the miners as is and answers the request as soon as a quorum of
+    miners has responded (see `--neuron.quorum_size`). The persona rewrite is skipped, and reference generation and
+    scoring of all the queried miners run in the background. At most `--neuron.max_background_scoring` requests are
+    answered or scored at any time."""
+    # The slot is held until the request has been scored, as the scoring outlives the forward.
+    await self.background_slots.acquire()
+    try:
+        start_time = time.time()
+        timeout = self.config.neuron.timeout
+
+        task = create_task(
+            llm_pipeline=self.llm_pipeline, task_name="math", problem=problem, create_reference=False
+        )
+        agent = HumanAgent(task=task, llm_pipeline=self.llm_pipeline, begin_conversation=False)
+        agent.challenge = encode_challenge(problem)
+        agent.challenge_time = 0
+
+        # Organic requests are sent to fast and reliable miners, unlike weight-setting steps.
+        sampler = self.miner_sampler if self.config.neuron.organic_sampler == "latency" else None
+        uids, stream_tasks = await query_miners(
+            self,
+            roles=["user"],
+            messages=[agent.challenge],
+            k=self.config.neuron.sample_size,
+            timeout=timeout,
+            sampler=sampler,
+        )
+        answer_check = has_final_answer if self.config.neuron.quorum_answer_check else None
+        completed = await wait_for_quorum(
+            stream_tasks, quorum=self.config.neuron.quorum_size, answer_check=answer_check
+        )
+
+        checked = [result for result in completed if answer_check is not None and answer_check(result)]
+        response = select_fastest_response(checked or completed)
+        request.set_result(
+            StreamCoreSynapse(roles=["validator"], messages=[response], completion=response)
+        )
+        api_latency = time.time() - request.created_at
+        self.api_latency.record("fast", api_latency)
+        bt.logging.info(
+            f"⚡ Answered organic request in {api_latency:.2f}s after {len(completed)}/{len(stream_tasks)} responses, scoring in the background"
+        )
+
+        scoring_task = asyncio.ensure_future(
+            score_organic_step(self, agent, uids, stream_tasks, timeout, start_time, api_latency)
+        )
+    except BaseException:
+        self.background_slots.release()
+        raise
+    self.background_tasks.add(scoring_task)
+    scoring_task.add_done_callback(self.background_tasks.discard)
+    scoring_task.add_done_callback(lambda _: self.background_slots.release())
+
+
 async def forward(self):
     """
     Encapsulates a full conversation between the validator and miners. Contains one or more rounds of request-response.
@@ -246,59 +575,37 @@ async def forward(self):
     """
     bt.logging.info("🚀 Starting forward loop...")
     forward_start_time = time.time()
-    
 
-    while True:
-        # get data in queue
+    # get data in queue
+    challenge = None
+    api_dispatcher = getattr(self, "api_dispatcher", None)
+    request = api_dispatcher.get_nowait() if api_dispatcher is not None else None
+    if request:
+        bt.logging.info(f"📡 Received request: {request}")
         try:
-            synapse = self.api_queue.get_nowait()
-            _message = urllib.parse.parse_qs(synapse.input_synapse.messages[0])
+            _message = urllib.parse.parse_qs(request.input_synapse.messages[0])
             _problem = _message.get('question_text', [''])[0]
-            bt.logging.info(f"📡 Received synapse: {synapse}")
-        except:
-            synapse = None
-            _problem = ''
-            bt.logging.info(f"🤖 Generate problem")
-            pass
-        
-        # Create a specific task
-        # task_name = np.random.choice(
-        #     self.config.neuron.tasks, p=self.config.neuron.task_p
-        # )
-        task_name = "math"
-        bt.logging.info(f"📋 Creating {task_name} task... ")
-        try:
-            task = create_task(
-                llm_pipeline=self.llm_pipeline,
-                translation_pipeline=self.translation_pipeline,
-                task_name=task_name,
-                create_reference=False,
-                problem=_problem
-            )
-            break
+            if self.config.neuron.organic_mode == "fast":
+                return await run_organic_step(self, request, _problem)
+            # Organic problems cannot be prefetched, so the challenge is built for this request.
+            challenge = await self.challenge_prefetcher.create(problem=_problem)
         except Exception as e:
             bt.logging.error(
-                f"Failed to create {task_name} task. {sys.exc_info()}. Skipping to next task."
+                f"Failed to create task for received request. {sys.exc_info()}. Falling back to a generated problem."
             )
-            if synapse: synapse.event.set()
-            continue
+            request.set_exception(e)
+            request = None
 
-    # Create random agent with task, topic, profile...
-    bt.logging.info(f"🤖 Creating agent for {task_name} task... ")
-    agent = HumanAgent(
-        task=task, llm_pipeline=self.llm_pipeline, begin_conversation=True
-    )
+    if challenge is None:
+        bt.logging.info(f"🤖 Generate problem")
+        challenge = await self.challenge_prefetcher.get()
+
+    task = challenge.task
+    agent = challenge.agent
 
     turn = 0
     exclude_uids = []
-    
-    # convert challenge into miner's message format
-    agent.challenge = urllib.parse.urlencode({
-        "question_text": agent.challenge,
-        "question_markdown": "",
-        "question_type": ""
-    })
-    
+
     roles = ['user']
     messages = [agent.challenge]
     while True:
@@ -315,16 +622,22 @@ async def forward(self):
                 timeout=self.config.neuron.timeout,
                 exclude=exclude_uids,
             )
-            if synapse:
-                synapse.output_synapse = StreamCoreSynapse(
-                    roles=["validator"], messages=[top_response], completion=top_response
+            if request:
+                request.set_result(
+                    StreamCoreSynapse(
+                        roles=["validator"], messages=[top_response], completion=top_response
+                    )
                 )
-                synapse.event.set()
-                self.api_queue.task_done()
+                event["organic_mode"] = "full"
+                event["api_latency"] = time.time() - request.created_at
+                self.api_latency.record("full", event["api_latency"])
+                event.update(self.api_latency.__state_dict__())
+                request = None
 
             # Adds forward time to event and logs it to wandb
             event["forward_time"] = time.time() - forward_start_time
             event["turn"] = turn
+            event.update(challenge.__state_dict__())
             log_event(self, event)
             task.complete = True
             
@@ -348,6 +661,8 @@ async def forward(self):
             messages.append(agent.challenge)
             turn += 1
 
+        except asyncio.CancelledError:
+            raise
         except BaseException as e:
             unexpected_errors = serialize_exception_to_string(e)
             bt.logging.error(
@@ -357,13 +672,9 @@ async def forward(self):
             event = {"unexpected_errors": unexpected_errors}
 
             log_event(self, event)
+            # Back off before retrying, so that a persistent error does not take over the event loop.
+            await asyncio.sleep(RETRY_DELAY)
             continue
 
     del agent
     del task
-    if not synapse:
-        # Make sure that the miner finishes the process of the current request and returns a response
-        # Otherwise, there is a case where the validator sends a new request while the miner is still processing the old one
-        # Then, the response of the old request will be applied as the response of the new request
-        bt.logging.info("💤 Sleep 5 seconds...")
-        time.sleep(5)
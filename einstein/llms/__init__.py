@@ -5,4 +5,5 @@ from .hf import (
     HuggingFaceLLM,
     CustomTextIteratorStreamer,
 )
+from .batching import MicroBatcher
 from .vllm_llm import vLLM_LLM, vLLMPipeline, load_vllm_pipeline
\ No newline at end of file
@@ -1,14 +1,41 @@
+import asyncio
+import functools
 import bittensor as bt
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from einstein.cleaners.cleaner import CleanerPipeline
 from typing import Any, Dict, List
 
 
 class BasePipeline(ABC):
+    # Number of worker threads available to sync-only backends for async generation.
+    max_concurrent_generations: int = 1
+
     @abstractmethod
     def __call__(self, composed_prompt: str, **kwargs: dict) -> Any:
         ...
 
+    @property
+    def generation_executor(self) -> ThreadPoolExecutor:
+        """Dedicated executor for generations, so they never queue behind other work on the default executor."""
+        if getattr(self, "_generation_executor", None) is None:
+            self._generation_executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_generations,
+                thread_name_prefix="generation",
+            )
+        return self._generation_executor
+
+    async def agenerate(self, composed_prompt: str, **kwargs: dict) -> Any:
+        """Generates without blocking the event loop.
+
+        Backends that are sync-only run on the bounded generation executor. Subclasses backed by an async engine
+        should override this method.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.generation_executor, functools.partial(self, composed_prompt, **kwargs)
+        )
+
 
 class BaseLLM(ABC):
     def __init__(
@@ -33,6 +60,15 @@ class BaseLLM(ABC):
     ) -> str:
         ...
 
+    async def aquery(
+        self,
+        message: str,
+        role: str = "user",
+        disregard_system_prompt: bool = False,
+        cleaner: CleanerPipeline = None,
+    ) -> str:
+        ...
+
     def forward(self, messages: List[Dict[str, str]]):
         ...
 
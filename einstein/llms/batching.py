@@ -0,0 +1,88 @@
+import time
+import queue
+import threading
+import bittensor as bt
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Gathers prompts submitted concurrently from several threads within a short window and generates them with a
+    single batched call.
+
+    Callers block until their own completion is ready, so the batcher is a drop-in replacement for a synchronous
+    `generate(prompt, **model_kwargs)` call. A batch is flushed when the window since its first prompt elapses or
+    when it reaches `max_batch_size` prompts.
+    """
+
+    def __init__(
+        self,
+        generate_batch: Callable[[List[str], List[Dict]], List[str]],
+        window: float = 0.02,
+        max_batch_size: int = 32,
+    ):
+        self.generate_batch = generate_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.num_batches = 0
+        self.num_prompts = 0
+        self._queue = queue.Queue()
+        self._thread: threading.Thread = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.num_prompts / self.num_batches if self.num_batches else 0.0
+
+    def submit(self, prompt: str, model_kwargs: Dict = None) -> Future:
+        """Queues a prompt for the next batch and returns a future holding its completion."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((prompt, model_kwargs or {}, future))
+        return future
+
+    def __call__(self, prompt: str, **model_kwargs: Dict) -> str:
+        return self.submit(prompt, model_kwargs).result()
+
+    def _ensure_started(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="micro-batcher")
+                self._thread.start()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.time() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            prompts = [prompt for prompt, _, _ in batch]
+            params = [model_kwargs for _, model_kwargs, _ in batch]
+            try:
+                outputs = self.generate_batch(prompts, params)
+            except Exception as e:
+                bt.logging.error(f"Batched generation of {len(prompts)} prompts failed: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.num_batches += 1
+            self.num_prompts += len(prompts)
+            bt.logging.debug(f"Generated a batch of {len(prompts)} prompts (average batch size: {self.average_batch_size:.2f})")
+            for (_, _, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(window={self.window}, max_batch_size={self.max_batch_size}, average_batch_size={self.average_batch_size:.2f})"
+
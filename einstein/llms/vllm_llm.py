@@ -1,11 +1,12 @@
-import gc
 import time
-import torch
+import asyncio
+import threading
 import bittensor as bt
-from typing import List, Dict
+from typing import List, Dict, Union
 from vllm import LLM, SamplingParams
 from einstein.cleaners.cleaner import CleanerPipeline
 from einstein.llms import BasePipeline, BaseLLM
+from einstein.llms.batching import MicroBatcher
 from einstein.mock import MockPipeline
 from einstein.llms.utils import calculate_gpu_requirements
 
@@ -45,29 +46,86 @@ class vLLMPipeline(BasePipeline):
         llm_max_allowed_memory_in_gb: int,
         device: str = None,
         gpus: int = 1,
-        mock: bool = False
+        mock: bool = False,
+        batch_window: float = 0.0,
+        max_batch_size: int = 32,
     ):
         super().__init__()
         self.llm = load_vllm_pipeline(model_id, device, gpus, llm_max_allowed_memory_in_gb, mock)
         self.mock = mock
         self.gpus = gpus
-        self.tokenizer = self.llm.llm_engine.tokenizer.tokenizer
+        if mock:
+            self.tokenizer = self.llm.tokenizer
+        else:
+            self.tokenizer = self.llm.llm_engine.tokenizer.tokenizer
+        # The engine is shared by the forward loop and the challenge prefetcher thread, but is not thread-safe.
+        self._generate_lock = threading.Lock()
+
+        # Concurrent calls are gathered within batch_window seconds into a single generate call.
+        self.batcher = None
+        if batch_window > 0:
+            self.batcher = MicroBatcher(
+                generate_batch=lambda prompts, sampling_params: self.generate_batch(prompts, sampling_params),
+                window=batch_window,
+                max_batch_size=max_batch_size,
+            )
+
+    @staticmethod
+    def make_sampling_params(model_kwargs: Dict) -> SamplingParams:
+        """Composes vLLM sampling params from the model kwargs of an LLM."""
+        return SamplingParams(
+            temperature=model_kwargs.get("temperature", 0.8),
+            top_p=model_kwargs.get("top_p", 0.95),
+            max_tokens=model_kwargs.get("max_tokens", 256),
+        )
 
     def __call__(self, composed_prompt: str, **model_kwargs: Dict) -> str:
-        if self.mock:
-            return self.llm(composed_prompt, **model_kwargs)
-
-        # Compose sampling params
-        temperature = model_kwargs.get("temperature", 0.8)
-        top_p = model_kwargs.get("top_p", 0.95)
-        max_tokens = model_kwargs.get("max_tokens", 256)
-
-        sampling_params = SamplingParams(
-            temperature=temperature, top_p=top_p, max_tokens=max_tokens
-        )
-        output = self.llm.generate(composed_prompt, sampling_params, use_tqdm=True)
-        response = output[0].outputs[0].text
-        return response
+        if self.batcher is not None:
+            return self.batcher(composed_prompt, **model_kwargs)
+        return self.generate_batch([composed_prompt], model_kwargs)[0]
+
+    async def agenerate(self, composed_prompt: str, **model_kwargs: Dict) -> str:
+        """Generates without blocking the event loop.
+
+        With micro-batching enabled, the batcher thread acts as the async engine: the prompt is queued for the next
+        batch and its future is awaited directly, so no executor thread is held while waiting on the GPU.
+        """
+        if self.batcher is not None:
+            return await asyncio.wrap_future(self.batcher.submit(composed_prompt, model_kwargs))
+        return await super().agenerate(composed_prompt, **model_kwargs)
+
+    def generate_batch(
+        self, prompts: List[str], sampling_params: Union[Dict, List[Dict]] = None
+    ) -> List[str]:
+        """Generates completions for several prompts with a single engine call.
+
+        Args:
+            prompts (List[str]): Composed prompts to generate completions for.
+            sampling_params (Union[Dict, List[Dict]], optional): Model kwargs shared by all prompts, or one per prompt.
+
+        Returns:
+            List[str]: The completions, in the same order as the prompts.
+        """
+        if sampling_params is None or isinstance(sampling_params, dict):
+            sampling_params = [sampling_params or {}] * len(prompts)
+        if len(sampling_params) != len(prompts):
+            raise ValueError(
+                f"Got {len(sampling_params)} sampling params for {len(prompts)} prompts."
+            )
+
+        with self._generate_lock:
+            if self.mock:
+                return [
+                    self.llm(prompt, **model_kwargs)
+                    for prompt, model_kwargs in zip(prompts, sampling_params)
+                ]
+
+            outputs = self.llm.generate(
+                prompts,
+                [self.make_sampling_params(model_kwargs) for model_kwargs in sampling_params],
+                use_tqdm=True,
+            )
+        return [output.outputs[0].text for output in outputs]
 
 
 class vLLM_LLM(BaseLLM):
@@ -108,6 +166,23 @@ class vLLM_LLM(BaseLLM):
 
         t0 = time.time()
         response = self.forward(messages=messages)
+        return self._record_response(messages, response, cleaner, t0)
+
+    async def aquery(
+        self,
+        message: str,
+        role: str = "user",
+        disregard_system_prompt: bool = False,
+        cleaner: CleanerPipeline = None,
+    ):
+        """Async counterpart of `query` that awaits the pipeline instead of blocking the event loop."""
+        messages = self.messages + [{"content": message, "role": role}]
+
+        t0 = time.time()
+        response = await self.aforward(messages=messages)
+        return self._record_response(messages, response, cleaner, t0)
+
+    def _record_response(self, messages: List[Dict[str, str]], response: str, cleaner: CleanerPipeline, t0: float) -> str:
         response = self.clean_response(cleaner, response)
 
         self.messages = messages
@@ -141,6 +216,16 @@ class vLLM_LLM(BaseLLM):
 
         return response
 
+    async def aforward(self, messages: List[Dict[str, str]]):
+        composed_prompt = self._make_prompt(messages)
+        response = await self.llm_pipeline.agenerate(composed_prompt, **self.model_kwargs)
+
+        bt.logging.info(
+            f"{self.__class__.__name__} generated the following output:\n{response}"
+        )
+
+        return response
+
 
 if __name__ == "__main__":
     # Example usage
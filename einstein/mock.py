@@ -60,6 +60,9 @@ class MockPipeline:
     def __call__(self, composed_prompt, **kwargs):
         return self.forward(composed_prompt, **kwargs)
 
+    async def agenerate(self, composed_prompt, **kwargs):
+        return self.forward(composed_prompt, **kwargs)
+
     def forward(self, messages, **kwargs):
         output = self.model(messages)
         return self.postprocess(output)
@@ -0,0 +1,165 @@
+import time
+import asyncio
+import urllib.parse
+import bittensor as bt
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from einstein.agent import HumanAgent
+from einstein.tasks import Task
+from einstein.conversation import create_task
+from einstein.llms import BasePipeline
+from einstein.utils.exceptions import MaxRetryError
+
+
+def encode_challenge(challenge: str) -> str:
+    """Converts a challenge into the miner's message format."""
+    return urllib.parse.urlencode(
+        {"question_text": challenge, "question_markdown": "", "question_type": ""}
+    )
+
+
+@dataclass
+class PreparedChallenge:
+    """A challenge that is ready to be sent to the miners."""
+
+    task: Task
+    agent: HumanAgent
+    message: str
+    generation_time: float
+    created_at: float
+    wait_time: float = 0.0
+    queue_depth: int = 0
+
+    def __state_dict__(self):
+        return {
+            "challenge_generation_time": self.generation_time,
+            "challenge_queue_time": time.time() - self.created_at,
+            "challenge_wait_time": self.wait_time,
+            "challenge_queue_depth": self.queue_depth,
+        }
+
+
+class ChallengePrefetcher:
+    """
+    Background producer that builds the next challenges (task, agent and encoded message) while the current step
+    is waiting on the miners, so that a forward only has to pop a ready-to-send challenge from a bounded queue.
+
+    Challenges are built on a dedicated worker thread because task creation and persona generation are blocking.
+    """
+
+    def __init__(
+        self,
+        llm_pipeline: BasePipeline,
+        task_name: str = "math",
+        maxsize: int = 2,
+        max_retries: int = 10,
+        retry_delay: float = 1.0,
+    ):
+        self.llm_pipeline = llm_pipeline
+        self.task_name = task_name
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.queue: asyncio.Queue = None
+        self.producer: asyncio.Task = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="challenge")
+
+    def build(self, problem: str = "") -> PreparedChallenge:
+        """Creates a task and an agent for it, and encodes the agent challenge for the miners."""
+        t0 = time.time()
+        bt.logging.info(f"📋 Creating {self.task_name} task... ")
+        task = create_task(
+            llm_pipeline=self.llm_pipeline, task_name=self.task_name, problem=problem
+        )
+
+        # Create random agent with task, topic, profile...
+        bt.logging.info(f"🤖 Creating agent for {self.task_name} task... ")
+        agent = HumanAgent(
+            task=task, llm_pipeline=self.llm_pipeline, begin_conversation=True
+        )
+        agent.challenge = encode_challenge(agent.challenge)
+
+        return PreparedChallenge(
+            task=task,
+            agent=agent,
+            message=agent.challenge,
+            generation_time=time.time() - t0,
+            created_at=time.time(),
+        )
+
+    async def create(self, problem: str = "") -> PreparedChallenge:
+        """Builds a challenge on the worker thread without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.build, problem)
+
+    async def produce(self):
+        """Keeps the queue filled with ready challenges, waiting whenever it is full."""
+        failures = 0
+        while True:
+            try:
+                challenge = await self.create()
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                bt.logging.error(
+                    f"Failed to create {self.task_name} challenge ({failures}/{self.max_retries}): {e}"
+                )
+                if failures >= self.max_retries:
+                    bt.logging.error("Challenge prefetcher giving up after repeated failures.")
+                    raise MaxRetryError(
+                        f"Failed to create a {self.task_name} challenge {failures} times in a row: {e}"
+                    ) from e
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            await self.queue.put(challenge)
+            bt.logging.debug(
+                f"Challenge ready in {challenge.generation_time:.2f}s | queue depth: {self.queue.qsize()}/{self.maxsize}"
+            )
+
+    def start(self):
+        """Starts the producer on the running event loop, if it is not already running."""
+        if self.producer is not None and not self.producer.done():
+            return
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.producer = asyncio.ensure_future(self.produce())
+
+    def stop(self):
+        if self.producer is not None:
+            self.producer.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def get(self) -> PreparedChallenge:
+        """Pops the next ready challenge, waiting for the producer if the queue is empty.
+
+        Raises:
+            MaxRetryError: If the producer gave up while the queue was empty. It is restarted by the next call.
+        """
+        self.start()
+        queue_depth = self.queue.qsize()
+
+        t0 = time.time()
+        getter = asyncio.ensure_future(self.queue.get())
+        try:
+            await asyncio.wait({getter, self.producer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if not getter.done():
+            # The producer has stopped and no challenge will ever be queued.
+            self.producer.result()
+        challenge = getter.result()
+        challenge.wait_time = time.time() - t0
+        challenge.queue_depth = queue_depth
+
+        bt.logging.info(
+            f"⏩ Popped prefetched challenge (queue depth: {queue_depth}, generation time: {challenge.generation_time:.2f}s, wait time: {challenge.wait_time:.2f}s)"
+        )
+        return challenge
+
+    def __repr__(self):
+        depth = self.queue.qsize() if self.queue is not None else 0
+        return f"{self.__class__.__name__}(task_name={self.task_name!r}, queue_depth={depth}/{self.maxsize})"
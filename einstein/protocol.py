@@ -18,6 +18,13 @@ class ClientRequestSynapse(bt.Synapse):
         ..., title="Question Type", description="", allow_mutation=False
     )
 
+    priority: str = pydantic.Field(
+        "normal",
+        title="Priority",
+        description="Priority class of the request: high, normal or low.",
+        allow_mutation=False,
+    )
+
 
 class StreamCoreSynapse(bt.StreamingSynapse):
     """
@@ -42,6 +49,9 @@ class StreamCoreSynapse(bt.StreamingSynapse):
                           product or result of the streaming process.
     - `required_hash_fields` (List[str]): A list of fields that are required for the hash.
 
+    - `request_nonce` (str): Unique identifier of the validator request, under which the validator keeps track of the
+                             miners that are still answering it.
+
     Methods:
     - `process_streaming_response`: This method asynchronously processes the incoming streaming response by decoding
                                     the tokens and accumulating them in the `completion` attribute.
@@ -76,6 +86,12 @@ class StreamCoreSynapse(bt.StreamingSynapse):
         allow_mutation=False,
     )
 
+    request_nonce: str = pydantic.Field(
+        "",
+        title="Request Nonce",
+        description="Unique identifier of the request.",
+    )
+
     completion: str = pydantic.Field(
         "",
         title="Completion",
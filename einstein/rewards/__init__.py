@@ -1,5 +1,6 @@
 from .reward import (
     BaseRewardModel,
+    IncrementalScorer,
     RewardResult,
     RewardEvent,
     BatchRewardOutput,
@@ -7,4 +8,7 @@ from .reward import (
 )
 
 from .advanced_math import AdvancedMathModel
+from .streaming import StreamingRewardModel
+from .executor import RewardExecutor, ExecutorResult
+from .cache import RewardCache
 from .pipeline import RewardPipeline, REWARD_MODELS
\ No newline at end of file
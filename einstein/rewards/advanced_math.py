@@ -1,13 +1,60 @@
 import time
 import torch
-import re
+import itertools
+import numpy as np
 from typing import List
-from sympy.parsing.sympy_parser import parse_expr
-from einstein.rewards import BaseRewardModel, BatchRewardOutput, RewardModelTypeEnum
+from einstein.rewards import BaseRewardModel, BatchRewardOutput, IncrementalScorer
 from einstein.dendrite import DendriteResponseEvent
+from einstein.rewards.equivalence import EQUIVALENCE_ENGINE
+from einstein.rewards.extraction import (
+    FINAL_ANSWER_MARKER,
+    MARKER_PATTERN,
+    MAX_SCAN_LENGTH,
+    NUMERIC_PATTERN,
+    answer_text,
+    extract_final_answer,
+    parse_number,
+    tokenize_numbers,
+)
+
+# Integers up to this magnitude, and their differences, are exactly representable as float64.
+MAX_EXACT_INT = 2**52
+
+
+class AdvancedMathScorer(IncrementalScorer):
+    """Locates the last final answer marker while the completion is streamed, so that only the text after it has to
+    be parsed once the stream ends."""
+
+    def __init__(self, reference: str):
+        super().__init__(reference)
+        self.answer_start: int = None
+        self._tail = ""
+
+    def reset(self):
+        super().reset()
+        self.answer_start = None
+        self._tail = ""
+
+    def _consume(self, chunk: str, offset: int):
+        # Keep the end of the previous chunks, so that a marker split across chunks is still found.
+        window = self._tail + chunk
+        for match in MARKER_PATTERN.finditer(window):
+            self.answer_start = offset - len(self._tail) + match.start()
+        self._tail = window[-(len(FINAL_ANSWER_MARKER) - 1):]
+
+    def _score(self, completion: str) -> float:
+        # The last marker is only used if it is scanned by the extractor and is followed by an answer, otherwise the
+        # whole completion is scored.
+        if self.answer_start is not None and self.answer_start >= len(completion) - MAX_SCAN_LENGTH:
+            answer = completion[self.answer_start:]
+            if extract_final_answer(answer) is not None:
+                return AdvancedMathModel.math_score(self.reference, answer)
+        return AdvancedMathModel.math_score(self.reference, completion)
 
 
 class AdvancedMathModel(BaseRewardModel):
+    completion_only = True
+
     @property
     def name(self) -> str:
         return "advanced_math"
@@ -27,8 +74,7 @@ class AdvancedMathModel(BaseRewardModel):
             list of float: A list of extracted numeric values.
         """
         if isinstance(data, str):
-            numeric_values = re.findall(r"[-+]?\d*\.\d+|\d+", data)
-            return [float(value) if '.' in value else int(value) for value in numeric_values]
+            return [parse_number(value) for value in tokenize_numbers(data)]
         elif isinstance(data, int) or isinstance(data, float):
             return [data]
         elif isinstance(data, list):
@@ -45,7 +91,8 @@ class AdvancedMathModel(BaseRewardModel):
     @staticmethod
     def extract_final_answer(text: str):
         """
-        Extracts the final answer from a given text based on a specific sentence structure.
+        Extracts the final answer from a given text based on a specific sentence structure, i.e. the rest of the line
+        after the last "the final answer is" near the end of the text (see `extraction.extract_final_answer`).
         
         Args:
             text (str): The text from which to extract the final answer.
@@ -53,12 +100,7 @@ class AdvancedMathModel(BaseRewardModel):
         Returns:
             str: The extracted final answer, or None if not found.
         """
-        # Regular expression to match the pattern and extract the final answer
-        match = re.search(r"the final answer is\:?\s*(.+)", text, re.IGNORECASE)
-        if match:
-            return match.group(1)
-        else:
-            return None
+        return extract_final_answer(text)
 
     @staticmethod
     def math_score(reference: str, completion: str) -> float:
@@ -73,11 +115,9 @@ class AdvancedMathModel(BaseRewardModel):
         Returns:
             float: A score between 0 and 1 indicating the closeness or match of the completion to the reference.
         """
-        extracted_answer = AdvancedMathModel.extract_final_answer(completion)
-        if extracted_answer:
-            comparison_values = sorted(AdvancedMathModel.extract_numeric_values(extracted_answer))
-        else:
-            comparison_values = sorted(AdvancedMathModel.extract_numeric_values(completion))
+        # The final answer, or the end of the completion if it has none.
+        answer = answer_text(completion)
+        comparison_values = sorted(AdvancedMathModel.extract_numeric_values(answer))
 
         reference_values = sorted(AdvancedMathModel.extract_numeric_values(reference))
 
@@ -91,26 +131,91 @@ class AdvancedMathModel(BaseRewardModel):
                 return 0.0
 
         final_score = sum(scores) / len(scores) if scores else 0
-        
+
+        # Equivalent forms of the reference, e.g. "1/2" or "2*0.25" for "0.5", get full marks.
+        if final_score < 1 and EQUIVALENCE_ENGINE.equivalent(reference, answer):
+            return 1.0
+
         return final_score
 
+    def incremental_scorer(self, reference: str) -> AdvancedMathScorer:
+        return AdvancedMathScorer(reference)
+
+    def completion_scorer(self):
+        return AdvancedMathModel.math_score
+
+    def batch_extra_info(self) -> dict:
+        return {"type": "math"}
+
     def reward(self, reference: str, response_event: DendriteResponseEvent) -> BatchRewardOutput:
         """Compute difference scores given a completion and reference pair."""
-        rewards = []
-        timings = []
         completions: List[str] = response_event.completions
 
-        for completion in completions:
-            t0 = time.time()
-            reward = self.math_score(reference, completion)
-            timings.append(time.time() - t0)
-            rewards.append(reward)
+        t0 = time.time()
+        rewards = BatchMathScorer(reference).score(completions)
+        # Completions are scored together, so each one is attributed an equal share of the batch time.
+        timings = [(time.time() - t0) / max(len(completions), 1)] * len(completions)
 
         output = BatchRewardOutput(
             rewards=torch.FloatTensor(rewards),
             timings=torch.FloatTensor(timings),
-            extra_info={
-                "type": "math",
-            },
+            extra_info=self.batch_extra_info(),
         )
         return output
+
+
+class BatchMathScorer:
+    """
+    Vectorized equivalent of `AdvancedMathModel.math_score` for a batch of completions sharing a reference.
+
+    The reference is parsed once, the numeric values of all the completions are packed into a padded array that is
+    sorted row-wise, and the closeness to the sorted reference values is computed in a single NumPy pass. Scores are
+    identical to `math_score`: completions with numbers too long to be exact in float64 are scored by it instead,
+    and each row is averaged with the built-in sum.
+    """
+
+    # Numbers of at most this many characters (sign included) are exactly representable in float64 if they are
+    # integers, and so are their differences.
+    max_exact_length = len(str(MAX_EXACT_INT)) - 1
+
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.reference_values = sorted(AdvancedMathModel.extract_numeric_values(reference))
+        self.reference_array = np.array(self.reference_values, dtype=np.float64)
+        self.exact = all(
+            not isinstance(value, int) or abs(value) <= MAX_EXACT_INT for value in self.reference_values
+        )
+
+    def score(self, completions: List[str]) -> List[float]:
+        width = len(self.reference_values)
+        if not width or not self.exact:
+            return [AdvancedMathModel.math_score(self.reference, completion) for completion in completions]
+
+        answers = [answer_text(completion) for completion in completions]
+        rows = [NUMERIC_PATTERN.findall(answer) for answer in answers]
+        fallback = [i for i, row in enumerate(rows) if max(map(len, row), default=0) > self.max_exact_length]
+        for i in fallback:
+            rows[i] = []
+
+        # Pack the values into a (completions, max values) array, padded with +inf so that padding sorts last.
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter(map(float, itertools.chain.from_iterable(rows)), dtype=np.float64, count=lengths.sum())
+        padded = np.full((len(rows), max(lengths.max(initial=0), width)), np.inf)
+        padded[np.arange(padded.shape[1]) < lengths[:, None]] = values
+        comparison = np.sort(padded, axis=1)[:, :width]
+
+        with np.errstate(invalid="ignore"):
+            closeness = 1 - np.abs(self.reference_array - comparison) / np.maximum(np.abs(self.reference_array), 1)
+        closeness = np.where(np.isnan(closeness), 0.0, np.clip(closeness, 0, 1))
+
+        num_scores = np.minimum(lengths, width)
+        scores = [
+            sum(row[:n]) / n if n else 0
+            for row, n in zip(closeness.tolist(), num_scores.tolist())
+        ]
+        for i, score in enumerate(scores):
+            if score < 1 and EQUIVALENCE_ENGINE.equivalent(self.reference, answers[i]):
+                scores[i] = 1.0
+        for i in fallback:
+            scores[i] = AdvancedMathModel.math_score(self.reference, completions[i])
+        return scores
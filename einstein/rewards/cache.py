@@ -0,0 +1,74 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+class RewardCache:
+    """
+    Bounded memo of the rewards of single completions, shared across steps and turns.
+
+    Entries are keyed by a hash of the reward model name, its parameters, the reference and the completion, so the
+    cache does not hold on to the completions themselves. An entry expires `ttl` seconds after it was stored, and the
+    least recently used entries are evicted beyond `maxsize`. The cache is thread-safe, since reward models may be
+    applied concurrently.
+    """
+
+    def __init__(self, maxsize: int = 65536, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, params: str, reference: str, completion: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (model_name, params, reference, completion):
+            data = part.encode("utf-8", "surrogatepass")
+            # Length-prefix each part so that different splits of the same text cannot collide.
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.digest()
+
+    def lookup(self, keys: List[bytes]) -> List[Optional[float]]:
+        """Returns the cached reward of each key, or None if it is missing or expired."""
+        now = self.clock()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    values.append(None)
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    values.append(entry[0])
+        return values
+
+    def store(self, items: Iterable[Tuple[bytes, float]]):
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(size={len(self)}, maxsize={self.maxsize}, ttl={self.ttl}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,201 @@
+import re
+import math
+import cmath
+import sympy
+import threading
+import multiprocessing
+import bittensor as bt
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+from einstein.rewards.executor import RewardExecutor
+from sympy.parsing.sympy_parser import (
+    parse_expr,
+    standard_transformations,
+    implicit_multiplication_application,
+    convert_xor,
+)
+
+TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application, convert_xor)
+
+# Answers are evaluated by sympy, so only plain arithmetic expressions over single letter symbols and a few
+# functions are accepted: no attribute access, underscores, quotes, indexing or keyword arguments.
+ALLOWED_EXPRESSION = re.compile(r"[0-9a-z+\-*/^().\s]+")
+ALLOWED_NAMES = {"sqrt", "pi", "e", "i", "sin", "cos", "tan", "log", "ln", "exp", "abs"}
+NAME = re.compile(r"[a-z]+")
+# Powers are only accepted with a small number, small fraction or single symbol exponent, and cannot be chained,
+# so that answers such as "9^9^9^9" or "9^(1-10^9)" are never evaluated.
+SAFE_EXPONENT = (
+    r"\s*(?:-?\d{1,2}(?:\.\d+)?(?![\d.])"
+    r"|\(\s*-?\d{1,2}(?:\.\d+)?\s*(?:/\s*\d{1,2}\s*)?\)"
+    r"|[a-z](?![a-z(]))"
+    r"(?!\s*(?:\^|\*\*))"
+)
+UNSAFE_POWER = re.compile(r"(?:\*\*|\^)(?!" + SAFE_EXPONENT + ")")
+
+LATEX_REPLACEMENTS = [
+    (re.compile(r"\\[dt]?frac\{([^{}]*)\}\{([^{}]*)\}"), r"(\1)/(\2)"),
+    (re.compile(r"\\sqrt\{([^{}]*)\}"), r"sqrt(\1)"),
+    (re.compile(r"\\(cdot|times)"), "*"),
+    (re.compile(r"\\(left|right|,|;|!|\s)"), ""),
+    (re.compile(r"\\pi"), "pi"),
+    (re.compile(r"\\boxed\{(.*)\}"), r"\1"),
+]
+
+# Bounds on the expansion of an answer: its number of terms once expanded, and its degree, which is also the number
+# of digits of its integers, e.g. "(a+b+c+d+f+g+h)^40" has millions of terms and "((9^99)^99)^99" about a million
+# digits.
+MAX_EXPANDED_TERMS = 1024
+MAX_DEGREE = 10000
+
+Canonical = Union[complex, sympy.Expr]
+
+
+def expansion_bounds(expr: sympy.Basic) -> Tuple[int, int]:
+    """Upper bounds on the number of terms and on the degree of an unevaluated expression once it is evaluated and
+    expanded, or (inf, inf) as soon as one exceeds its limit."""
+    unbounded = (math.inf, math.inf)
+    if expr.is_Integer:
+        return 1, len(str(abs(int(expr))))
+    if expr.is_Rational:
+        return 1, len(str(abs(expr.p))) + len(str(expr.q))
+    if expr.is_Atom:
+        return 1, 1
+
+    bounds = [expansion_bounds(arg) for arg in expr.args]
+    if unbounded in bounds:
+        return unbounded
+    if expr.is_Add:
+        terms, degree = sum(t for t, _ in bounds), max(d for _, d in bounds)
+    elif expr.is_Mul:
+        terms, degree = math.prod(t for t, _ in bounds), sum(d for _, d in bounds)
+    elif expr.is_Pow and expr.exp.is_Integer:
+        (base_terms, base_degree), n = bounds[0], abs(int(expr.exp))
+        if n * base_degree > MAX_DEGREE:
+            return unbounded
+        # Number of monomials of degree n in base_terms variables.
+        terms, degree = math.comb(base_terms + n - 1, n), n * base_degree
+    else:
+        # Functions and powers with a non-integer exponent are not expanded as a whole, only their arguments are.
+        terms, degree = 1, max(d for _, d in bounds)
+    if terms > MAX_EXPANDED_TERMS or degree > MAX_DEGREE:
+        return unbounded
+    return terms, degree
+
+
+def canonicalize(normalized: str) -> Optional[Canonical]:
+    """Parses a safe normalized answer into its canonical form: a complex value for numbers, or the expansion of an
+    expression. Answers whose expansion is too large are rejected before being evaluated."""
+    try:
+        expression = normalized.replace("ln", "log")
+        unevaluated = parse_expr(expression, transformations=TRANSFORMATIONS, evaluate=False)
+        if not isinstance(unevaluated, sympy.Expr) or math.inf in expansion_bounds(unevaluated):
+            return None
+        expr = parse_expr(expression, transformations=TRANSFORMATIONS)
+        if not isinstance(expr, sympy.Expr):
+            return None
+        if not expr.free_symbols:
+            value = complex(sympy.N(expr))
+            return value if not (cmath.isnan(value) or cmath.isinf(value)) else None
+        return sympy.expand(expr)
+    except Exception as e:
+        bt.logging.trace(f"Could not canonicalize answer {normalized!r}: {e}")
+        return None
+
+
+_executor: RewardExecutor = None
+_executor_lock = threading.Lock()
+
+
+def isolated_executor(timeout: float) -> Optional[RewardExecutor]:
+    """Worker process shared by the engines of a process, in which answers are canonicalized with a hard timeout. None
+    in the worker processes of a RewardExecutor, which already run under a hard timeout and cannot start processes."""
+    global _executor
+    if multiprocessing.current_process().daemon:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = RewardExecutor(max_workers=1, timeout=timeout, preload=("einstein.rewards.equivalence",))
+        return _executor
+
+
+class EquivalenceEngine:
+    """
+    Decides whether two answers are mathematically equivalent, e.g. "1/2", "0.5" and "2*0.25".
+
+    Each answer is normalized, then parsed and canonicalized once: numbers become a complex value and expressions
+    are expanded. The canonical forms are kept in a bounded LRU cache keyed on the normalized string, so that the
+    answers shared by many miners, and the reference of a step, are only parsed once.
+
+    Answers are canonicalized in a separate worker process that is killed after `timeout` seconds, so that an answer
+    that makes sympy hang is rejected instead of stalling the validator.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        max_length: int = 64,
+        rel_tol: float = 1e-9,
+        abs_tol: float = 1e-12,
+        timeout: float = 1.0,
+    ):
+        self.max_length = max_length
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.timeout = timeout
+        self._canonical = lru_cache(maxsize=maxsize)(self._canonicalize)
+
+    @staticmethod
+    def normalize(answer: str) -> str:
+        """Strips math delimiters, LaTeX markup and trailing punctuation, and lowercases the answer."""
+        answer = answer.strip().strip("$").strip()
+        for pattern, replacement in LATEX_REPLACEMENTS:
+            answer = pattern.sub(replacement, answer)
+        answer = answer.replace("{", "(").replace("}", ")")
+        answer = " ".join(answer.split()).rstrip(".,;:!").lower()
+        return answer
+
+    def is_safe(self, normalized: str) -> bool:
+        if not normalized or len(normalized) > self.max_length:
+            return False
+        if not ALLOWED_EXPRESSION.fullmatch(normalized) or UNSAFE_POWER.search(normalized):
+            return False
+        return all(len(name) == 1 or name in ALLOWED_NAMES for name in NAME.findall(normalized))
+
+    def _canonicalize(self, normalized: str) -> Optional[Canonical]:
+        if not self.is_safe(normalized):
+            return None
+        executor = isolated_executor(self.timeout)
+        if executor is None:
+            return canonicalize(normalized)
+        result = executor.map(canonicalize, [(normalized,)], timeout=self.timeout)[0]
+        if result.timed_out or result.error is not None:
+            return None
+        return result.value
+
+    def canonical(self, answer: str) -> Optional[Canonical]:
+        """Canonical form of an answer, or None if it is not a parsable expression."""
+        # Skip the normalization of long texts, such as completions without a final answer.
+        if len(answer) > 4 * self.max_length:
+            return None
+        return self._canonical(self.normalize(answer))
+
+    def equivalent(self, reference: str, answer: str) -> bool:
+        canonical_reference = self.canonical(reference)
+        if canonical_reference is None:
+            return False
+        canonical_answer = self.canonical(answer)
+        if canonical_answer is None:
+            return False
+        if isinstance(canonical_reference, complex) and isinstance(canonical_answer, complex):
+            return cmath.isclose(canonical_reference, canonical_answer, rel_tol=self.rel_tol, abs_tol=self.abs_tol)
+        return canonical_reference == canonical_answer
+
+    def cache_info(self):
+        return self._canonical.cache_info()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(max_length={self.max_length}, cache={self.cache_info()})"
+
+
+# Shared by the reward models of a process, so that the cache persists across steps.
+EQUIVALENCE_ENGINE = EquivalenceEngine()
@@ -0,0 +1,226 @@
+import time
+import atexit
+import importlib
+import threading
+import traceback
+import multiprocessing
+import bittensor as bt
+from multiprocessing.connection import Connection, wait
+from dataclasses import dataclass
+from typing import Any, Callable, List, Sequence, Tuple
+
+
+def _worker_main(conn: Connection, preload: Sequence[str]):
+    """Worker loop: imports the preloaded modules once, then scores (fn, args) jobs until it receives None."""
+    for module in preload:
+        importlib.import_module(module)
+    conn.send("ready")
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        fn, args = job
+        try:
+            conn.send((True, fn(*args)))
+        except Exception:
+            conn.send((False, traceback.format_exc()))
+
+
+@dataclass
+class ExecutorResult:
+    value: float = 0.0
+    time: float = 0.0
+    timed_out: bool = False
+    error: str = None
+
+
+class _Worker:
+    def __init__(self, context, preload: Sequence[str]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, tuple(preload)), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.job: int = None
+        self.deadline: float = None
+        self.start_time: float = None
+
+    def poll_ready(self) -> bool:
+        """Checks without blocking whether the worker has started. Raises RuntimeError if it failed to start."""
+        if not self.ready and self.conn.poll():
+            try:
+                message = self.conn.recv()
+            except EOFError:
+                message = None
+            if message != "ready":
+                raise RuntimeError("Reward worker failed to start.")
+            self.ready = True
+        return self.ready
+
+    def submit(self, job: int, fn: Callable, args: Tuple, timeout: float):
+        self.job = job
+        self.start_time = time.time()
+        self.deadline = self.start_time + timeout
+        self.conn.send((fn, args))
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+
+
+class RewardExecutor:
+    """
+    Warm pool of worker processes that scores completions in parallel with a hard per-completion timeout.
+
+    Unlike a ProcessPoolExecutor, a job that exceeds its timeout is stopped by killing its worker, which is replaced
+    by one of num_spares workers started in advance, so that the pool does not wait for a new process to import its
+    modules. The job is reported as timed out with a score of 0, so that a single adversarial completion
+    (e.g. an expression that hangs the symbolic parser) can neither stall a step nor tie up a worker.
+    Scoring functions must be picklable, i.e. defined at module or class level.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        timeout: float = 1.0,
+        preload: Sequence[str] = ("einstein.rewards",),
+        start_method: str = "spawn",
+        num_spares: int = 1,
+    ):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.preload = tuple(preload)
+        self.context = multiprocessing.get_context(start_method)
+        self.num_timeouts = 0
+        self._lock = threading.Lock()
+        self.num_spares = num_spares
+        self.workers: List[_Worker] = [self._spawn() for _ in range(self.max_workers)]
+        self.spares: List[_Worker] = [self._spawn() for _ in range(self.num_spares)]
+        for worker in self.workers:
+            self._wait_ready(worker)
+        atexit.register(self.close)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self.context, self.preload)
+
+    def _started(self, worker: _Worker) -> bool:
+        """Returns whether a worker has started, dropping it if it failed to."""
+        try:
+            return worker.poll_ready()
+        except RuntimeError as e:
+            bt.logging.error(f"{e} Dropping it from the pool.")
+            worker.kill()
+            if worker in self.workers:
+                self.workers.remove(worker)
+            else:
+                self.spares.remove(worker)
+            return False
+
+    def _replace(self, worker: _Worker):
+        """Kills a worker and swaps in a spare, preferably one that has started. A new spare is started in the
+        background: nothing here waits for a process to be ready."""
+        worker.kill()
+        started = [spare for spare in list(self.spares) if self._started(spare)]
+        if started or self.spares:
+            replacement = (started or self.spares)[0]
+            self.spares.remove(replacement)
+        else:
+            replacement = self._spawn()
+        self.workers[self.workers.index(worker)] = replacement
+        while len(self.spares) < self.num_spares:
+            self.spares.append(self._spawn())
+
+    def _wait_ready(self, worker: _Worker):
+        if worker.conn.recv() != "ready":
+            raise RuntimeError("Reward worker failed to start.")
+        worker.ready = True
+
+    def map(self, fn: Callable, args_list: List[Tuple], timeout: float = None) -> List[ExecutorResult]:
+        """Calls fn(*args) for each args in args_list on the workers and returns the results in order.
+
+        Args:
+            fn (Callable): Picklable scoring function.
+            args_list (List[Tuple]): The arguments of each call.
+            timeout (float, optional): The hard timeout of each call. Defaults to the executor timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        results = [ExecutorResult() for _ in args_list]
+        pending = list(range(len(args_list)))[::-1]
+
+        with self._lock:
+            busy = {}
+            while pending or busy:
+                # Assign jobs to the idle workers, including replacements that have started since.
+                for worker in list(self.workers):
+                    if not self._started(worker):
+                        continue
+                    if pending and worker.job is None:
+                        job = pending.pop()
+                        worker.submit(job, fn, args_list[job], timeout)
+                        busy[worker.conn] = worker
+
+                starting = [worker.conn for worker in self.workers if not worker.ready]
+                if not busy and not starting:
+                    bt.logging.error(f"No reward worker is alive, {len(pending)} reward jobs are not scored.")
+                    for job in pending:
+                        results[job].error = "No reward worker is alive."
+                    break
+
+                # Also wake up when a starting worker is ready; it is picked up at the top of the loop.
+                next_deadline = min((worker.deadline for worker in busy.values()), default=None)
+                wait_timeout = None if next_deadline is None else max(0.0, next_deadline - time.time())
+                for conn in wait(list(busy) + starting, timeout=wait_timeout):
+                    if conn not in busy:
+                        continue
+                    worker = busy.pop(conn)
+                    result = results[worker.job]
+                    result.time = time.time() - worker.start_time
+                    try:
+                        ok, value = conn.recv()
+                    except EOFError:
+                        # The worker crashed or was killed, e.g. by the OOM killer: replace it like a timed out one.
+                        result.error = "Reward worker exited unexpectedly."
+                        bt.logging.error(f"Reward job {worker.job} failed: its worker exited, restarting it.")
+                        self._replace(worker)
+                        continue
+                    if ok:
+                        result.value = value
+                    else:
+                        result.error = value
+                        bt.logging.error(f"Reward job {worker.job} failed: {value}")
+                    worker.job = None
+
+                now = time.time()
+                for conn, worker in list(busy.items()):
+                    if worker.deadline > now or conn.poll():
+                        continue
+                    # The job is past its deadline: replace its worker so that the job cannot hold up later ones.
+                    busy.pop(conn)
+                    result = results[worker.job]
+                    result.timed_out = True
+                    result.time = now - worker.start_time
+                    self.num_timeouts += 1
+                    bt.logging.warning(f"Reward job {worker.job} timed out after {timeout}s, restarting its worker.")
+                    self._replace(worker)
+
+        return results
+
+    def close(self):
+        with self._lock:
+            for worker in self.workers + self.spares:
+                worker.close()
+            self.workers = []
+            self.spares = []
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(max_workers={self.max_workers}, timeout={self.timeout}, num_timeouts={self.num_timeouts})"
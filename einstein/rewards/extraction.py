@@ -0,0 +1,68 @@
+import re
+from typing import List, Optional, Union
+
+FINAL_ANSWER_MARKER = "the final answer is"
+MARKER_PATTERN = re.compile(re.escape(FINAL_ANSWER_MARKER), re.IGNORECASE)
+# Only the end of a completion is scanned for its answer, so that the cost of extraction does not grow with the
+# length of runaway or adversarial completions.
+MAX_SCAN_LENGTH = 8192
+
+# One pass tokenizer of decimal numbers with an optional exponent, e.g. "42", "-3.5", ".5" or "6.02e23". The
+# alternatives start with distinct characters, so that each position fails on its first character and the scan is
+# linear. As in the original r"[-+]?\d*\.\d+|\d+", the sign of a plain integer is not part of the number.
+EXPONENT = r"(?:[eE][-+]?\d+)?"
+NUMERIC_PATTERN = re.compile(
+    rf"[-+](?:\d*\.\d+{EXPONENT}|\d+[eE][-+]?\d+)"
+    rf"|\d+(?:\.\d+)?{EXPONENT}"
+    rf"|\.\d+{EXPONENT}"
+)
+# The end of a number that starts before the scanned window: signs, digits and dots, and an exponent after a digit,
+# so that the first letter of a word such as "equation" is kept.
+PARTIAL_NUMBER = re.compile(r"[-+.]*(?:\d[\d.]*(?:[eE][-+]?\d+)?)?")
+
+Number = Union[int, float]
+
+
+def scan_window(text: str, max_length: int = MAX_SCAN_LENGTH) -> str:
+    """The last `max_length` characters of the text, without the number that the cut may have split."""
+    if len(text) <= max_length:
+        return text
+    window = text[-max_length:]
+    return window[PARTIAL_NUMBER.match(window).end():]
+
+
+def extract_final_answer(text: str, max_length: int = MAX_SCAN_LENGTH) -> Optional[str]:
+    """
+    Extracts the answer stated after the last "the final answer is" marker (case insensitive) in the last
+    `max_length` characters of the text: an optional colon and whitespace are skipped, and the answer is the rest of
+    the line. Markers that are not followed by an answer are ignored.
+
+    Args:
+        text (str): The text from which to extract the final answer.
+        max_length (int): The number of characters scanned from the end of the text.
+
+    Returns:
+        str: The extracted final answer, or None if not found.
+    """
+    window = text[-max_length:]
+    for match in reversed(list(MARKER_PATTERN.finditer(window))):
+        rest = window[match.end():]
+        if rest.startswith(":"):
+            rest = rest[1:]
+        answer = rest.lstrip().partition("\n")[0]
+        if answer:
+            return answer
+    return None
+
+
+def parse_number(token: str) -> Number:
+    return int(token) if token.isdigit() else float(token)
+
+
+def tokenize_numbers(text: str) -> List[str]:
+    return NUMERIC_PATTERN.findall(text)
+
+
+def answer_text(completion: str, max_length: int = MAX_SCAN_LENGTH) -> str:
+    """The final answer of a completion, or the end of the completion if it has none."""
+    return extract_final_answer(completion, max_length) or scan_window(completion, max_length)
@@ -1,19 +1,40 @@
-from typing import List
+import time
+import bittensor as bt
+from typing import List, Tuple
+from concurrent.futures import Executor
 
 from einstein.tasks import TASKS
 
-from einstein.rewards import BaseRewardModel
+from einstein.rewards import BaseRewardModel, RewardEvent, RewardModelTypeEnum
+from einstein.dendrite import DendriteResponseEvent
 from einstein.rewards.advanced_math import AdvancedMathModel
+from einstein.rewards.streaming import StreamingRewardModel
+from einstein.rewards.executor import RewardExecutor
+from einstein.rewards.cache import RewardCache
 
 
 REWARD_MODELS = {
     'advanced_math': AdvancedMathModel,
+    'streaming': StreamingRewardModel,
 }
 
 class RewardPipeline:
-    def __init__(self, selected_tasks: List[str], device):
+    def __init__(
+        self,
+        selected_tasks: List[str],
+        device,
+        executor: RewardExecutor = None,
+        model_executor: Executor = None,
+        cache: RewardCache = None,
+    ):
         self.selected_tasks = selected_tasks
         self.device = device
+        # Reward models that can score single completions are run on the executor's worker processes, if given.
+        self.executor = executor
+        # Independent reward models are applied concurrently on the model executor, if given.
+        self.model_executor = model_executor
+        # Rewards of completion-only models are memoized across steps in the cache, if given.
+        self.cache = cache
         self.validate_tasks()
         self.load_reward_pipeline()
 
@@ -26,6 +47,32 @@ class RewardPipeline:
     def __repr__(self):
         return f'RewardPipeline({self.reward_models})'
 
+    def apply(
+        self,
+        jobs: List[Tuple[BaseRewardModel, str, RewardModelTypeEnum]],
+        response_event: DendriteResponseEvent,
+    ) -> List[RewardEvent]:
+        """Applies each (reward_model, reference, reward_type) job to the responses and returns the RewardEvents in
+        the order of the jobs. The jobs run concurrently on the model executor, or one after another without it."""
+
+        def apply_job(job) -> RewardEvent:
+            reward_model, reference, reward_type = job
+            return reward_model.apply(
+                reference, response_event, reward_type=reward_type, executor=self.executor, cache=self.cache
+            )
+
+        t0 = time.time()
+        if self.model_executor is None or len(jobs) < 2:
+            events = [apply_job(job) for job in jobs]
+        else:
+            events = list(self.model_executor.map(apply_job, jobs))
+
+        bt.logging.debug(
+            f"Applied {len(jobs)} reward models in {time.time() - t0:.4f}s: "
+            + ", ".join(f"{event.model_name}={event.batch_time:.4f}s" for event in events)
+        )
+        return events
+
     def validate_tasks(self):
         for task in self.selected_tasks:
             if task not in TASKS:
@@ -1,7 +1,8 @@
 import torch
 import time
 import bittensor as bt
-from typing import List
+from collections import defaultdict
+from typing import Callable, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
@@ -55,33 +56,52 @@ class RewardResult:
         self.device = device
         self.task_rewards = agent.task.reward_definition
         self.task_penalties = agent.task.penalty_definition + agent.task.global_penalty_definition
-        self.reward_events = self.reward_responses(
+        reward_jobs = self.reward_jobs(
             reference=agent.task.reference, 
             models=self.task_rewards,
             reward_type=RewardModelTypeEnum.WEIGHTED_REWARD
         )
-        self.penalty_events = self.reward_responses(
+        penalty_jobs = self.reward_jobs(
             reference=agent.challenge, 
             models=self.task_penalties,
             reward_type=RewardModelTypeEnum.PENALTY
         )
+
+        # The reward and penalty models are independent, so the pipeline may run them concurrently.
+        t0 = time.time()
+        events = self.reward_pipeline.apply(reward_jobs + penalty_jobs, self.response_event)
+        self.wall_time = time.time() - t0
+        # With enough workers, the slowest model bounds the time spent rewarding.
+        self.critical_path_time = max((event.batch_time for event in events), default=0.0)
+
+        self.reward_events = events[:len(reward_jobs)]
+        self.penalty_events = events[len(reward_jobs):]
         self.rewards = self.total_reward()
 
     def __state_dict__(self, full=False):
 
-        state = {"rewards": self.rewards.tolist()}
+        state = {
+            "rewards": self.rewards.tolist(),
+            "reward_wall_time": self.wall_time,
+            "reward_critical_path_time": self.critical_path_time,
+        }
+        cache = getattr(self.reward_pipeline, "cache", None)
+        if cache is not None:
+            state["reward_cache_size"] = len(cache)
+            state["reward_cache_hit_rate"] = cache.hit_rate
         for event in self.reward_events+self.penalty_events:
             state.update(event.asdict())
         return state
 
-    def reward_responses(self, reference: str, models: List[dict], reward_type: RewardModelTypeEnum) -> List[RewardEvent]:
-        """Calculates the rewards for the responses given the task and returns a RewardEvent for each reward model
+    def reward_jobs(self, reference: str, models: List[dict], reward_type: RewardModelTypeEnum) -> List[tuple]:
+        """Selects the reward model of each model definition, returning a (reward_model, reference, reward_type) job
+        for each of them. The pipeline turns each job into a RewardEvent:
         reward_events: List[RewardEvent] = [
             RewardEvent(model_name='rouge', rewards=torch.zeros(50), timings=torch.zeros(50), ...),
             RewardEvent(model_name='relevance', rewards=torch.zeros(50), timings=torch.zeros(50), ...),
         ]
         """
-        reward_events = []
+        jobs = []
 
         for reward_info in models:
 
@@ -91,28 +111,37 @@ class RewardResult:
                 raise ValueError(
                     f"Reward model {reward_info['name']} not supported. Please choose from {self.reward_pipeline.keys()}"
                 )
-            # Compute the rewards for the responses given the prompt
-            reward_event = reward_model.apply(reference, self.response_event, reward_type=reward_type)
-            reward_events.append(reward_event)
+            jobs.append((reward_model, reference, reward_type))
 
-        return reward_events
+        return jobs
 
-    def total_reward(self) -> torch.FloatTensor:
-        """Combines the rewards from all the reward models into a single reward tensor"""
+    def stack_events(self, events: List[RewardEvent], models: List[dict]) -> Tuple[torch.FloatTensor, torch.FloatTensor]:
+        """Stacks the rewards of the events into a [models x miners] matrix on the device, with the matching vector of
+        model weights. An event has one row per model definition of the same name."""
+        weights_by_name = defaultdict(list)
+        for reward_info in models:
+            weights_by_name[reward_info["name"]].append(reward_info["weight"])
 
-        # TODO: How would using the Agent as a reward model fit into this flow?
-        # Compute the rewards for the responses given the prompt
-        rewards = torch.zeros_like(self.response_event.uids, dtype=torch.float32, device=self.device)
+        rows = [(event.rewards, weight) for event in events for weight in weights_by_name[event.model_name]]
+        if not rows:
+            num_responses = len(self.response_event.uids)
+            return torch.zeros((0, num_responses), device=self.device), torch.zeros(0, device=self.device)
 
-        for event in self.reward_events:
-             for reward_info in filter(lambda x: x['name'] == event.model_name, self.task_rewards):
-                rewards += reward_info["weight"] * event.rewards.to(self.device)
+        # A single host/device transfer for all the models.
+        matrix = torch.stack([rewards.float().cpu() for rewards, _ in rows]).to(self.device)
+        weights = torch.tensor([weight for _, weight in rows], dtype=torch.float32, device=self.device)
+        return matrix, weights
 
-        for event in self.penalty_events:
-            for reward_info in filter(lambda x: x['name'] == event.model_name, self.task_penalties):
-                rewards *= (1 - reward_info["weight"] * event.rewards.to(self.device))
+    def total_reward(self) -> torch.FloatTensor:
+        """Combines the rewards from all the reward models into a single reward tensor: the weighted sum of the
+        rewards, scaled by the product of (1 - weight * penalty) over the penalties."""
+
+        # TODO: How would using the Agent as a reward model fit into this flow?
+        rewards, reward_weights = self.stack_events(self.reward_events, self.task_rewards)
+        penalties, penalty_weights = self.stack_events(self.penalty_events, self.task_penalties)
 
-        return rewards
+        total = reward_weights @ rewards
+        return total * torch.prod(1 - penalty_weights[:, None] * penalties, dim=0)
 
     def __str__(self):
         return f"{self.__class__.__name__}(rewards={self.rewards!r}, reward_events={self.reward_events!r}, penalty_events={self.penalty_events!r})"
@@ -132,8 +161,74 @@ class BatchRewardOutput:
         else:
             self.rewards_normalized = (self.rewards-self.rewards.min())/(self.rewards.max()-self.rewards.min()+1e-6)
 
+    def scatter(self, inverse: torch.LongTensor) -> "BatchRewardOutput":
+        """Maps the output of the unique completions back to every response, given the index of each response's
+        completion in the unique completions. Per-completion lists in extra_info are mapped as well."""
+        num_unique = len(self.rewards)
+        extra_info = {
+            key: [value[i] for i in inverse.tolist()] if isinstance(value, list) and len(value) == num_unique else value
+            for key, value in self.extra_info.items()
+        }
+        extra_info["unique_completions"] = num_unique
+        return BatchRewardOutput(
+            rewards=self.rewards[inverse],
+            timings=self.timings[inverse],
+            extra_info=extra_info,
+        )
+
+
+class IncrementalScorer(ABC):
+    """Rewards a single completion chunk by chunk while it is being streamed.
+
+    Subclasses consume the chunks in `_consume` and compute the reward of the whole completion in `_score`. The
+    final synapse completion is authoritative: if it differs from the streamed chunks, the scorer starts over from it,
+    so the reward is always the same as the batch reward of that completion.
+    """
+
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.reward: float = None
+        self.time = 0.0
+        self.chunks: List[str] = []
+        self.length = 0
+
+    @abstractmethod
+    def _consume(self, chunk: str, offset: int):
+        """Consumes a chunk starting at character `offset` of the completion."""
+        ...
+
+    @abstractmethod
+    def _score(self, completion: str) -> float:
+        ...
+
+    def reset(self):
+        self.chunks = []
+        self.length = 0
+
+    def update(self, chunk: str):
+        t0 = time.time()
+        self._consume(chunk, self.length)
+        self.chunks.append(chunk)
+        self.length += len(chunk)
+        self.time += time.time() - t0
+
+    def finalize(self, completion: str) -> float:
+        t0 = time.time()
+        if self.length != len(completion) or "".join(self.chunks) != completion:
+            self.reset()
+            self._consume(completion, 0)
+            self.chunks = [completion]
+            self.length = len(completion)
+        self.reward = self._score(completion)
+        self.time += time.time() - t0
+        return self.reward
+
 
 class BaseRewardModel(ABC):
+    # Whether the reward of a response only depends on its completion text, in which case identical completions of
+    # different miners are scored once.
+    completion_only = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -148,10 +243,125 @@ class BaseRewardModel(ABC):
     def reward(self, reference: str, response_event: DendriteResponseEvent) -> BatchRewardOutput:
         pass
 
-    
-    def apply(self, reference: str, response_event: DendriteResponseEvent, reward_type: RewardModelTypeEnum) -> RewardEvent:
+    def incremental_scorer(self, reference: str) -> Optional[IncrementalScorer]:
+        """Returns a scorer that rewards one completion while it is streamed, or None if the model only scores batches."""
+        return None
+
+    def completion_scorer(self) -> Optional[Callable[[str, str], float]]:
+        """Returns a picklable function scoring a single completion as fn(reference, completion), which allows the
+        model to be run on a RewardExecutor, or None if the model only scores batches."""
+        return None
+
+    def batch_extra_info(self) -> dict:
+        """Extra info logged with every batch of rewards of the model."""
+        return {}
+
+    def params(self) -> dict:
+        """Parameters the rewards of the model depend on, which are part of its reward cache keys."""
+        return {key: value for key, value in vars(self).items() if not key.startswith("_") and not callable(value)}
+
+    def incremental_reward(self, scorers: List[IncrementalScorer]) -> BatchRewardOutput:
+        """Collects the rewards computed by the incremental scorers of a batch."""
+        return BatchRewardOutput(
+            rewards=torch.FloatTensor([scorer.reward for scorer in scorers]),
+            timings=torch.FloatTensor([scorer.time for scorer in scorers]),
+            extra_info={"incremental": True, **self.batch_extra_info()},
+        )
+
+    def executor_reward(self, executor, reference: str, response_event: DendriteResponseEvent) -> BatchRewardOutput:
+        """Scores each completion on a RewardExecutor. Completions that time out or fail are rewarded 0."""
+        results = executor.map(
+            self.completion_scorer(), [(reference, completion) for completion in response_event.completions]
+        )
+        return BatchRewardOutput(
+            rewards=torch.FloatTensor([result.value if not result.error else 0 for result in results]),
+            timings=torch.FloatTensor([result.time for result in results]),
+            extra_info={
+                "timeouts": [result.timed_out for result in results],
+                "errors": [result.error is not None for result in results],
+                **self.batch_extra_info(),
+            },
+        )
+
+    def score(self, reference: str, response_event: DendriteResponseEvent, executor=None) -> BatchRewardOutput:
+        """Scores the responses on the executor if possible, otherwise with reward()."""
+        if executor is not None and self.completion_scorer() is not None:
+            return self.executor_reward(executor, reference, response_event)
+        return self.reward(reference, response_event)
+
+    def cached_reward(
+        self, cache, reference: str, response_event: DendriteResponseEvent, executor=None
+    ) -> BatchRewardOutput:
+        """Scores only the completions missing from the RewardCache and caches their rewards. The responses must have
+        distinct completions. Completions that timed out or failed on the executor are not cached."""
+        params = repr(sorted(self.params().items()))
+        keys = [cache.key(self.name, params, reference, completion) for completion in response_event.completions]
+        rewards = cache.lookup(keys)
+        timings = [0.0] * len(keys)
+        misses = [i for i, reward in enumerate(rewards) if reward is None]
+        extra_info = self.batch_extra_info()
+
+        if misses:
+            event = response_event if len(misses) == len(keys) else response_event.completions_event(misses)
+            output = self.score(reference, event, executor=executor)
+            failed = [
+                timed_out or error
+                for timed_out, error in zip(
+                    output.extra_info.get("timeouts", [False] * len(misses)),
+                    output.extra_info.get("errors", [False] * len(misses)),
+                )
+            ]
+            for i, reward, timing in zip(misses, output.rewards.tolist(), output.timings.tolist()):
+                rewards[i], timings[i] = reward, timing
+            cache.store((keys[i], rewards[i]) for i, fail in zip(misses, failed) if not fail)
+            # Per-completion lists of the scored completions are spread back, with None for the cached ones.
+            for key, value in output.extra_info.items():
+                if isinstance(value, list) and len(value) == len(misses):
+                    spread = [None] * len(keys)
+                    for i, item in zip(misses, value):
+                        spread[i] = item
+                    value = spread
+                extra_info[key] = value
+
+        extra_info["cache_hits"] = len(keys) - len(misses)
+        extra_info["cache_misses"] = len(misses)
+        return BatchRewardOutput(
+            rewards=torch.FloatTensor(rewards), timings=torch.FloatTensor(timings), extra_info=extra_info
+        )
+
+    def batch_reward(
+        self, reference: str, response_event: DendriteResponseEvent, executor=None, cache=None
+    ) -> BatchRewardOutput:
+        """Scores the responses on the executor if possible, otherwise with reward(). Completion-only models score
+        each distinct completion once and the results are scattered back to every response. With a RewardCache, they
+        only score the completions whose reward is not cached."""
+        deduplicate = self.completion_only and response_event.has_duplicate_completions
+        event = response_event.unique_completions_event() if deduplicate else response_event
+
+        if cache is not None and self.completion_only:
+            batch_rewards_output = self.cached_reward(cache, reference, event, executor=executor)
+        else:
+            batch_rewards_output = self.score(reference, event, executor=executor)
+
+        if deduplicate:
+            batch_rewards_output = batch_rewards_output.scatter(response_event.completion_inverse)
+        return batch_rewards_output
+
+    def apply(
+        self,
+        reference: str,
+        response_event: DendriteResponseEvent,
+        reward_type: RewardModelTypeEnum,
+        executor=None,
+        cache=None,
+    ) -> RewardEvent:
         t0 = time.time()
-        batch_rewards_output = self.reward(reference, response_event)
+        # Rewards scored while the responses were streamed can be reused if they were scored against this reference.
+        scorers = response_event.incremental_scorers.get(self.name)
+        if scorers and all(scorer.reward is not None and scorer.reference == reference for scorer in scorers):
+            batch_rewards_output = self.incremental_reward(scorers)
+        else:
+            batch_rewards_output = self.batch_reward(reference, response_event, executor=executor, cache=cache)
         batch_rewards_time = time.time() - t0
 
         return RewardEvent(
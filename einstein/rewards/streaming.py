@@ -0,0 +1,79 @@
+import time
+import torch
+import itertools
+import numpy as np
+from typing import List, Optional, Tuple
+from einstein.rewards import BaseRewardModel, BatchRewardOutput
+from einstein.dendrite import DendriteResponseEvent
+
+
+def pack_ragged(rows: List[Optional[List[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Flattens ragged rows into a single array, returning it with the row index of each value."""
+    lengths = np.fromiter((len(row) if row else 0 for row in rows), dtype=np.int64, count=len(rows))
+    values = np.fromiter(
+        itertools.chain.from_iterable(row or [] for row in rows), dtype=np.float64, count=lengths.sum()
+    )
+    return values, np.repeat(np.arange(len(rows)), lengths)
+
+
+def to_list(values: np.ndarray, decimals: int = 6) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(value, decimals) for value in values.tolist()]
+
+
+class StreamingRewardModel(BaseRewardModel):
+    """
+    Penalizes miners that do not stream their completion, i.e. that send a chunk of more than `max_tokens_per_chunk`
+    tokens. The penalty is 1 for such miners and 0 otherwise. Chunk sizes are counted according to
+    `--neuron.token_count_mode`: the approximate modes estimate the number of tokens, so the threshold applies to all
+    of them, with the accuracy of the estimate (see `einstein.utils.tokens`).
+
+    The chunks of all the miners are processed at once as flat arrays. The time to first token and the inter-chunk
+    gaps of each miner are reported in the extra info.
+    """
+
+    @property
+    def name(self) -> str:
+        return "streaming"
+
+    def __init__(self, max_tokens_per_chunk: int, **kwargs):
+        super().__init__()
+        self.max_tokens_per_chunk = max_tokens_per_chunk
+
+    def reward(self, reference: str, response_event: DendriteResponseEvent) -> BatchRewardOutput:
+        """Compute the streaming penalties of all the responses. The reference is not used."""
+        t0 = time.time()
+        num_responses = len(response_event.stream_results_all_tokens_per_chunk)
+
+        tokens, token_rows = pack_ragged(response_event.stream_results_all_tokens_per_chunk)
+        exceeded = np.bincount(
+            token_rows, weights=tokens > self.max_tokens_per_chunk, minlength=num_responses
+        )
+        penalties = (exceeded > 0).astype(np.float32)
+
+        timings, timing_rows = pack_ragged(response_event.stream_results_all_chunks_timings)
+        time_to_first_token = np.full(num_responses, np.nan)
+        # Rows are contiguous, so the first value of each row is where the row index changes.
+        first = np.flatnonzero(np.r_[True, timing_rows[1:] != timing_rows[:-1]]) if len(timings) else []
+        time_to_first_token[timing_rows[first]] = timings[first]
+
+        same_row = timing_rows[1:] == timing_rows[:-1]
+        gaps = np.diff(timings)[same_row]
+        gap_rows = timing_rows[1:][same_row]
+        num_gaps = np.bincount(gap_rows, minlength=num_responses)
+        with np.errstate(invalid="ignore"):
+            mean_gap = np.bincount(gap_rows, weights=gaps, minlength=num_responses) / num_gaps
+        max_gap = np.full(num_responses, -np.inf)
+        np.maximum.at(max_gap, gap_rows, gaps)
+        max_gap[num_gaps == 0] = np.nan
+
+        batch_time = time.time() - t0
+        return BatchRewardOutput(
+            rewards=torch.from_numpy(penalties),
+            timings=torch.full((num_responses,), batch_time / max(num_responses, 1)),
+            extra_info={
+                "max_tokens_per_chunk": self.max_tokens_per_chunk,
+                "time_to_first_token": to_list(time_to_first_token),
+                "mean_inter_chunk_gap": to_list(mean_gap),
+                "max_inter_chunk_gap": to_list(max_gap),
+            },
+        )
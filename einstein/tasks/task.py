@@ -94,6 +94,18 @@ class Task(ABC):
             message=prompt, cleaner=cleaner
         )
 
+    async def agenerate(
+        self, system: str, prompt: str, pipeline: BasePipeline, clean=True
+    ) -> str:
+        """Async counterpart of `generate` that awaits the llm instead of blocking the event loop"""
+
+        cleaner = (
+            CleanerPipeline(cleaning_pipeline=self.cleaning_pipeline) if clean else None
+        )
+        return await vLLM_LLM(pipeline, system_prompt=system).aquery(
+            message=prompt, cleaner=cleaner
+        )
+
     def generate_reference(self, pipeline: BasePipeline, clean=True) -> str:
         """Generates a reference answer to be used for scoring miner completions"""
         t0 = time.time()
@@ -112,6 +124,24 @@ class Task(ABC):
         self.reference_time = time.time() - t0
         return self.reference
 
+    async def agenerate_reference(self, pipeline: BasePipeline, clean=True) -> str:
+        """Async counterpart of `generate_reference`"""
+        t0 = time.time()
+        if not self.static_reference:
+            if not self.clean_reference:
+                clean = False
+            bt.logging.info("🤖 Generating reference...")
+
+            self.reference = await self.agenerate(
+                system=make_system_prompt(),
+                prompt=self.reference_prompt,
+                pipeline=pipeline,
+                clean=clean,
+            )
+
+        self.reference_time = time.time() - t0
+        return self.reference
+
     def generate_query(self, pipeline: BasePipeline, clean=True) -> str:
         """Generates a query to be used for generating the challenge"""
         t0 = time.time()
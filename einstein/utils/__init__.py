@@ -2,3 +2,5 @@ from . import config
 from . import misc
 from . import uids
 from . import logging
+from . import inflight
+from . import tokens
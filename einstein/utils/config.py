@@ -330,6 +330,20 @@ def add_validator_args(cls, parser):
         default="casperhansen/llama-3-70b-instruct-awq",
     )
 
+    parser.add_argument(
+        "--neuron.llm_batch_window",
+        type=float,
+        help="Time window in seconds during which concurrent LLM generations are gathered into a single batch, e.g. 0.02. 0 (the default) disables batching.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.llm_max_batch_size",
+        type=int,
+        help="The maximum number of prompts generated in a single LLM batch.",
+        default=32,
+    )
+
     parser.add_argument(
         "--neuron.tasks",
         type=str,
@@ -368,6 +382,13 @@ def add_validator_args(cls, parser):
         default=1,
     )
 
+    parser.add_argument(
+        "--neuron.challenge_queue_size",
+        type=int,
+        help="The number of challenges prepared in the background ahead of the forward loop.",
+        default=2,
+    )
+
     parser.add_argument(
         "--neuron.sample_size",
         type=int,
@@ -442,6 +463,107 @@ def add_validator_args(cls, parser):
         default=False,
         )
 
+    parser.add_argument(
+        "--neuron.api_queue_size",
+        type=int,
+        help="The maximum number of API requests waiting to be serviced. Further requests are rejected with a 429.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--neuron.api_request_timeout",
+        type=float,
+        help="The deadline in seconds of an API request, after which it fails fast.",
+        default=60,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_mode",
+        type=str,
+        choices=["fast", "full"],
+        help="How API requests are served. 'full' rewrites the question with a persona and answers with the best-scored response. 'fast' (opt-in) sends the question to the miners as is and answers with the fastest response, which is not scored yet, scoring in the background.",
+        default="full",
+    )
+
+    parser.add_argument(
+        "--neuron.maintenance_interval",
+        type=float,
+        help="Seconds between background chain maintenance rounds (registration check, metagraph resync, weight setting and state saving), which then no longer block the forwards. 0 runs them after every forward.",
+        default=60.0,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_sampler",
+        type=str,
+        choices=["latency", "uniform"],
+        help="How miners are picked for API requests in the 'fast' organic mode. 'latency' favours miners with a low p95 latency and few timeouts or empty responses, while still exploring the others; its rewards are logged but do not update the scores, which would otherwise favour the miners picked more often. Weight-setting steps always sample uniformly.",
+        default="latency",
+    )
+
+    parser.add_argument(
+        "--neuron.reward_workers",
+        type=int,
+        help="Number of worker processes scoring completions in parallel. 0 scores them in the validator process.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.reward_timeout",
+        type=float,
+        help="Hard timeout in seconds for scoring a single completion on the reward workers. Completions that exceed it are rewarded 0.",
+        default=2.0,
+    )
+
+    parser.add_argument(
+        "--neuron.reward_model_threads",
+        type=int,
+        help="Number of threads applying the independent reward and penalty models of a step concurrently. 1 applies them one after another.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.reward_cache_size",
+        type=int,
+        help="Maximum number of (reward model, reference, completion) rewards memoized across steps, so that repeated answers are not scored again. 0 disables the cache.",
+        default=65536,
+    )
+
+    parser.add_argument(
+        "--neuron.reward_cache_ttl",
+        type=float,
+        help="Seconds after which a memoized reward expires.",
+        default=3600.0,
+    )
+
+    parser.add_argument(
+        "--neuron.token_count_mode",
+        type=str,
+        choices=["exact", "whitespace", "bytes"],
+        help="How the tokens of the streamed chunks are counted, e.g. for the max tokens per chunk of the streaming penalty. 'exact' batch encodes the chunks with the validator tokenizer when a stream ends, 'whitespace' (4/3 tokens per word) and 'bytes' (4 bytes per token) are cheap estimates of the token count.",
+        default="exact",
+    )
+
+    parser.add_argument(
+        "--neuron.quorum_size",
+        type=int,
+        help="In the organic fast lane, answer once this many miners have responded. The remaining miners keep streaming and are scored in the background. 0 waits for every miner.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.quorum_answer_check",
+        action="store_true",
+        help="In the organic fast lane, answer as soon as a response states a final answer, even before the quorum is reached.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.max_background_scoring",
+        type=int,
+        help="Max number of organic fast lane requests that are being answered or scored in the background at any time. Further requests wait in their forward until one has been scored.",
+        default=8,
+    )
+
     parser.add_argument(
         "--neuron.forward_max_time",
         type=int,
@@ -3,4 +3,12 @@ class MaxRetryError(Exception):
 
     def __init__(self, message="Maximum number of retries exceeded"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+
+class QueueFullError(Exception):
+    """Exception raised when a bounded request queue cannot accept more requests."""
+
+    def __init__(self, message="Request queue is full"):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,76 @@
+import time
+import uuid
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+class InFlightRegistry:
+    """
+    Keeps track of the miners that are still busy answering a request, keyed by the nonce of that request.
+
+    A uid is held back from new requests until its stream for the current nonce has ended or the request deadline
+    has passed. Releasing with a different nonce is a no-op, so a late stream from an older request can never free
+    a miner that has already been sent a newer one. A miner whose stream timed out or failed may still be generating
+    the abandoned response, so it is held back for a further `cooldown` seconds instead of being released.
+    """
+
+    def __init__(self, cooldown: float = 5.0):
+        self.cooldown = cooldown
+        self._requests: Dict[int, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_nonce() -> str:
+        """Returns a unique nonce to attach to a request."""
+        return uuid.uuid4().hex
+
+    def acquire(self, uids: Iterable[int], nonce: str, timeout: float):
+        """Marks uids as busy with the request identified by nonce for at most timeout seconds."""
+        deadline = time.time() + timeout
+        with self._lock:
+            for uid in uids:
+                self._requests[int(uid)] = (nonce, deadline)
+
+    def release(self, uid: int, nonce: str) -> bool:
+        """Frees uid if it is still busy with the request identified by nonce.
+
+        Returns:
+            bool: True if the uid was busy with this nonce, False otherwise.
+        """
+        with self._lock:
+            request = self._requests.get(int(uid))
+            if request is None or request[0] != nonce:
+                return False
+            del self._requests[int(uid)]
+            return True
+
+    def hold(self, uid: int, nonce: str) -> bool:
+        """Keeps uid busy for the cooldown if it is still busy with the request identified by nonce.
+
+        Returns:
+            bool: True if the uid was busy with this nonce, False otherwise.
+        """
+        with self._lock:
+            request = self._requests.get(int(uid))
+            if request is None or request[0] != nonce:
+                return False
+            self._requests[int(uid)] = (nonce, max(request[1], time.time() + self.cooldown))
+            return True
+
+    def busy_uids(self) -> List[int]:
+        """Returns the uids that are still busy, dropping the ones whose deadline has passed."""
+        now = time.time()
+        with self._lock:
+            expired = [uid for uid, (_, deadline) in self._requests.items() if deadline <= now]
+            for uid in expired:
+                del self._requests[uid]
+            return list(self._requests.keys())
+
+    def is_busy(self, uid: int) -> bool:
+        return int(uid) in self.busy_uids()
+
+    def __len__(self):
+        return len(self.busy_uids())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(busy_uids={self.busy_uids()})"
@@ -0,0 +1,119 @@
+import threading
+import numpy as np
+from typing import Dict, List
+from einstein.dendrite import DendriteResponseEvent
+
+# One-sided 95% quantile of the standard normal distribution.
+Z_95 = 1.645
+
+
+class LatencyAwareSampler:
+    """
+    Samples miners for organic requests, favouring the ones that answer fast and reliably.
+
+    Online statistics are kept for each uid from every response event: EWMAs of the response time and of its
+    variance, from which the p95 latency is estimated, and EWMAs of the timeout (408), empty response (204) and other
+    error rates. The expected cost of querying a miner is its p95 latency plus the timeout for each unusable response
+    it is expected to send. As in UCB, the k candidates with the lowest lower confidence bound on the cost are picked:
+    the bound subtracts an exploration bonus that shrinks with the number of responses of the miner and grows slowly
+    with the total number of responses, so that new and recovering miners keep being tried.
+
+    Weight-setting steps keep sampling miners uniformly, so that the scores of the miners are not biased by it.
+    """
+
+    def __init__(self, timeout: float, alpha: float = 0.1, exploration: float = 1.0, rng: np.random.Generator = None):
+        self.timeout = timeout
+        self.alpha = alpha
+        self.exploration = exploration
+        self.rng = rng or np.random.default_rng()
+        self.count = np.zeros(0, dtype=np.int64)
+        self.timed_count = np.zeros(0, dtype=np.int64)
+        self.latency = np.zeros(0)
+        self.latency_var = np.zeros(0)
+        self.timeout_rate = np.zeros(0)
+        self.empty_rate = np.zeros(0)
+        self.error_rate = np.zeros(0)
+        self._lock = threading.Lock()
+
+    def _grow(self, n: int):
+        if n <= len(self.count):
+            return
+        pad = n - len(self.count)
+        self.count = np.concatenate([self.count, np.zeros(pad, dtype=np.int64)])
+        self.timed_count = np.concatenate([self.timed_count, np.zeros(pad, dtype=np.int64)])
+        for name in ("latency", "latency_var", "timeout_rate", "empty_rate", "error_rate"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(pad)]))
+
+    def update(self, response_event: DendriteResponseEvent):
+        """Updates the statistics of the miners of a response event. Its uids must be distinct."""
+        uids = np.asarray(response_event.uids.tolist(), dtype=np.int64)
+        if not len(uids):
+            return
+        timings = np.asarray(response_event.timings, dtype=np.float64)
+        status_codes = np.asarray(response_event.status_codes)
+
+        with self._lock:
+            self._grow(uids.max() + 1)
+            # The first response of a miner initializes its averages.
+            alpha = np.where(self.count[uids] == 0, 1.0, self.alpha)
+
+            for rate, observed in (
+                (self.timeout_rate, status_codes == 408),
+                (self.empty_rate, status_codes == 204),
+                (self.error_rate, ~np.isin(status_codes, (200, 204, 408))),
+            ):
+                rate[uids] += alpha * (observed - rate[uids])
+
+            self.count[uids] += 1
+
+            # Failed requests have no meaningful response time.
+            timed = np.isin(status_codes, (200, 204, 408))
+            uids, timings = uids[timed], timings[timed]
+            alpha = np.where(self.timed_count[uids] == 0, 1.0, self.alpha)
+            delta = timings - self.latency[uids]
+            self.latency[uids] += alpha * delta
+            self.latency_var[uids] = (1 - alpha) * (self.latency_var[uids] + alpha * delta**2)
+            self.timed_count[uids] += 1
+
+    def reset(self, uids: List[int]):
+        """Forgets the statistics of uids, e.g. when their hotkey is replaced."""
+        with self._lock:
+            uids = [uid for uid in uids if uid < len(self.count)]
+            self.count[uids] = 0
+            self.timed_count[uids] = 0
+            for name in ("latency", "latency_var", "timeout_rate", "empty_rate", "error_rate"):
+                getattr(self, name)[uids] = 0
+
+    def p95_latency(self) -> np.ndarray:
+        return self.latency + Z_95 * np.sqrt(self.latency_var)
+
+    def cost(self) -> np.ndarray:
+        unusable = self.timeout_rate + self.empty_rate + self.error_rate
+        return self.p95_latency() + unusable * self.timeout
+
+    def sample(self, candidates: np.ndarray, k: int) -> np.ndarray:
+        """Picks the k candidate uids with the lowest lower confidence bound on their cost, breaking ties randomly."""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) <= k:
+            return candidates
+        with self._lock:
+            self._grow(candidates.max() + 1)
+            total = np.log(self.count.sum() + 2)
+            bonus = self.exploration * self.timeout * np.sqrt(total / (self.count[candidates] + 1))
+            bound = self.cost()[candidates] - bonus
+        order = np.lexsort((self.rng.random(len(candidates)), bound))
+        return candidates[order[:k]]
+
+    def __state_dict__(self, uids: List[int]) -> Dict[str, list]:
+        """Statistics of the given uids, for the event log."""
+        with self._lock:
+            self._grow(max(uids, default=-1) + 1)
+            return {
+                "sampler_p95_latency": np.round(self.p95_latency()[uids], 4).tolist(),
+                "sampler_timeout_rate": np.round(self.timeout_rate[uids], 4).tolist(),
+                "sampler_empty_rate": np.round(self.empty_rate[uids], 4).tolist(),
+                "sampler_responses": self.count[uids].tolist(),
+            }
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(timeout={self.timeout}, alpha={self.alpha}, exploration={self.exploration}, uids={len(self.count)})"
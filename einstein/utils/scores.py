@@ -0,0 +1,69 @@
+import torch
+import numpy as np
+from typing import List, Union
+
+
+class MovingAverageScores:
+    """
+    Exponential moving average of the miner rewards with a constant decay, updated sparsely on the CPU.
+
+    The dense update of a step is `scores = clamp(alpha * step_rewards + (1 - alpha) * scores - decay, min=0)`, where
+    step_rewards are the scores with the rewards of the sampled uids scattered in. Apart from the decay, it leaves the
+    uids that were not sampled unchanged, so only the sampled uids are updated and the decay of the others is applied
+    lazily, from the step at which they were last updated. Subtracting the decay m times with clamping is the same as
+    subtracting m times the decay once, so the scores match the dense update up to float rounding.
+
+    The state is held in NumPy arrays, whose operations on a few elements are cheaper than torch ones, and exposed as
+    a tensor sharing their memory.
+    """
+
+    def __init__(self, scores: torch.FloatTensor, alpha: float, decay: float):
+        self.alpha = alpha
+        self.decay = decay
+        self.step = 0
+        self.reset(scores)
+
+    def reset(self, scores: torch.FloatTensor):
+        """Replaces the scores, which are considered up to date."""
+        self.values = scores.detach().to("cpu", torch.float32).numpy()
+        self.updated_at = np.full(self.values.shape, self.step, dtype=np.int64)
+
+    def zero(self, uids: Union[List[int], np.ndarray]):
+        """Resets the scores of uids to zero, e.g. when their hotkey is replaced."""
+        self.values[uids] = 0
+        self.updated_at[uids] = self.step
+
+    def resize(self, n: int):
+        """Truncates the scores to n uids or pads them with zeros for new uids."""
+        pad = max(n - len(self), 0)
+        self.values = np.concatenate([self.values[:n], np.zeros(pad, dtype=np.float32)])
+        self.updated_at = np.concatenate([self.updated_at[:n], np.full(pad, self.step, dtype=np.int64)])
+
+    def update(self, rewards: torch.FloatTensor, uids: Union[List[int], torch.LongTensor]) -> torch.FloatTensor:
+        """Applies the rewards of a step to the sampled uids, which must be distinct, and returns their new scores."""
+        uids = uids.cpu().numpy() if torch.is_tensor(uids) else np.asarray(uids, dtype=np.int64)
+        rewards = rewards.detach().cpu().numpy()
+        self.step += 1
+
+        # Decay of the steps during which the uids were not sampled.
+        missed = self.step - 1 - self.updated_at[uids]
+        scores = np.maximum(self.values[uids] - missed * self.decay, 0)
+        scores = np.maximum(self.alpha * rewards + (1 - self.alpha) * scores - self.decay, 0)
+
+        self.values[uids] = scores
+        self.updated_at[uids] = self.step
+        return torch.from_numpy(self.values[uids])
+
+    def materialize(self) -> torch.FloatTensor:
+        """Applies the pending decay of every uid and returns the scores, which can be modified in place."""
+        pending = self.step - self.updated_at
+        if pending.any():
+            np.maximum(self.values - pending * self.decay, 0, out=self.values, casting="same_kind")
+            self.updated_at.fill(self.step)
+        return torch.from_numpy(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(n={len(self)}, alpha={self.alpha}, decay={self.decay}, step={self.step})"
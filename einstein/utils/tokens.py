@@ -0,0 +1,39 @@
+import math
+from typing import List
+
+# Token counting modes of the streamed chunks. Every mode counts tokens, so that thresholds on the counts, such as
+# the max_tokens_per_chunk of the streaming penalty, mean the same in all of them.
+# - exact: the tokenizer of the validator LLM, batch encoded once the stream has ended.
+# - whitespace: the number of whitespace separated words of each chunk times TOKENS_PER_WORD, the average number of
+#   tokens of an English word.
+# - bytes: the UTF-8 size of each chunk divided by BYTES_PER_TOKEN, the average size of a token in English text.
+TOKEN_COUNT_MODES = ("exact", "whitespace", "bytes")
+BYTES_PER_TOKEN = 4
+TOKENS_PER_WORD = 4 / 3
+
+
+def count_tokens(tokenizer, chunks: List[str], mode: str = "exact") -> List[int]:
+    """Counts the tokens of each chunk of a stream.
+
+    Args:
+        tokenizer: Tokenizer of the validator LLM, only used in exact mode.
+        chunks (List[str]): The chunks of the stream.
+        mode (str, optional): One of TOKEN_COUNT_MODES. Defaults to "exact".
+
+    Returns:
+        List[int]: The number of tokens of each chunk, estimated in the approximate modes.
+    """
+    if not chunks:
+        return []
+    if mode == "whitespace":
+        return [math.ceil(len(chunk.split()) * TOKENS_PER_WORD) for chunk in chunks]
+    if mode == "bytes":
+        return [math.ceil(len(chunk.encode("utf-8")) / BYTES_PER_TOKEN) for chunk in chunks]
+    if mode != "exact":
+        raise ValueError(f"Unknown token count mode {mode!r}. Please choose from {TOKEN_COUNT_MODES}")
+
+    # Fast tokenizers encode the whole batch in a single call to the Rust backend, skipping the BatchEncoding wrapper.
+    if getattr(tokenizer, "is_fast", False):
+        encodings = tokenizer.backend_tokenizer.encode_batch(chunks, add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+    return [len(tokenizer.tokenize(chunk)) for chunk in chunks]
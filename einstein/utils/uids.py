@@ -1,7 +1,12 @@
 import torch
-import random
+import hashlib
+import numpy as np
 import bittensor as bt
-from typing import List
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Per uid hashes of the hotkey and of the axon of a metagraph.
+FINGERPRINT_DTYPE = np.dtype([("hotkey", np.uint64), ("axon", np.uint64)])
 
 
 def check_uid_availability(
@@ -43,49 +48,164 @@ def check_uid_availability(
     return True
 
 
-def get_random_uids(self, k: int, exclude: List[int] = None) -> torch.LongTensor:
+def first_of_groups(values: np.ndarray) -> np.ndarray:
+    """Mask of the first occurrence of each value."""
+    mask = np.zeros(len(values), dtype=bool)
+    mask[np.unique(values, return_index=True)[1]] = True
+    return mask
+
+
+@dataclass
+class UidIndex:
+    """Available uids of the metagraph, built once per metagraph sync so that sampling miners does not go over the
+    whole metagraph on every step."""
+
+    uids: np.ndarray
+    rng: np.random.Generator
+
+    @classmethod
+    def build(
+        cls,
+        metagraph: "bt.metagraph.Metagraph",
+        self_uid: int,
+        vpermit_tao_limit: int,
+        unique_coldkeys: bool = False,
+        unique_ips: bool = False,
+        rng: np.random.Generator = None,
+    ) -> "UidIndex":
+        """Selects the same uids as `check_uid_availability` over all the uids in order: serving uids without a
+        validator permit and more than `vpermit_tao_limit` stake, excluding the validator itself, and only the first
+        of each coldkey and/or ip if requested."""
+        axons = metagraph.axons
+        serving = np.fromiter((axon.is_serving for axon in axons), dtype=bool, count=len(axons))
+        permit = np.asarray(metagraph.validator_permit, dtype=bool)
+        stake = np.asarray(metagraph.S, dtype=np.float64)
+        available = serving & ~(permit & (stake > vpermit_tao_limit))
+
+        # The validator does not take part in the coldkey and ip uniqueness.
+        candidates = np.flatnonzero(available)
+        candidates = candidates[candidates != self_uid]
+        if unique_coldkeys and unique_ips:
+            # A uid rejected for its ip does not claim its coldkey and conversely, so the groups depend on each other.
+            coldkeys, ips, selected = set(), set(), []
+            for uid in candidates.tolist():
+                if axons[uid].coldkey not in coldkeys and axons[uid].ip not in ips:
+                    coldkeys.add(axons[uid].coldkey)
+                    ips.add(axons[uid].ip)
+                    selected.append(uid)
+            candidates = np.array(selected, dtype=np.int64)
+        elif unique_coldkeys or unique_ips:
+            attribute = "coldkey" if unique_coldkeys else "ip"
+            keys = np.array([getattr(axons[uid], attribute) for uid in candidates.tolist()], dtype=str)
+            candidates = candidates[first_of_groups(keys)]
+
+        bt.logging.debug(
+            f"Uid index: {len(candidates)} available uids out of {len(axons)} "
+            f"({len(axons) - serving.sum()} not serving, {(serving & ~available).sum()} validators over the stake limit)"
+        )
+        return cls(uids=candidates.astype(np.int64), rng=rng or np.random.default_rng())
+
+    def candidates(self, exclude: List[int] = None) -> np.ndarray:
+        """The available uids that are not excluded."""
+        if exclude is not None and len(exclude):
+            return self.uids[~np.isin(self.uids, np.asarray(exclude, dtype=np.int64))]
+        return self.uids
+
+    def sample(self, k: int, exclude: List[int] = None) -> np.ndarray:
+        """Samples up to k distinct available uids that are not excluded."""
+        candidates = self.candidates(exclude)
+        if len(candidates) <= k:
+            return candidates
+        return self.rng.choice(candidates, size=k, replace=False)
+
+    def __len__(self):
+        return len(self.uids)
+
+
+def build_uid_index(self) -> UidIndex:
+    """Builds the uid index of a neuron from its metagraph and config."""
+    return UidIndex.build(
+        self.metagraph,
+        self_uid=self.uid,
+        vpermit_tao_limit=self.config.neuron.vpermit_tao_limit,
+        unique_coldkeys=self.config.neuron.query_unique_coldkeys,
+        unique_ips=self.config.neuron.query_unique_ips,
+    )
+
+
+def digest(*parts) -> int:
+    """64 bit hash of the parts, stable across processes unlike `hash`."""
+    hasher = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        data = str(part).encode("utf-8", "surrogatepass")
+        # Length-prefix each part so that different splits of the same text cannot collide.
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return int.from_bytes(hasher.digest(), "little")
+
+
+def metagraph_fingerprint(hotkeys: List[str], axons: List["bt.AxonInfo"]) -> np.ndarray:
+    """Compact summary of the uids of a metagraph: a hash of the hotkey and a hash of the hotkey, coldkey, ip and port
+    of the axon of each uid. Comparing two fingerprints tells which uids changed without keeping a copy of the
+    metagraph."""
+    n = min(len(hotkeys), len(axons))
+    fingerprint = np.empty(n, dtype=FINGERPRINT_DTYPE)
+    fingerprint["hotkey"] = np.fromiter((digest(hotkey) for hotkey in hotkeys[:n]), dtype=np.uint64, count=n)
+    fingerprint["axon"] = np.fromiter(
+        (digest(axon.hotkey, axon.coldkey, axon.ip, axon.port) for axon in axons[:n]), dtype=np.uint64, count=n
+    )
+    return fingerprint
+
+
+def changed_uids(previous: np.ndarray, current: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Compares two metagraph fingerprints.
+    Returns:
+        changed (np.ndarray): Uids whose hotkey or axon changed, and uids that are new.
+        replaced (np.ndarray): Uids among them whose hotkey was replaced.
+    """
+    n = min(len(previous), len(current))
+    changed = np.concatenate([np.flatnonzero(previous[:n] != current[:n]), np.arange(n, len(current))])
+    replaced = np.flatnonzero(previous["hotkey"][:n] != current["hotkey"][:n])
+    return changed, replaced
+
+
+def get_random_uids(
+    self, k: int, exclude: List[int] = None, sampler=None, avoid: List[int] = None
+) -> torch.LongTensor:
     """Returns k available random uids from the metagraph.
     Args:
         k (int): Number of uids to return.
         exclude (List[int]): List of uids to exclude from the random sampling.
+        sampler (LatencyAwareSampler, optional): Picks the uids among the available ones instead of uniform sampling.
+        avoid (List[int], optional): Uids that are only sampled if there are not enough other available uids, e.g.
+            miners that are still busy with a previous request.
     Returns:
         uids (torch.LongTensor): Randomly sampled available uids.
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
+        The uids are sampled from the neuron's uid index, which is refreshed when the metagraph is synced.
     """
-    candidate_uids = []
-    coldkeys = set()
-    ips = set()
-    for uid in range(self.metagraph.n.item()):
-        if uid == self.uid:
-            continue
-
-        uid_is_available = check_uid_availability(
-            self.metagraph,
-            uid,
-            self.config.neuron.vpermit_tao_limit,
-            coldkeys,
-            ips,
-        )
-        if not uid_is_available:
-            continue
-
-        if self.config.neuron.query_unique_coldkeys:
-            coldkeys.add(self.metagraph.axons[uid].coldkey)
+    uid_index = getattr(self, "uid_index", None)
+    if uid_index is None:
+        uid_index = build_uid_index(self)
 
-        if self.config.neuron.query_unique_ips:
-            ips.add(self.metagraph.axons[uid].ip)
+    def sample(k: int, exclude: List[int]) -> np.ndarray:
+        if sampler is not None:
+            return sampler.sample(uid_index.candidates(exclude), k)
+        return uid_index.sample(k, exclude=exclude)
 
-        if exclude is None or uid not in exclude:
-            candidate_uids.append(uid)
+    exclude = list(exclude or [])
+    candidate_uids = sample(k, exclude + list(avoid or []))
+    if len(candidate_uids) < k and avoid:
+        # Top up with the avoided uids.
+        extra_uids = sample(k - len(candidate_uids), exclude + candidate_uids.tolist())
+        candidate_uids = np.concatenate([candidate_uids, extra_uids]).astype(np.int64)
 
+    if len(candidate_uids) == 0:
+        raise ValueError(f"No eligible uids were found. Cannot return {k} uids")
     # Check if candidate_uids contain enough for querying, if not grab all avaliable uids
-    if 0 < len(candidate_uids) < k:
+    if len(candidate_uids) < k:
         bt.logging.warning(
             f"Requested {k} uids but only {len(candidate_uids)} were available. To disable this warning reduce the sample size (--neuron.sample_size)"
         )
-        return torch.tensor(candidate_uids)
-    elif len(candidate_uids) >= k:
-        return torch.tensor(random.sample(candidate_uids, k))
-    else:
-        raise ValueError(f"No eligible uids were found. Cannot return {k} uids")
\ No newline at end of file
+    return torch.from_numpy(candidate_uids)
@@ -1,8 +1,10 @@
 import bittensor as bt
+from concurrent.futures import ThreadPoolExecutor
 from einstein.forward import forward
 from einstein.llms import vLLMPipeline
 from einstein.base.validator import BaseValidatorNeuron
-from einstein.rewards import RewardPipeline
+from einstein.rewards import RewardPipeline, RewardExecutor, RewardCache
+from einstein.prefetch import ChallengePrefetcher
 
 class Validator(BaseValidatorNeuron):
     """
@@ -21,6 +23,8 @@ class Validator(BaseValidatorNeuron):
             llm_max_allowed_memory_in_gb=self.config.neuron.llm_max_allowed_memory_in_gb,
             device=self.device,
             mock=self.config.mock,
+            batch_window=self.config.neuron.llm_batch_window,
+            max_batch_size=self.config.neuron.llm_max_batch_size,
         )        
 
         if abs(1-sum(self.config.neuron.task_p)) > 0.001:
@@ -34,7 +38,36 @@ class Validator(BaseValidatorNeuron):
         ]
         # Load the reward pipeline
         self.reward_pipeline = RewardPipeline(
-            selected_tasks=self.active_tasks, device=self.device
+            selected_tasks=self.active_tasks,
+            device=self.device,
+            executor=(
+                RewardExecutor(
+                    max_workers=self.config.neuron.reward_workers,
+                    timeout=self.config.neuron.reward_timeout,
+                )
+                if self.config.neuron.reward_workers > 0
+                else None
+            ),
+            model_executor=(
+                ThreadPoolExecutor(
+                    max_workers=self.config.neuron.reward_model_threads, thread_name_prefix="reward"
+                )
+                if self.config.neuron.reward_model_threads > 1
+                else None
+            ),
+            cache=(
+                RewardCache(
+                    maxsize=self.config.neuron.reward_cache_size, ttl=self.config.neuron.reward_cache_ttl
+                )
+                if self.config.neuron.reward_cache_size > 0
+                else None
+            ),
+        )
+
+        # Prepares the next challenges while the current step is waiting on the miners
+        self.challenge_prefetcher = ChallengePrefetcher(
+            llm_pipeline=self.llm_pipeline,
+            maxsize=self.config.neuron.challenge_queue_size,
         )
 
     async def forward(self):
@@ -20,8 +20,10 @@ from uvicorn import Config, Server
 import asyncio
 
 from einstein.protocol import StreamCoreSynapse, ClientRequestSynapse
+from einstein.dispatcher import RequestPriority
+from einstein.utils.exceptions import QueueFullError
 
-ForwardFn = Callable[[StreamCoreSynapse], Awaitable[StreamCoreSynapse]]
+ForwardFn = Callable[[StreamCoreSynapse, RequestPriority], Awaitable[StreamCoreSynapse]]
 
 
 class ApiServer:
@@ -66,7 +68,23 @@ class ApiServer:
         )
         bt.logging.info(f"API: chat_msg {chat_msg}")
         request = StreamCoreSynapse(roles=["user"], messages=[chat_msg])
-        response = await self.forward_fn(request)
+        try:
+            priority = RequestPriority.parse(_request.priority)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+
+        try:
+            response = await self.forward_fn(request, priority)
+        except QueueFullError as e:
+            bt.logging.warning(f"API: rejecting request, {e}")
+            return JSONResponse(status_code=429, content={"detail": str(e)})
+        except asyncio.TimeoutError:
+            bt.logging.warning("API: request deadline exceeded")
+            return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+        except Exception as e:
+            bt.logging.error(f"API: request failed, {e}")
+            return JSONResponse(status_code=500, content={"detail": "Request failed"})
+
         bt.logging.info(f"API: response.completion {response.completion}")
         return JSONResponse(
             status_code=200, content={"detail": "success", "text": response.completion}
@@ -1,34 +1,29 @@
 import time
 import torch
 import bittensor as bt
+from concurrent.futures import ThreadPoolExecutor
 
 from einstein.forward import forward
 from einstein.llms import HuggingFacePipeline, vLLMPipeline
 from einstein.base.validator import BaseValidatorNeuron
-from einstein.rewards import RewardPipeline
-from queue import SimpleQueue
-from dataclasses import dataclass
+from einstein.rewards import RewardPipeline, RewardExecutor, RewardCache
+from einstein.prefetch import ChallengePrefetcher
 from einstein.protocol import StreamCoreSynapse
 from neurons.api_server import ApiServer
-import threading
-import anyio
-import asyncio
-
-
-@dataclass
-class SynapseWithEvent:
-    """Object that API server can send to main thread to be serviced."""
-
-    input_synapse: StreamCoreSynapse
-    event: threading.Event
-    output_synapse: StreamCoreSynapse
+from einstein.dispatcher import RequestDispatcher, RequestPriority, LatencyTracker
 
 
 class Validator(BaseValidatorNeuron):
 
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)
-        self.api_queue = asyncio.Queue()  # Queue of SynapseEventPair
+        # Bounded priority queue of API requests, shared by the API server thread and the validator loop.
+        self.api_dispatcher = RequestDispatcher(
+            maxsize=self.config.neuron.api_queue_size,
+            default_timeout=self.config.neuron.api_request_timeout,
+        )
+        # Rolling end-to-end latency of API requests, per organic mode.
+        self.api_latency = LatencyTracker()
 
         bt.logging.info("load_state()")
         self.load_state()
@@ -39,6 +34,8 @@ class Validator(BaseValidatorNeuron):
             llm_max_allowed_memory_in_gb=self.config.neuron.llm_max_allowed_memory_in_gb,
             device=self.device,
             mock=self.config.mock,
+            batch_window=self.config.neuron.llm_batch_window,
+            max_batch_size=self.config.neuron.llm_max_batch_size,
         )        
 
         if abs(1-sum(self.config.neuron.task_p)) > 0.001:
@@ -52,7 +49,36 @@ class Validator(BaseValidatorNeuron):
         ]
         # Load the reward pipeline
         self.reward_pipeline = RewardPipeline(
-            selected_tasks=self.active_tasks, device=self.device
+            selected_tasks=self.active_tasks,
+            device=self.device,
+            executor=(
+                RewardExecutor(
+                    max_workers=self.config.neuron.reward_workers,
+                    timeout=self.config.neuron.reward_timeout,
+                )
+                if self.config.neuron.reward_workers > 0
+                else None
+            ),
+            model_executor=(
+                ThreadPoolExecutor(
+                    max_workers=self.config.neuron.reward_model_threads, thread_name_prefix="reward"
+                )
+                if self.config.neuron.reward_model_threads > 1
+                else None
+            ),
+            cache=(
+                RewardCache(
+                    maxsize=self.config.neuron.reward_cache_size, ttl=self.config.neuron.reward_cache_ttl
+                )
+                if self.config.neuron.reward_cache_size > 0
+                else None
+            ),
+        )
+
+        # Prepares the next challenges while the current step is waiting on the miners
+        self.challenge_prefetcher = ChallengePrefetcher(
+            llm_pipeline=self.llm_pipeline,
+            maxsize=self.config.neuron.challenge_queue_size,
         )
 
         # API server
@@ -61,20 +87,11 @@ class Validator(BaseValidatorNeuron):
             forward_fn=self.queue_forward,
         )
 
-    async def queue_forward(self, synapse: StreamCoreSynapse) -> StreamCoreSynapse:
-        """Forward function for API server."""
-        synapse_with_event = SynapseWithEvent(
-            input_synapse=synapse,
-            event=threading.Event(),
-            output_synapse=StreamCoreSynapse(
-                roles=["validator"], messages=["Hello, how are you?"]
-            ),
-        )
-        self.api_queue.put_nowait(synapse_with_event)
-
-        # Wait until the main thread marks this synapse as processed.
-        await anyio.to_thread.run_sync(synapse_with_event.event.wait)
-        return synapse_with_event.output_synapse
+    async def queue_forward(
+        self, synapse: StreamCoreSynapse, priority: RequestPriority = RequestPriority.NORMAL
+    ) -> StreamCoreSynapse:
+        """Forward function for API server. Waits until the validator loop has serviced the synapse."""
+        return await self.api_dispatcher.submit(synapse, priority=priority)
 
     async def forward(self):
         """
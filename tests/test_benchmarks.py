@@ -0,0 +1,63 @@
+import json
+from einstein.rewards import RewardPipeline
+from benchmarks.synthetic import make_response_event
+from benchmarks.rewards import BenchmarkResult, run_case, compare, main
+
+
+def test_synthetic_response_event_shape():
+    event = make_response_event(num_miners=20, completion_length=256, duplicate_ratio=0.5)
+
+    assert len(event.completions) == 20
+    assert len(event.unique_completions) == 10
+    assert all(250 <= len(completion) for completion in event.completions)
+    for chunks, completion in zip(event.stream_results_all_chunks, event.completions):
+        assert "".join(chunks) == completion
+
+
+def test_run_case_times_each_model():
+    pipeline = RewardPipeline(selected_tasks=["math"], device="cpu")
+    result = run_case(pipeline, num_miners=8, completion_length=128, duplicate_ratio=0.25, repeats=2)
+
+    assert result.total_time > 0
+    assert result.completions_per_sec > 0
+    assert result.peak_memory_mb > 0
+    assert {"advanced_math", "streaming"} <= set(result.model_times)
+
+
+def test_compare_reports_regressions():
+    baseline = BenchmarkResult(8, 128, 0.0, total_time=0.01, completions_per_sec=800, peak_memory_mb=1.0)
+    slower = BenchmarkResult(8, 128, 0.0, total_time=0.02, completions_per_sec=400, peak_memory_mb=1.0)
+    other_case = BenchmarkResult(16, 128, 0.0, total_time=1.0, completions_per_sec=16, peak_memory_mb=1.0)
+
+    regressions = compare([slower, other_case], [vars(baseline)], threshold=0.2)
+
+    assert len(regressions) == 1
+    assert "total_time" in regressions[0]
+    assert compare([baseline], [vars(baseline)], threshold=0.2) == []
+
+
+def test_save_and_compare_baseline(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    args = ["--miners", "4", "--completion-length", "64", "--duplicate-ratio", "0", "--repeats", "1"]
+
+    assert main(args + ["--save", path]) == 0
+    with open(path) as f:
+        assert len(json.load(f)) == 1
+    # Any run is far within a threshold of 100x of the same run.
+    assert main(args + ["--compare", path, "--threshold", "100"]) == 0
+
+
+def test_tokens_benchmark_runs_every_mode(capsys):
+    from benchmarks.tokens import main as tokens_main
+
+    tokens_main(["--miners", "2", "--words", "50", "--repeats", "1"])
+
+    assert len(capsys.readouterr().out.splitlines()) == 4
+
+
+def test_batch_math_scorer_matches_per_completion_scores():
+    from benchmarks.math_scorer import make_completions, run as run_math_scorer
+
+    for final_answer in (True, False):
+        loop_time, batch_time = run_math_scorer(make_completions(8, 512, final_answer))
+        assert loop_time > 0 and batch_time > 0
@@ -0,0 +1,132 @@
+import time
+import asyncio
+import pytest
+import threading
+from einstein.dispatcher import RequestDispatcher, RequestPriority, LatencyTracker
+from einstein.protocol import StreamCoreSynapse
+from einstein.utils.exceptions import QueueFullError
+
+
+def make_synapse(message: str) -> StreamCoreSynapse:
+    return StreamCoreSynapse(roles=["user"], messages=[message])
+
+
+def serve_in_thread(dispatcher: RequestDispatcher, served: list, count: int):
+    """Emulates the validator loop, servicing requests from another thread."""
+
+    def run():
+        while len(served) < count:
+            request = dispatcher.get_nowait()
+            if request is None:
+                time.sleep(0.01)
+                continue
+            message = request.input_synapse.messages[0]
+            served.append(message)
+            request.set_result(
+                StreamCoreSynapse(roles=["validator"], messages=[message], completion=message.upper())
+            )
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_requests_are_resolved_across_threads():
+    dispatcher = RequestDispatcher(maxsize=8)
+    served = []
+
+    async def run():
+        serve_in_thread(dispatcher, served, count=3)
+        return await asyncio.gather(*(dispatcher.submit(make_synapse(m)) for m in ["a", "b", "c"]))
+
+    responses = asyncio.run(run())
+    assert [response.completion for response in responses] == ["A", "B", "C"]
+
+
+def test_requests_are_served_by_priority():
+    dispatcher = RequestDispatcher(maxsize=8)
+    served = []
+
+    async def run():
+        submissions = [
+            dispatcher.submit(make_synapse("low"), priority=RequestPriority.LOW),
+            dispatcher.submit(make_synapse("normal"), priority="normal"),
+            dispatcher.submit(make_synapse("high"), priority="high"),
+        ]
+        tasks = [asyncio.ensure_future(submission) for submission in submissions]
+        # Let every request reach the queue before the validator loop starts servicing them.
+        await asyncio.sleep(0.01)
+        serve_in_thread(dispatcher, served, count=3)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert served == ["high", "normal", "low"]
+
+
+def test_full_queue_rejects_requests():
+    dispatcher = RequestDispatcher(maxsize=1)
+
+    async def run():
+        pending = asyncio.ensure_future(dispatcher.submit(make_synapse("a"), timeout=0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await dispatcher.submit(make_synapse("b"))
+        with pytest.raises(asyncio.TimeoutError):
+            await pending
+
+    asyncio.run(run())
+
+
+def test_expired_requests_fail_fast_and_are_dropped():
+    dispatcher = RequestDispatcher(maxsize=4)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await dispatcher.submit(make_synapse("a"), timeout=0.01)
+
+    asyncio.run(run())
+    # The validator loop never sees a request whose requester has given up.
+    assert dispatcher.get_nowait() is None
+    assert dispatcher.empty()
+
+
+def test_abandoned_requests_do_not_fill_the_queue():
+    dispatcher = RequestDispatcher(maxsize=2)
+    served = []
+
+    async def run():
+        for message in ["a", "b"]:
+            with pytest.raises(asyncio.TimeoutError):
+                await dispatcher.submit(make_synapse(message), timeout=0.01)
+        # The queue is full of requests nobody waits for anymore: a live client must not get a QueueFullError.
+        pending = asyncio.ensure_future(dispatcher.submit(make_synapse("c"), timeout=1))
+        await asyncio.sleep(0)
+        serve_in_thread(dispatcher, served, count=1)
+        return await pending
+
+    assert asyncio.run(run()).completion == "C"
+    assert served == ["c"]
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        RequestPriority.parse("urgent")
+
+
+def test_latency_tracker_reports_percentiles_per_mode():
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 101):
+        tracker.record("fast", latency / 100)
+    tracker.record("full", 5.0)
+
+    state = tracker.__state_dict__()
+    assert state["api_latency_p50_fast"] == pytest.approx(0.505)
+    assert state["api_latency_p99_fast"] == pytest.approx(0.9901)
+    assert state["api_latency_p50_full"] == state["api_latency_p99_full"] == 5.0
+
+
+def test_latency_tracker_window_is_bounded():
+    tracker = LatencyTracker(window=3)
+    for latency in [100, 1, 1, 1]:
+        tracker.record("fast", latency)
+    assert tracker.percentile("fast", 99) == 1
@@ -0,0 +1,61 @@
+import time
+import pytest
+from einstein.rewards import AdvancedMathModel
+from einstein.rewards.equivalence import EquivalenceEngine, canonicalize
+
+
+@pytest.mark.parametrize(
+    "reference, answer",
+    [
+        ("0.5", "1/2"),
+        ("0.5", "2*0.25."),
+        ("$\\frac{1}{2}$", "0.5"),
+        ("\\sqrt{2}", "2^(1/2)"),
+        ("1000", "1e3"),
+        ("x^2 + 2x + 1", "(x+1)**2"),
+    ],
+)
+def test_equivalent_forms(reference, answer):
+    assert EquivalenceEngine().equivalent(reference, answer)
+
+
+@pytest.mark.parametrize(
+    "reference, answer",
+    [("0.5", "0.51"), ("x + 1", "x - 1"), ("2", "two"), ("0.5", "The answer is 1/2, as shown above" * 20)],
+)
+def test_different_answers(reference, answer):
+    assert not EquivalenceEngine().equivalent(reference, answer)
+
+
+@pytest.mark.parametrize(
+    "answer",
+    ["9^9^9^9", "9**(1-10**9)", "2^1000", "x.__class__", "__import__('os')", "a_b", "'1'", "lambda: 1", "[1][0]"],
+)
+def test_unsafe_answers_are_not_evaluated(answer):
+    engine = EquivalenceEngine()
+    assert not engine.is_safe(engine.normalize(answer))
+    assert engine.canonical(answer) is None
+
+
+@pytest.mark.parametrize("answer", ["(a+b+c+d+f+g+h)^40", "((9^99)^99)^99", "(x+y+z)^20 (a+b+c)^20", "1/(a+b+c+d)^60"])
+def test_large_expansions_are_rejected_before_evaluation(answer):
+    engine = EquivalenceEngine()
+    assert engine.is_safe(engine.normalize(answer))
+    t0 = time.time()
+    assert canonicalize(engine.normalize(answer)) is None
+    assert not engine.equivalent("x", answer)
+    assert time.time() - t0 < 1
+
+
+def test_canonical_forms_are_cached_by_normalized_answer():
+    engine = EquivalenceEngine(maxsize=2)
+    for answer in ["1/2", " 1/2. ", "$1/2$", "1/2"]:
+        engine.equivalent("0.5", answer)
+
+    info = engine.cache_info()
+    assert (info.misses, info.hits, info.currsize) == (2, 6, 2)
+
+
+def test_math_score_rewards_equivalent_final_answer():
+    completion = "Halving gives the result. The final answer is 1/2"
+    assert AdvancedMathModel.math_score("0.5", completion) == 1.0
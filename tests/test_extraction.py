@@ -0,0 +1,116 @@
+import re
+import random
+import pytest
+from einstein.rewards import AdvancedMathModel
+from einstein.rewards.advanced_math import BatchMathScorer
+from einstein.rewards.extraction import (
+    MAX_SCAN_LENGTH,
+    answer_text,
+    extract_final_answer,
+    parse_number,
+    scan_window,
+    tokenize_numbers,
+)
+
+# The regexes the extractor replaces.
+ORIGINAL_FINAL_ANSWER = re.compile(r"the final answer is\:?\s*(.+)", re.IGNORECASE)
+ORIGINAL_NUMERIC = re.compile(r"[-+]?\d*\.\d+|\d+")
+
+
+def random_text(rng: random.Random, markers: int) -> str:
+    pieces = ["x", "=", "-", "+", ".", ":", " ", "  ", "\n", "\t", "\r", "12", "3.5", "-.5", "so", "E"]
+    tokens = rng.choices(pieces, k=rng.randint(0, 30))
+    for _ in range(markers):
+        tokens.insert(rng.randint(0, len(tokens)), rng.choice(["the final answer is", "The Final Answer Is"]))
+    return "".join(tokens)
+
+
+def test_extractor_matches_original_regex_with_one_marker():
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = random_text(rng, markers=rng.randint(0, 1))
+        match = ORIGINAL_FINAL_ANSWER.search(text)
+        if match is None:
+            assert extract_final_answer(text) is None, text
+            continue
+        # The regex can backtrack to an answer of whitespace, or of the colon after the marker, which the extractor
+        # does not consider an answer.
+        rest = text[match.start() + len("the final answer is"):]
+        expected = match.group(1) if rest[rest.startswith(":"):].strip() else None
+        assert extract_final_answer(text) == expected, text
+
+
+def test_tokenizer_matches_original_regex_without_exponents():
+    rng = random.Random(1)
+    for _ in range(5000):
+        text = "".join(rng.choices("-+.0123456789٣ ax:\n", k=rng.randint(0, 40)))
+        assert tokenize_numbers(text) == ORIGINAL_NUMERIC.findall(text)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("the final answer is 12. Wait, let me check. The final answer is 42", "42"),
+        ("The final answer is 41\nthe final answer is", "41"),
+        ("The final answer is: \n\n 7 apples\nthe end", "7 apples"),
+        ("the final answer is   \n", None),
+        ("no answer", None),
+    ],
+)
+def test_extractor_uses_last_answered_marker(text, expected):
+    assert extract_final_answer(text) == expected
+
+
+def test_extractor_only_scans_the_end_of_the_text():
+    text = "The final answer is 42\n" + "x" * MAX_SCAN_LENGTH
+    assert extract_final_answer(text) is None
+    assert extract_final_answer(text, max_length=len(text)) == "42"
+
+    # The number split by the cut is dropped.
+    assert scan_window("1" * 10 + "x 7", max_length=5) == "x 7"
+    assert scan_window("12.5e-3 and 7", max_length=12) == " and 7"
+    # Words that start with an exponent letter are kept.
+    assert scan_window("1" * 10 + "equation 7", max_length=10) == "equation 7"
+    assert scan_window("1" * 10 + "12Equation 7", max_length=12) == "Equation 7"
+    assert answer_text("12345 and 7", max_length=7) == " and 7"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("6.02e23 mol", [6.02e23]),
+        ("1e3 and 1E-3", [1000.0, 0.001]),
+        ("-2.5e2 +1e2", [-250.0, 100.0]),
+        ("-12 and 1e", [12, 1]),
+        ("2024 events", [2024]),
+    ],
+)
+def test_tokenizer_parses_scientific_notation(text, expected):
+    assert [parse_number(token) for token in tokenize_numbers(text)] == expected
+
+
+def test_math_score_is_bounded_on_long_completions():
+    filler = "x " * MAX_SCAN_LENGTH
+    assert AdvancedMathModel.math_score("42", "The final answer is 42. " + filler) == 0
+    assert AdvancedMathModel.math_score("42", filler + "The final answer is 42") == 1
+
+
+def test_batch_scorer_matches_math_score_on_long_completions():
+    rng = random.Random(2)
+    words = ["7", "42", "x", "1e2", "the final answer is", "\n", "-3.5"]
+    completions = [" ".join(rng.choices(words, k=rng.randint(1, 4 * MAX_SCAN_LENGTH // 3))) for _ in range(50)]
+
+    expected = [AdvancedMathModel.math_score("42", completion) for completion in completions]
+    assert BatchMathScorer("42").score(completions) == expected
+
+
+@pytest.mark.parametrize(
+    "prefix, suffix", [("The final answer is 42\n", "x " * MAX_SCAN_LENGTH), ("", " the final answer is 42")]
+)
+def test_incremental_scorer_matches_math_score_on_long_completions(prefix, suffix):
+    completion = prefix + "the final answer is 7 " + "y " * MAX_SCAN_LENGTH + suffix
+    scorer = AdvancedMathModel().incremental_scorer("42")
+    for i in range(0, len(completion), 100):
+        scorer.update(completion[i : i + 100])
+
+    assert scorer.finalize(completion) == AdvancedMathModel.math_score("42", completion)
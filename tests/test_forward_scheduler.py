@@ -0,0 +1,139 @@
+import time
+import asyncio
+import pytest
+from unittest.mock import patch
+from types import SimpleNamespace
+from einstein.base.validator import BaseValidatorNeuron
+
+
+def make_mock_neuron(num_concurrent_forwards, total_steps, forward_time=0.01):
+    neuron = SimpleNamespace(
+        step=0,
+        block=0,
+        should_exit=False,
+        in_flight=0,
+        max_in_flight=0,
+        forward_slot_times={},
+        background_tasks=set(),
+        subtensor=SimpleNamespace(get_current_block=lambda: 0),
+        config=SimpleNamespace(
+            neuron=SimpleNamespace(
+                num_concurrent_forwards=num_concurrent_forwards,
+                forward_max_time=5,
+                maintenance_interval=0,
+            )
+        ),
+    )
+
+    async def forward():
+        neuron.in_flight += 1
+        neuron.max_in_flight = max(neuron.max_in_flight, neuron.in_flight)
+        await asyncio.sleep(forward_time)
+        neuron.in_flight -= 1
+
+    def sync():
+        if neuron.step + 1 >= total_steps:
+            neuron.should_exit = True
+
+    neuron.forward = forward
+    neuron.sync = sync
+    return neuron
+
+
+@pytest.mark.parametrize("num_concurrent_forwards", [1, 2, 4])
+def test_scheduler_keeps_forwards_in_flight(num_concurrent_forwards: int):
+    neuron = make_mock_neuron(num_concurrent_forwards, total_steps=8)
+
+    asyncio.run(BaseValidatorNeuron.run_concurrent_forwards(neuron))
+
+    assert neuron.max_in_flight == num_concurrent_forwards
+    assert neuron.step == 8
+    assert neuron.in_flight == 0
+    assert sorted(neuron.forward_slot_times) == list(range(num_concurrent_forwards))
+
+
+def test_scheduler_skips_sync_on_forward_timeout():
+    neuron = make_mock_neuron(2, total_steps=1, forward_time=0.05)
+    neuron.config.neuron.forward_max_time = 0.01
+    calls = 0
+
+    async def forward():
+        nonlocal calls
+        calls += 1
+        if calls > 4:
+            neuron.should_exit = True
+            return
+        await asyncio.sleep(1)
+
+    neuron.forward = forward
+
+    asyncio.run(BaseValidatorNeuron.run_concurrent_forwards(neuron))
+
+    # Timed out forwards are not counted as steps.
+    assert calls > 4
+    assert neuron.step == 0
+
+
+def test_background_tasks_are_cancelled_on_exit():
+    neuron = make_mock_neuron(1, total_steps=2)
+
+    async def forward():
+        # Like the scoring of an organic request, which outlives its forward.
+        neuron.background_tasks.add(asyncio.ensure_future(asyncio.sleep(60)))
+
+    async def run():
+        neuron.forward = forward
+        await BaseValidatorNeuron.run_concurrent_forwards(neuron)
+        await asyncio.sleep(0)
+        return list(neuron.background_tasks)
+
+    tasks = asyncio.run(run())
+
+    assert len(tasks) == 2
+    assert all(task.cancelled() for task in tasks)
+
+
+def test_background_maintenance_does_not_block_forwards():
+    neuron = make_mock_neuron(2, total_steps=1000, forward_time=0.01)
+    neuron.config.neuron.maintenance_interval = 0.05
+    neuron.sync = lambda: pytest.fail("sync should not run after forwards")
+    rounds = []
+
+    def run_maintenance_step():
+        # A slow chain call, which would stall every forward if it ran on the event loop.
+        time.sleep(0.1)
+        rounds.append(neuron.step)
+        if len(rounds) == 2:
+            neuron.should_exit = True
+        return {"set_weights": 0.1}
+
+    neuron.run_maintenance_step = run_maintenance_step
+    neuron.run_maintenance = lambda: BaseValidatorNeuron.run_maintenance(neuron)
+    logged = []
+
+    with patch("einstein.base.validator.log_event", lambda self, event: logged.append(event)):
+        asyncio.run(BaseValidatorNeuron.run_concurrent_forwards(neuron))
+
+    # Forwards kept running during the 0.1s maintenance rounds.
+    assert rounds[0] >= 10
+    assert rounds[1] - rounds[0] >= 10
+    assert neuron.maintenance_times == {"set_weights": 0.1}
+    assert logged[0]["set_weights_time"] == 0.1
+
+
+def test_block_is_read_from_maintenance_in_the_background():
+    calls = []
+    neuron = SimpleNamespace(
+        maintenance_block=None,
+        subtensor=SimpleNamespace(get_current_block=lambda: calls.append(1) or 100 + len(calls)),
+        check_registered=lambda: None,
+        should_sync_metagraph=lambda: False,
+        should_set_weights=lambda: False,
+        save_state=lambda: None,
+    )
+
+    BaseValidatorNeuron.run_maintenance_step(neuron)
+    assert [BaseValidatorNeuron.block.fget(neuron) for _ in range(3)] == [101] * 3
+    BaseValidatorNeuron.run_maintenance_step(neuron)
+    assert BaseValidatorNeuron.block.fget(neuron) == 102
+    assert len(calls) == 2
@@ -0,0 +1,120 @@
+import time
+import pytest
+import asyncio
+from einstein.forward import process_stream
+from einstein.protocol import StreamCoreSynapse
+from einstein.utils.inflight import InFlightRegistry
+
+
+class WhitespaceTokenizer:
+    def tokenize(self, text):
+        return text.split()
+
+
+def make_stream(chunks, request_nonce, status_code=200):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+        synapse = StreamCoreSynapse(
+            roles=["user"], messages=["hi"], completion="".join(chunks), request_nonce=request_nonce
+        )
+        synapse.dendrite.status_code = status_code
+        yield synapse
+
+    return stream()
+
+
+def test_acquired_uids_are_busy():
+    registry = InFlightRegistry()
+    registry.acquire([1, 2, 3], registry.new_nonce(), timeout=10)
+    assert sorted(registry.busy_uids()) == [1, 2, 3]
+    assert registry.is_busy(2)
+    assert not registry.is_busy(4)
+
+
+def test_release_requires_matching_nonce():
+    registry = InFlightRegistry()
+    old_nonce, new_nonce = registry.new_nonce(), registry.new_nonce()
+    registry.acquire([1], old_nonce, timeout=10)
+    registry.acquire([1], new_nonce, timeout=10)
+
+    # A late stream from the old request must not free the miner.
+    assert not registry.release(1, old_nonce)
+    assert registry.is_busy(1)
+    assert registry.release(1, new_nonce)
+    assert not registry.is_busy(1)
+
+
+def test_expired_requests_are_dropped():
+    registry = InFlightRegistry()
+    registry.acquire([1], registry.new_nonce(), timeout=0.01)
+    time.sleep(0.02)
+    assert registry.busy_uids() == []
+
+
+def test_held_uids_stay_busy_for_the_cooldown():
+    registry = InFlightRegistry(cooldown=0.05)
+    nonce = registry.new_nonce()
+    registry.acquire([1], nonce, timeout=0.01)
+
+    assert not registry.hold(1, registry.new_nonce())
+    assert registry.hold(1, nonce)
+    time.sleep(0.02)
+    assert registry.is_busy(1)
+    time.sleep(0.04)
+    assert not registry.is_busy(1)
+
+
+def test_process_stream_releases_uid_when_stream_ends():
+    registry = InFlightRegistry()
+    nonce = registry.new_nonce()
+    registry.acquire([7], nonce, timeout=10)
+
+    result = asyncio.run(
+        process_stream(7, make_stream(["a b", " c"], nonce), WhitespaceTokenizer(), nonce=nonce, in_flight=registry)
+    )
+
+    assert result.exception is None
+    assert result.synapse.completion == "a b c"
+    assert not registry.is_busy(7)
+
+
+def test_process_stream_holds_uid_after_timeout_or_error():
+    registry = InFlightRegistry(cooldown=10)
+    nonce = registry.new_nonce()
+    registry.acquire([7, 8], nonce, timeout=0)
+
+    async def failing_stream():
+        yield "partial"
+        raise ConnectionResetError()
+
+    asyncio.run(
+        process_stream(7, make_stream(["a"], nonce, 408), WhitespaceTokenizer(), nonce=nonce, in_flight=registry)
+    )
+    result = asyncio.run(process_stream(8, failing_stream(), WhitespaceTokenizer(), nonce=nonce, in_flight=registry))
+
+    assert isinstance(result.exception, ConnectionResetError)
+    assert sorted(registry.busy_uids()) == [7, 8]
+
+
+def test_cancelled_stream_holds_uid_and_propagates():
+    registry = InFlightRegistry(cooldown=10)
+    nonce = registry.new_nonce()
+    registry.acquire([7], nonce, timeout=0)
+
+    async def endless_stream():
+        while True:
+            yield "chunk"
+            await asyncio.sleep(0.01)
+
+    async def run():
+        task = asyncio.ensure_future(
+            process_stream(7, endless_stream(), WhitespaceTokenizer(), nonce=nonce, in_flight=registry)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert registry.busy_uids() == [7]
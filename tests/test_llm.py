@@ -1,5 +1,7 @@
 import pytest
-from einstein.llms import BaseLLM, BasePipeline, load_vllm_pipeline
+import asyncio
+import threading
+from einstein.llms import BaseLLM, BasePipeline, MicroBatcher, load_vllm_pipeline, vLLMPipeline, vLLM_LLM
 from einstein.llms.utils import (
     contains_gpu_index_in_device,
     calculate_gpu_requirements,
@@ -7,6 +9,7 @@ from einstein.llms.utils import (
 from einstein.cleaners import CleanerPipeline
 from einstein.mock import MockPipeline
 from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 from .fixtures.llm import llms, pipelines
 from .fixtures.cleaner import DEFAULT_CLEANER_PIPELINE
 import pytest
@@ -174,3 +177,74 @@ def test_load_vllm_pipeline_exception_second_try(
         load_vllm_pipeline(model_id="HuggingFaceH4/zephyr-7b-beta", device="gpu0")
     assert mock_llm.call_count == 2  # LLM is called twice
     mock_clean_gpu_cache.assert_called_once()  # Ensures clean_gpu_cache was called
+
+
+def test_vllm_pipeline_generate_batch_mock():
+    pipeline = vLLMPipeline(model_id="mock", llm_max_allowed_memory_in_gb=0, mock=True)
+    outputs = pipeline.generate_batch(["a", "b", "c"], {"max_tokens": 16})
+
+    assert outputs == [pipeline("a")] * 3
+
+
+def test_vllm_pipeline_generate_batch_rejects_mismatched_params():
+    pipeline = vLLMPipeline(model_id="mock", llm_max_allowed_memory_in_gb=0, mock=True)
+    with pytest.raises(ValueError):
+        pipeline.generate_batch(["a", "b"], [{}])
+
+
+def test_micro_batcher_gathers_concurrent_calls():
+    batches = []
+
+    def generate_batch(prompts, sampling_params):
+        batches.append(list(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+    batcher = MicroBatcher(generate_batch, window=0.2, max_batch_size=8)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(batcher, [f"p{i}" for i in range(8)]))
+
+    assert outputs == [f"P{i}" for i in range(8)]
+    assert sum(len(batch) for batch in batches) == 8
+    assert len(batches) < 8
+    assert batcher.average_batch_size > 1
+
+
+def test_micro_batcher_propagates_errors():
+    def generate_batch(prompts, sampling_params):
+        raise RuntimeError("engine failure")
+
+    batcher = MicroBatcher(generate_batch, window=0.0)
+    with pytest.raises(RuntimeError, match="engine failure"):
+        batcher("prompt")
+
+
+def test_vllm_llm_aquery():
+    llm = vLLM_LLM(MockPipeline("This is just another test."), "")
+    response = asyncio.run(llm.aquery("test"))
+
+    assert response == "This is just another test."
+    assert [message["role"] for message in llm.messages] == ["system", "user", "assistant"]
+    assert len(llm.times) == 3
+
+
+def test_pipeline_agenerate_runs_off_the_event_loop():
+    class ThreadRecordingPipeline(BasePipeline):
+        def __call__(self, composed_prompt, **kwargs):
+            return threading.current_thread().name
+
+    async def run():
+        return threading.current_thread().name, await ThreadRecordingPipeline().agenerate("prompt")
+
+    loop_thread, generation_thread = asyncio.run(run())
+    assert generation_thread != loop_thread
+    assert generation_thread.startswith("generation")
+
+
+def test_vllm_pipeline_agenerate_with_batcher():
+    pipeline = vLLMPipeline(model_id="mock", llm_max_allowed_memory_in_gb=0, mock=True, batch_window=0.05)
+
+    async def run():
+        return await asyncio.gather(*(pipeline.agenerate(f"p{i}") for i in range(4)))
+
+    assert asyncio.run(run()) == [pipeline("p")] * 4
+    assert pipeline.batcher.num_batches < 4
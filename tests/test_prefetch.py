@@ -0,0 +1,105 @@
+import time
+import asyncio
+import pytest
+import urllib.parse
+from einstein.prefetch import ChallengePrefetcher, PreparedChallenge, encode_challenge
+from einstein.conversation import create_task
+from einstein.dendrite import SynapseStreamResult
+from einstein.forward import select_fastest_response
+from einstein.protocol import StreamCoreSynapse
+from einstein.utils.exceptions import MaxRetryError
+
+from .fixtures.llm import mock_llm_pipeline
+
+
+def test_encode_challenge_roundtrip():
+    message = encode_challenge("What is 1 + 1?")
+    assert urllib.parse.parse_qs(message)["question_text"] == ["What is 1 + 1?"]
+
+
+def test_build_challenge_with_problem():
+    prefetcher = ChallengePrefetcher(llm_pipeline=mock_llm_pipeline())
+    challenge = prefetcher.build(problem="What is 1 + 1?")
+
+    assert challenge.task.name == "math"
+    assert challenge.agent.task is challenge.task
+    assert challenge.message == challenge.agent.challenge
+    assert "question_text" in urllib.parse.parse_qs(challenge.message)
+    assert challenge.generation_time >= 0
+
+
+def test_producer_fills_bounded_queue():
+    prefetcher = ChallengePrefetcher(llm_pipeline=mock_llm_pipeline(), maxsize=3)
+    built = []
+
+    def build(problem=""):
+        built.append(problem)
+        return PreparedChallenge(
+            task=None, agent=None, message=str(len(built)), generation_time=0.0, created_at=time.time()
+        )
+
+    prefetcher.build = build
+
+    async def run():
+        first = await prefetcher.get()
+        # Give the producer time to refill the queue while the "step" is in progress.
+        await asyncio.sleep(0.1)
+        depth = prefetcher.queue.qsize()
+        second = await prefetcher.get()
+        prefetcher.stop()
+        return first, depth, second
+
+    first, depth, second = asyncio.run(run())
+
+    assert (first.message, second.message) == ("1", "2")
+    assert depth == 3
+    assert second.queue_depth == 3
+    # The queue is bounded: one popped + maxsize queued + at most one waiting to be put.
+    assert len(built) <= 1 + 3 + 2
+
+
+def test_get_raises_when_the_producer_gives_up():
+    prefetcher = ChallengePrefetcher(llm_pipeline=mock_llm_pipeline(), max_retries=2, retry_delay=0)
+
+    def build(problem=""):
+        raise ValueError("No task could be created")
+
+    prefetcher.build = build
+
+    async def run():
+        try:
+            with pytest.raises(MaxRetryError):
+                await asyncio.wait_for(prefetcher.get(), timeout=5)
+            # The next call restarts the producer.
+            with pytest.raises(MaxRetryError):
+                await asyncio.wait_for(prefetcher.get(), timeout=5)
+        finally:
+            prefetcher.stop()
+
+    asyncio.run(run())
+
+
+def test_create_task_without_reference():
+    task = create_task(
+        llm_pipeline=mock_llm_pipeline(), task_name="math", problem="What is 1 + 1?", create_reference=False
+    )
+    assert "What is 1 + 1?" in task.query
+    assert not task.reference
+
+
+def test_fast_lane_returns_fastest_completed_response():
+    def result(completion, finished_at, exception=None):
+        return SynapseStreamResult(
+            exception=exception,
+            accumulated_chunks_timings=[finished_at / 2, finished_at],
+            synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion),
+        )
+
+    stream_results = [
+        result("slow", 2.0),
+        result("", 0.1),
+        result("failed", 0.2, exception=TimeoutError()),
+        result("fast", 1.0),
+    ]
+    assert select_fastest_response(stream_results) == "fast"
+    assert select_fastest_response(stream_results[1:3]) == ""
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from einstein.dendrite import SynapseStreamResult
+from einstein.forward import wait_for_quorum, has_final_answer
+from einstein.protocol import StreamCoreSynapse
+
+
+async def stream(uid: int, completion: str, delay: float) -> SynapseStreamResult:
+    await asyncio.sleep(delay)
+    return SynapseStreamResult(
+        uid=uid,
+        accumulated_chunks_timings=[delay],
+        synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion),
+    )
+
+
+def run_quorum(streams, quorum, answer_check=None):
+    async def run():
+        tasks = [asyncio.ensure_future(stream(*args)) for args in streams]
+        completed = await wait_for_quorum(tasks, quorum=quorum, answer_check=answer_check)
+        pending = sum(not task.done() for task in tasks)
+        # Stragglers keep streaming and can still be gathered for scoring.
+        results = await asyncio.gather(*tasks)
+        return [result.uid for result in completed], pending, len(results)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "quorum, expected_uids, expected_pending",
+    [(1, [0], 2), (2, [0, 1], 1), (0, [0, 1, 2], 0), (5, [0, 1, 2], 0)],
+)
+def test_quorum_returns_early(quorum, expected_uids, expected_pending):
+    streams = [(0, "4", 0.01), (1, "4", 0.05), (2, "4", 0.3)]
+    completed_uids, pending, num_results = run_quorum(streams, quorum)
+
+    assert completed_uids == expected_uids
+    assert pending == expected_pending
+    assert num_results == 3
+
+
+def test_empty_responses_do_not_count_towards_quorum():
+    streams = [(0, "", 0.01), (1, "4", 0.05), (2, "4", 0.3)]
+    completed_uids, pending, _ = run_quorum(streams, quorum=1)
+
+    assert completed_uids == [1]
+    assert pending == 1
+
+
+def test_answer_check_returns_before_quorum():
+    streams = [(0, "I think", 0.01), (1, "The final answer is 4", 0.05), (2, "4", 0.3)]
+    completed_uids, pending, _ = run_quorum(streams, quorum=3, answer_check=has_final_answer)
+
+    assert completed_uids == [0, 1]
+    assert pending == 1
@@ -0,0 +1,119 @@
+import torch
+from types import SimpleNamespace
+from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
+from einstein.protocol import StreamCoreSynapse
+from einstein.rewards import AdvancedMathModel, RewardCache, RewardModelTypeEnum, StreamingRewardModel, ExecutorResult
+
+REFERENCE = "42"
+
+
+def make_response_event(completions):
+    results = [
+        SynapseStreamResult(uid=uid, synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion))
+        for uid, completion in enumerate(completions)
+    ]
+    return DendriteResponseEvent(results, uids=torch.arange(len(completions)), timeout=1)
+
+
+def counting_model():
+    model = AdvancedMathModel()
+    scored = []
+    reward = model.reward
+
+    def counting_reward(reference, response_event):
+        scored.extend(response_event.completions)
+        return reward(reference, response_event)
+
+    model.reward = counting_reward
+    return model, scored
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache = RewardCache(maxsize=10, ttl=60, clock=lambda: now[0])
+    cache.store([(b"a", 1.0)])
+
+    now[0] = 59
+    assert cache.lookup([b"a", b"b"]) == [1.0, None]
+    now[0] = 61
+    assert cache.lookup([b"a"]) == [None]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RewardCache(maxsize=2)
+    cache.store([(b"a", 1.0), (b"b", 0.5)])
+    cache.lookup([b"a"])
+    cache.store([(b"c", 0.0)])
+
+    assert cache.lookup([b"a", b"b", b"c"]) == [1.0, None, 0.0]
+
+
+def test_keys_depend_on_model_parameters_reference_and_completion():
+    key = RewardCache.key("math", "[]", "42", "The final answer is 42")
+    assert key == RewardCache.key("math", "[]", "42", "The final answer is 42")
+    assert key != RewardCache.key("math", "[('x', 1)]", "42", "The final answer is 42")
+    assert key != RewardCache.key("math", "[]", "4", "2The final answer is 42")
+    assert key != RewardCache.key("streaming", "[]", "42", "The final answer is 42")
+
+
+def test_cached_rewards_are_not_scored_again():
+    cache = RewardCache()
+    model, scored = counting_model()
+    first = make_response_event(["The final answer is 42", "41", "The final answer is 42"])
+    second = make_response_event(["41", "The final answer is 7", "The final answer is 42"])
+
+    model.apply(REFERENCE, first, RewardModelTypeEnum.WEIGHTED_REWARD, cache=cache)
+    event = model.apply(REFERENCE, second, RewardModelTypeEnum.WEIGHTED_REWARD, cache=cache)
+
+    assert scored == ["The final answer is 42", "41", "The final answer is 7"]
+    expected = [AdvancedMathModel.math_score(REFERENCE, c) for c in second.completions]
+    assert torch.equal(event.rewards, torch.FloatTensor(expected))
+    assert event.extra_info["cache_hits"] == 2
+    assert event.extra_info["cache_misses"] == 1
+    assert event.timings[0] == 0 and event.timings[2] == 0
+
+
+def test_cache_is_keyed_on_the_reference():
+    cache = RewardCache()
+    model, scored = counting_model()
+    response_event = make_response_event(["The final answer is 42"])
+
+    model.apply("42", response_event, RewardModelTypeEnum.WEIGHTED_REWARD, cache=cache)
+    event = model.apply("7", response_event, RewardModelTypeEnum.WEIGHTED_REWARD, cache=cache)
+
+    assert len(scored) == 2
+    assert event.rewards.tolist() == [AdvancedMathModel.math_score("7", "The final answer is 42")]
+
+
+def test_failed_executor_jobs_are_not_cached():
+    cache = RewardCache()
+    model = AdvancedMathModel()
+    executor = SimpleNamespace(
+        map=lambda fn, args_list: [
+            ExecutorResult(timed_out=True) if "slow" in completion else ExecutorResult(value=fn(reference, completion))
+            for reference, completion in args_list
+        ]
+    )
+    response_event = make_response_event(["The final answer is 42", "slow"])
+
+    event = model.apply(REFERENCE, response_event, RewardModelTypeEnum.WEIGHTED_REWARD, executor=executor, cache=cache)
+    assert event.extra_info["timeouts"] == [False, True]
+    event = model.apply(REFERENCE, response_event, RewardModelTypeEnum.WEIGHTED_REWARD, executor=executor, cache=cache)
+
+    assert event.extra_info["cache_hits"] == 1
+    assert event.extra_info["timeouts"] == [None, True]
+
+
+def test_models_depending_on_the_responses_are_not_cached():
+    cache = RewardCache()
+    model = StreamingRewardModel(max_tokens_per_chunk=100)
+    response_event = make_response_event(["a"])
+    response_event.stream_results_all_tokens_per_chunk = [[1]]
+    response_event.stream_results_all_chunks_timings = [[0.1]]
+
+    event = model.apply("", response_event, RewardModelTypeEnum.PENALTY, cache=cache)
+
+    assert "cache_hits" not in event.extra_info
+    assert len(cache) == 0
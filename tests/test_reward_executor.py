@@ -0,0 +1,108 @@
+import os
+import time
+import torch
+import pytest
+from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
+from einstein.protocol import StreamCoreSynapse
+from einstein.rewards import AdvancedMathModel, RewardExecutor, RewardModelTypeEnum
+
+
+def score(reference: str, completion: str) -> float:
+    if completion == "hang":
+        time.sleep(60)
+    if completion == "crash":
+        os._exit(1)
+    if completion == "fail":
+        raise ValueError("Unparsable completion")
+    return float(reference == completion)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = RewardExecutor(max_workers=2, timeout=0.5, preload=())
+    yield executor
+    executor.close()
+
+
+def test_results_are_returned_in_order(executor):
+    results = executor.map(score, [("a", completion) for completion in ["a", "b", "a", "c", "a"]])
+    assert [result.value for result in results] == [1.0, 0.0, 1.0, 0.0, 1.0]
+    assert not any(result.timed_out or result.error for result in results)
+
+
+def test_hanging_completion_times_out_and_worker_is_replaced(executor):
+    t0 = time.time()
+    results = executor.map(score, [("a", "hang"), ("a", "a"), ("a", "fail"), ("a", "a")])
+    elapsed = time.time() - t0
+
+    assert [result.timed_out for result in results] == [True, False, False, False]
+    assert [result.value for result in results] == [0.0, 1.0, 0.0, 1.0]
+    assert results[2].error is not None
+    # The other completions are scored by the other worker while the first one hangs.
+    assert elapsed < 10
+
+    # The pool is still complete and usable.
+    assert len(executor.workers) == 2
+    assert [result.value for result in executor.map(score, [("a", "a")] * 4)] == [1.0] * 4
+
+
+def test_crashed_worker_is_replaced(executor):
+    results = executor.map(score, [("a", "crash"), ("a", "a")])
+
+    assert results[0].error is not None and not results[0].timed_out
+    assert results[1].value == 1.0
+    assert len(executor.workers) == 2 and all(worker.process.is_alive() for worker in executor.workers)
+    # Later jobs are not sent to the dead worker.
+    for _ in range(3):
+        assert [result.value for result in executor.map(score, [("a", "a")] * 4)] == [1.0] * 4
+
+
+def test_reward_model_runs_on_executor(executor):
+    model = AdvancedMathModel()
+    completions = ["The final answer is 42", "41", "nothing"]
+    response_event = DendriteResponseEvent(
+        [
+            SynapseStreamResult(synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion))
+            for completion in completions
+        ],
+        uids=torch.arange(len(completions)),
+        timeout=1,
+    )
+    event = model.apply("42", response_event, RewardModelTypeEnum.WEIGHTED_REWARD, executor=executor)
+    expected = model.reward("42", response_event)
+
+    assert torch.equal(event.rewards, expected.rewards)
+    assert event.extra_info == {"timeouts": [False] * 3, "errors": [False] * 3, "type": "math"}
+
+
+def test_timed_out_worker_is_swapped_for_a_started_spare():
+    # Importing einstein.rewards takes seconds, so waiting for a fresh worker would dominate the elapsed time.
+    executor = RewardExecutor(max_workers=1, timeout=0.5, preload=("einstein.rewards",))
+    try:
+        t0 = time.time()
+        while not executor.spares[0].poll_ready():
+            assert time.time() - t0 < 60
+            time.sleep(0.1)
+
+        t0 = time.time()
+        results = executor.map(score, [("a", "hang"), ("a", "a")])
+        elapsed = time.time() - t0
+
+        assert [result.timed_out for result in results] == [True, False]
+        assert results[1].value == 1.0
+        assert elapsed < 1.5
+        assert len(executor.workers) == 1 and len(executor.spares) == 1
+    finally:
+        executor.close()
+
+
+def test_jobs_fail_when_no_worker_is_alive():
+    executor = RewardExecutor(max_workers=1, timeout=0.5, preload=(), num_spares=0)
+    # The replacement of the crashed worker fails to start.
+    executor.preload = ("einstein.no_such_module",)
+    try:
+        results = executor.map(score, [("a", "crash"), ("a", "a")])
+        assert all(result.error is not None for result in results)
+        assert executor.workers == []
+    finally:
+        executor.close()
@@ -0,0 +1,268 @@
+import re
+import time
+import torch
+import random
+import pytest
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from einstein.dendrite import DendriteResponseEvent, SynapseStreamResult
+from einstein.protocol import StreamCoreSynapse
+from einstein.rewards import AdvancedMathModel, RewardEvent, RewardModelTypeEnum, RewardPipeline, RewardResult, StreamingRewardModel
+from einstein.rewards.advanced_math import BatchMathScorer, NUMERIC_PATTERN
+
+COMPLETIONS = [
+    "The answer is 42.",
+    "Let me think. 6 * 7 = 42. The final answer is 42",
+    "Step 1: 40 + 2\nTHE FINAL ANSWER IS: 41.5 and 3",
+    "the final answer is\n\n7",
+    "the final answer is\n12 and the final answer is 42",
+    "",
+    "no numbers here",
+]
+REFERENCE = "42"
+
+
+def chunked(text: str, size: int):
+    return [text[i : i + size] for i in range(0, len(text), size)] or [""]
+
+
+def stream_result(uid: int, chunks, completion: str, model: AdvancedMathModel, reference: str = REFERENCE):
+    scorer = model.incremental_scorer(reference)
+    for chunk in chunks:
+        scorer.update(chunk)
+    scorer.finalize(completion)
+    return SynapseStreamResult(
+        uid=uid,
+        accumulated_chunks=chunks,
+        accumulated_chunks_timings=[0.1] * len(chunks),
+        tokens_per_chunk=[1] * len(chunks),
+        synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion),
+        scorers={model.name: scorer},
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+@pytest.mark.parametrize("completion", COMPLETIONS)
+def test_incremental_score_matches_batch_score(completion, chunk_size):
+    model = AdvancedMathModel()
+    scorer = model.incremental_scorer(REFERENCE)
+    for chunk in chunked(completion, chunk_size):
+        scorer.update(chunk)
+
+    assert scorer.finalize(completion) == model.math_score(REFERENCE, completion)
+
+
+def test_final_completion_overrides_streamed_chunks():
+    model = AdvancedMathModel()
+    scorer = model.incremental_scorer(REFERENCE)
+    for chunk in chunked("The final answer is 42", 4):
+        scorer.update(chunk)
+
+    # A failed stream ends with an empty completion, whatever was streamed before.
+    assert scorer.finalize("") == model.math_score(REFERENCE, "") == 0
+
+
+def test_apply_uses_incremental_rewards():
+    model = AdvancedMathModel()
+    results = [
+        stream_result(uid, chunked(completion, 5), completion, model)
+        for uid, completion in enumerate(COMPLETIONS)
+    ]
+    response_event = DendriteResponseEvent(results, uids=torch.arange(len(results)), timeout=1)
+
+    event = model.apply(REFERENCE, response_event, RewardModelTypeEnum.WEIGHTED_REWARD)
+    expected = model.reward(REFERENCE, response_event)
+
+    assert event.extra_info == {"incremental": True, "type": "math"}
+    assert torch.equal(event.rewards, expected.rewards)
+
+
+def test_apply_falls_back_to_batch_scoring_on_reference_mismatch():
+    model = AdvancedMathModel()
+    results = [stream_result(0, ["The final answer is 42"], "The final answer is 42", model, reference="7")]
+    response_event = DendriteResponseEvent(results, uids=torch.arange(1), timeout=1)
+
+    event = model.apply(REFERENCE, response_event, RewardModelTypeEnum.WEIGHTED_REWARD)
+
+    assert event.extra_info == {"type": "math"}
+    assert event.rewards.tolist() == [1.0]
+
+
+def random_completion(rng: random.Random) -> str:
+    tokens = ["x", "=", "so", "1.2.3", "+-.5", "..", "-", "+.", "5.", "-.5", "\u0663", "1e3", "\n", "The final answer is"]
+    tokens += ["9" * rng.randint(1, 20), str(rng.uniform(-100, 100)), str(rng.randint(-100, 100)), "1" * 400 + ".5"]
+    return " ".join(rng.choices(tokens, k=rng.randint(0, 30)))
+
+
+def test_numeric_pattern_matches_original_pattern():
+    rng = random.Random(0)
+    original = re.compile(r"[-+]?\d*\.\d+|\d+")
+    for _ in range(2000):
+        text = "".join(rng.choices("-+.0123456789\u0663 ax", k=rng.randint(0, 40)))
+        assert NUMERIC_PATTERN.findall(text) == original.findall(text)
+
+
+@pytest.mark.parametrize("reference", ["42", "The answer is 42 and 3.5", "-0.5, 7, 12", "9" * 20, "no numbers", ""])
+def test_batch_scorer_matches_math_score(reference):
+    rng = random.Random(reference)
+    completions = [random_completion(rng) for _ in range(300)] + COMPLETIONS
+
+    expected = [AdvancedMathModel.math_score(reference, completion) for completion in completions]
+    assert BatchMathScorer(reference).score(completions) == expected
+
+
+def make_response_event(completions):
+    results = [
+        SynapseStreamResult(uid=uid, synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion=completion))
+        for uid, completion in enumerate(completions)
+    ]
+    return DendriteResponseEvent(results, uids=torch.arange(10, 10 + len(completions)), timeout=1)
+
+
+def test_unique_completion_index():
+    response_event = make_response_event(["a", "b", "a", "c", "b", "a"])
+
+    assert response_event.unique_completions == ["a", "b", "c"]
+    assert response_event.completion_inverse.tolist() == [0, 1, 0, 2, 1, 0]
+    assert response_event.has_duplicate_completions
+
+    unique_event = response_event.unique_completions_event()
+    assert unique_event.completions == ["a", "b", "c"]
+    assert unique_event.uids.tolist() == [10, 11, 13]
+    assert not unique_event.has_duplicate_completions
+
+
+def test_duplicate_completions_are_scored_once():
+    completions = ["The final answer is 42", "41", "The final answer is 42", "", "41", "The final answer is 42"]
+    response_event = make_response_event(completions)
+    model = AdvancedMathModel()
+    scored = []
+    reward = model.reward
+
+    def counting_reward(reference, response_event):
+        scored.extend(response_event.completions)
+        return reward(reference, response_event)
+
+    model.reward = counting_reward
+    event = model.apply(REFERENCE, response_event, RewardModelTypeEnum.WEIGHTED_REWARD)
+
+    assert scored == ["The final answer is 42", "41", ""]
+    assert torch.equal(event.rewards, torch.FloatTensor([AdvancedMathModel.math_score(REFERENCE, c) for c in completions]))
+    assert len(event.timings) == len(completions)
+    assert event.extra_info["unique_completions"] == 3
+
+
+def test_streaming_penalty_and_stream_statistics():
+    streams = [
+        # (tokens per chunk, chunk timings)
+        ([10, 20, 30], [0.5, 0.75, 1.5]),
+        ([250], [2.0]),
+        ([], []),
+        ([5, 201], [0.25, 0.5]),
+        (None, None),
+    ]
+    results = [
+        SynapseStreamResult(
+            uid=uid,
+            tokens_per_chunk=tokens,
+            accumulated_chunks_timings=timings,
+            synapse=StreamCoreSynapse(roles=["user"], messages=[""], completion="x"),
+        )
+        for uid, (tokens, timings) in enumerate(streams)
+    ]
+    response_event = DendriteResponseEvent(results, uids=torch.arange(len(results)), timeout=1)
+    model = StreamingRewardModel(max_tokens_per_chunk=200)
+
+    output = model.reward("", response_event)
+
+    assert output.rewards.tolist() == [0, 1, 0, 1, 0]
+    assert output.extra_info["time_to_first_token"] == [0.5, 2.0, None, 0.25, None]
+    assert output.extra_info["mean_inter_chunk_gap"] == [0.5, None, None, 0.25, None]
+    assert output.extra_info["max_inter_chunk_gap"] == [0.75, None, None, 0.25, None]
+
+
+def test_reward_pipeline_loads_streaming_penalty():
+    pipeline = RewardPipeline(selected_tasks=["math"], device="cpu")
+    assert isinstance(pipeline.get("streaming"), StreamingRewardModel)
+    assert pipeline.get("streaming").max_tokens_per_chunk == 200
+
+
+class SleepingModel(AdvancedMathModel):
+    """Math model whose batch takes a fixed time, standing in for a heavy reward model."""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__()
+        self._name = name
+        self.delay = delay
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def reward(self, reference, response_event):
+        time.sleep(self.delay)
+        return super().reward(reference, response_event)
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_reward_result_applies_models_concurrently(threads):
+    model_executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+    pipeline = RewardPipeline(selected_tasks=["math"], device="cpu", model_executor=model_executor)
+    pipeline.reward_models.update(
+        {name: SleepingModel(name, delay=0.2) for name in ["slow_a", "slow_b", "slow_c"]}
+    )
+    task = SimpleNamespace(
+        reference=REFERENCE,
+        reward_definition=[dict(name="slow_a", weight=0.5), dict(name="slow_b", weight=0.5)],
+        penalty_definition=[dict(name="slow_c", weight=0.1)],
+        global_penalty_definition=[],
+    )
+    agent = SimpleNamespace(task=task, challenge="What is 6 * 7?")
+    response_event = make_response_event(["The final answer is 42", "41"])
+
+    result = RewardResult(pipeline, agent=agent, response_event=response_event, device="cpu")
+
+    assert [event.model_name for event in result.reward_events] == ["slow_a", "slow_b"]
+    assert [event.model_name for event in result.penalty_events] == ["slow_c"]
+    assert result.critical_path_time >= 0.2
+    if threads > 1:
+        assert result.wall_time < 0.5
+    else:
+        assert result.wall_time >= 0.6
+    state = result.__state_dict__()
+    assert state["reward_wall_time"] == result.wall_time
+    assert state["reward_critical_path_time"] == result.critical_path_time
+
+
+def test_total_reward_matches_weighted_sum_and_penalty_product():
+    num_miners = 64
+    generator = torch.Generator().manual_seed(0)
+
+    def event(name, model_type):
+        rewards = torch.rand(num_miners, generator=generator)
+        return RewardEvent(
+            model_name=name,
+            rewards=rewards,
+            rewards_normalized=rewards,
+            timings=torch.zeros(num_miners),
+            model_type=model_type,
+            batch_time=0.0,
+            extra_info={},
+        )
+
+    result = RewardResult.__new__(RewardResult)
+    result.device = "cpu"
+    result.response_event = SimpleNamespace(uids=torch.arange(num_miners))
+    result.task_rewards = [dict(name="a", weight=0.7), dict(name="b", weight=0.3)]
+    result.task_penalties = [dict(name="p", weight=0.2), dict(name="q", weight=0.5)]
+    result.reward_events = [event("a", RewardModelTypeEnum.WEIGHTED_REWARD), event("b", RewardModelTypeEnum.WEIGHTED_REWARD)]
+    result.penalty_events = [event("p", RewardModelTypeEnum.PENALTY), event("q", RewardModelTypeEnum.PENALTY)]
+
+    a, b = (event.rewards for event in result.reward_events)
+    p, q = (event.rewards for event in result.penalty_events)
+    expected = (0.7 * a + 0.3 * b) * (1 - 0.2 * p) * (1 - 0.5 * q)
+
+    assert torch.allclose(result.total_reward(), expected)
+
+    result.penalty_events = []
+    assert torch.allclose(result.total_reward(), 0.7 * a + 0.3 * b)
@@ -0,0 +1,85 @@
+import torch
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from einstein.utils.sampler import LatencyAwareSampler
+from einstein.utils.uids import get_random_uids
+
+TIMEOUT = 10.0
+
+
+def response_event(uids, timings, status_codes):
+    return SimpleNamespace(uids=torch.tensor(uids), timings=timings, status_codes=status_codes)
+
+
+def simulate(sampler: LatencyAwareSampler, latencies: np.ndarray, steps: int, k: int, rng: np.random.Generator):
+    """Queries k miners per step, each responding after a noisy latency or timing out past the timeout."""
+    counts = np.zeros(len(latencies), dtype=int)
+    for _ in range(steps):
+        uids = sampler.sample(np.arange(len(latencies)), k)
+        timings = np.minimum(latencies[uids] * rng.uniform(0.8, 1.2, len(uids)), TIMEOUT)
+        status_codes = [408 if timing >= TIMEOUT else 200 for timing in timings]
+        sampler.update(response_event(uids.tolist(), timings.tolist(), status_codes))
+        counts[uids] += 1
+    return counts
+
+
+def test_statistics_track_latency_and_failure_rates():
+    sampler = LatencyAwareSampler(timeout=TIMEOUT, alpha=0.5)
+    sampler.update(response_event([0, 1, 2, 3], [1.0, 10.0, 0.5, 0.0], [200, 408, 204, 503]))
+    sampler.update(response_event([0, 1, 3], [3.0, 10.0, 2.0], [200, 408, 200]))
+
+    assert sampler.latency[0] == pytest.approx(2.0)
+    assert sampler.p95_latency()[0] > 2.0
+    assert sampler.timeout_rate.tolist() == [0, 1, 0, 0]
+    assert sampler.empty_rate.tolist() == [0, 0, 1, 0]
+    assert sampler.error_rate[3] == 0.5
+    # Failed requests do not count as response times.
+    assert sampler.latency[3] == 2.0
+    assert sampler.count.tolist() == [2, 2, 1, 2]
+
+
+def test_sampler_prefers_fast_miners_and_keeps_exploring():
+    rng = np.random.default_rng(0)
+    latencies = np.array([0.5] * 8 + [4.0] * 8 + [20.0] * 8)
+    sampler = LatencyAwareSampler(timeout=TIMEOUT, rng=rng)
+
+    counts = simulate(sampler, latencies, steps=300, k=4, rng=rng)
+
+    assert counts[:8].sum() > 0.8 * counts.sum()
+    assert counts[:8].sum() > 4 * counts[8:16].sum() > 0
+    # Every miner was tried, even the ones that always time out.
+    assert (counts > 0).all()
+    assert counts[16:].sum() < counts[8:16].sum()
+
+
+def test_untried_miners_are_explored_first():
+    sampler = LatencyAwareSampler(timeout=TIMEOUT, rng=np.random.default_rng(0))
+    sampler.update(response_event([0, 1], [0.1, 0.1], [200, 200]))
+
+    assert sorted(sampler.sample(np.arange(4), 2).tolist()) == [2, 3]
+
+
+def test_reset_forgets_replaced_miners():
+    sampler = LatencyAwareSampler(timeout=TIMEOUT)
+    sampler.update(response_event([0, 1], [10.0, 0.1], [408, 200]))
+    sampler.reset([0])
+
+    assert sampler.count[0] == 0 and sampler.timeout_rate[0] == 0
+
+
+def test_get_random_uids_uses_the_sampler_on_available_uids():
+    axons = [SimpleNamespace(coldkey=str(uid), ip=str(uid), is_serving=uid != 2) for uid in range(6)]
+    neuron = SimpleNamespace(
+        uid=5,
+        config=SimpleNamespace(
+            neuron=SimpleNamespace(vpermit_tao_limit=1000, query_unique_coldkeys=False, query_unique_ips=False)
+        ),
+        metagraph=SimpleNamespace(
+            axons=axons, validator_permit=torch.zeros(6, dtype=torch.bool), S=torch.zeros(6), n=torch.tensor(6)
+        ),
+    )
+    sampler = LatencyAwareSampler(timeout=TIMEOUT, exploration=0.0)
+    sampler.update(response_event([0, 1, 3, 4], [9.0, 0.2, 0.1, 5.0], [200, 200, 200, 200]))
+
+    assert get_random_uids(neuron, 2, exclude=[3], sampler=sampler).tolist() == [1, 4]
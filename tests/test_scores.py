@@ -0,0 +1,52 @@
+import torch
+import pytest
+from einstein.utils.scores import MovingAverageScores
+
+ALPHA = 0.05
+DECAY = 0.001
+
+
+def dense_update(scores: torch.FloatTensor, rewards: torch.FloatTensor, uids: torch.LongTensor) -> torch.FloatTensor:
+    """The dense update of every uid that MovingAverageScores replaces."""
+    step_rewards = scores.scatter(0, uids, rewards)
+    scores = ALPHA * step_rewards + (1 - ALPHA) * scores
+    return (scores - DECAY).clamp(min=0)
+
+
+@pytest.mark.parametrize("n, k", [(16, 4), (256, 50), (4096, 50)])
+def test_sparse_update_matches_dense_update(n, k):
+    generator = torch.Generator().manual_seed(n)
+    initial = torch.rand(n, generator=generator) * 0.1
+    dense = initial.clone()
+    sparse = MovingAverageScores(initial.clone(), alpha=ALPHA, decay=DECAY)
+
+    for step in range(200):
+        uids = torch.randperm(n, generator=generator)[:k]
+        rewards = torch.rand(k, generator=generator)
+        dense = dense_update(dense, rewards, uids)
+        sparse.update(rewards, uids)
+        if step % 50 == 0:
+            assert torch.allclose(sparse.materialize(), dense, atol=1e-5)
+
+    assert torch.allclose(sparse.materialize(), dense, atol=1e-5)
+
+
+def test_pending_decay_is_applied_once():
+    scores = MovingAverageScores(torch.tensor([0.5, 0.0015, 0.0]), alpha=ALPHA, decay=DECAY)
+    for _ in range(3):
+        scores.update(torch.tensor([1.0]), [2])
+
+    # Reading twice does not decay twice.
+    assert torch.allclose(scores.materialize(), torch.tensor([0.497, 0.0, scores.values[2].item()]))
+    assert torch.allclose(scores.materialize()[:2], torch.tensor([0.497, 0.0]))
+
+
+def test_reset_and_in_place_changes_are_kept():
+    scores = MovingAverageScores(torch.zeros(2), alpha=ALPHA, decay=DECAY)
+    scores.update(torch.tensor([1.0, 1.0]), [0, 1])
+
+    scores.materialize()[0] = 0
+    scores.reset(torch.cat([scores.materialize(), torch.ones(1)]))
+    scores.update(torch.tensor([0.0]), [1])
+
+    assert scores.materialize().tolist() == pytest.approx([0.0, (ALPHA - DECAY) * (1 - ALPHA) - DECAY, 1 - DECAY])
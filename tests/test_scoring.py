@@ -1,6 +1,6 @@
-# import pytest
+import pytest
 # from datetime import datetime
-# from einstein.rewards import RewardPipeline, AdvancedMathModel
+from einstein.rewards import AdvancedMathModel
 
 # date1 = datetime.strptime('2022-01-01','%Y-%m-%d')
 # date2 = datetime.strptime('2022-01-03','%Y-%m-%d')
@@ -18,14 +18,14 @@
 # scores4 = [0.38251018447178037]*len(dates4)
 # tuples = list( zip(dates1+dates2+dates3+dates4, scores1+scores2+scores3+scores4) )
 
-# completion = ['0.5', '1/2', '1-0.5', '2*0.25']
-# expected_result = [1.0, 1.0, 1.0, 1.0]
-# reference = ['0.5']*len(completion)
-# @pytest.mark.parametrize('reference', reference)
-# @pytest.mark.parametrize('completion, expected_result', zip(completion, expected_result))
-# def test_math_score_expression_parsing(reference, completion, expected_result):
-#     score = AdvancedMathModel().math_score(reference, completion)
-#     assert score == expected_result
+completion = ['0.5', '1/2', '1-0.5', '2*0.25']
+expected_result = [1.0, 1.0, 1.0, 1.0]
+reference = ['0.5']*len(completion)
+@pytest.mark.parametrize('reference', reference)
+@pytest.mark.parametrize('completion, expected_result', zip(completion, expected_result))
+def test_math_score_expression_parsing(reference, completion, expected_result):
+    score = AdvancedMathModel().math_score(reference, completion)
+    assert score == expected_result
 
 # completion = ['1e3', '-1e3', '1e-3', '-1e-3']
 # expected_result = [1.0, 0.0, 0.0, 0.0]
@@ -0,0 +1,40 @@
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+from transformers import PreTrainedTokenizerFast
+from einstein.utils.tokens import count_tokens
+
+CHUNKS = ["The final ", "answer is", " 42.", "", "  \\frac{1}{2} ", "é😀"]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    backend = Tokenizer(models.BPE(unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel()
+    backend.train_from_iterator(CHUNKS * 10, trainers.BpeTrainer(vocab_size=300, special_tokens=["[UNK]"]))
+    return PreTrainedTokenizerFast(tokenizer_object=backend)
+
+
+def test_exact_mode_matches_per_chunk_tokenize(tokenizer):
+    assert count_tokens(tokenizer, CHUNKS) == [len(tokenizer.tokenize(chunk)) for chunk in CHUNKS]
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [("whitespace", [3, 3, 2, 0, 2, 2]), ("bytes", [3, 3, 1, 0, 4, 2])],
+)
+def test_approximate_modes(mode, expected):
+    assert count_tokens(None, CHUNKS, mode=mode) == expected
+
+
+@pytest.mark.parametrize("mode", ["whitespace", "bytes"])
+def test_approximate_modes_estimate_tokens(tokenizer, mode):
+    # The streaming penalty threshold of 200 tokens separates the same chunks in every mode.
+    words = "the final answer is 42 so we substitute x into the equation".split()
+    chunks = [" ".join(words[i % len(words)] for i in range(n)) for n in (20, 100, 300, 1000)]
+    assert [count > 200 for count in count_tokens(tokenizer, chunks, mode=mode)] == [False, False, True, True]
+
+
+def test_empty_stream_and_unknown_mode():
+    assert count_tokens(None, []) == []
+    with pytest.raises(ValueError):
+        count_tokens(None, CHUNKS, mode="characters")
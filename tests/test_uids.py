@@ -1,8 +1,20 @@
 
+import copy
 import torch
+import random
 import pytest
+import threading
 from types import SimpleNamespace
-from einstein.utils.uids import get_random_uids
+from einstein.base.validator import BaseValidatorNeuron
+from einstein.utils.sampler import LatencyAwareSampler
+from einstein.utils.scores import MovingAverageScores
+from einstein.utils.uids import (
+    build_uid_index,
+    changed_uids,
+    check_uid_availability,
+    get_random_uids,
+    metagraph_fingerprint,
+)
 
 
 def make_mock_neuron(unique_coldkeys=False, unique_ips=False, vpermit_tao_limit=1000):
@@ -46,3 +58,147 @@ def test_get_random_uids(unique_coldkeys, unique_ips, k, expected_result):
 
     assert sorted(get_random_uids(mock_neuron, k).tolist()) == expected_result, "Incorrect uids returned."
 
+
+
+def make_random_neuron(rng: random.Random, n: int, unique_coldkeys: bool, unique_ips: bool):
+    axons = [
+        SimpleNamespace(
+            coldkey=rng.choice("abcdefgh"), ip=f"0.0.0.{rng.randint(0, 8)}", is_serving=rng.random() < 0.9
+        )
+        for _ in range(n)
+    ]
+    metagraph = SimpleNamespace(
+        axons=axons,
+        validator_permit=torch.tensor([rng.random() < 0.2 for _ in range(n)]),
+        S=torch.tensor([rng.choice([0.0, 500.0, 5000.0]) for _ in range(n)]),
+        n=torch.tensor(n),
+    )
+    neuron = make_mock_neuron(unique_coldkeys, unique_ips)
+    neuron.uid = rng.randrange(n)
+    neuron.metagraph = metagraph
+    return neuron
+
+
+def available_uids_one_by_one(neuron) -> list:
+    """The uids selected by checking each uid in turn."""
+    uids, coldkeys, ips = [], set(), set()
+    for uid in range(neuron.metagraph.n.item()):
+        if uid == neuron.uid:
+            continue
+        if not check_uid_availability(neuron.metagraph, uid, neuron.config.neuron.vpermit_tao_limit, coldkeys, ips):
+            continue
+        if neuron.config.neuron.query_unique_coldkeys:
+            coldkeys.add(neuron.metagraph.axons[uid].coldkey)
+        if neuron.config.neuron.query_unique_ips:
+            ips.add(neuron.metagraph.axons[uid].ip)
+        uids.append(uid)
+    return uids
+
+
+@pytest.mark.parametrize("unique_coldkeys, unique_ips", [(False, False), (True, False), (False, True), (True, True)])
+def test_uid_index_matches_availability_checks(unique_coldkeys, unique_ips):
+    rng = random.Random(0)
+    for _ in range(50):
+        neuron = make_random_neuron(rng, rng.randint(1, 64), unique_coldkeys, unique_ips)
+        assert build_uid_index(neuron).uids.tolist() == available_uids_one_by_one(neuron)
+
+
+def test_uid_index_samples_distinct_uids_without_excluded_ones():
+    neuron = make_random_neuron(random.Random(1), 256, False, False)
+    neuron.uid_index = build_uid_index(neuron)
+    available = set(neuron.uid_index.uids.tolist())
+    exclude = sorted(available)[:10]
+
+    for _ in range(20):
+        uids = get_random_uids(neuron, 16, exclude=exclude).tolist()
+        assert len(set(uids)) == 16
+        assert set(uids) <= available - set(exclude)
+
+
+def test_avoided_uids_are_only_sampled_to_top_up():
+    neuron = make_mock_neuron()
+    neuron.uid_index = build_uid_index(neuron)
+
+    for _ in range(20):
+        assert sorted(get_random_uids(neuron, k=2, avoid=[0, 1]).tolist()) == [2, 3]
+        uids = get_random_uids(neuron, k=3, avoid=[0, 1]).tolist()
+        assert len(set(uids)) == 3 and {2, 3} <= set(uids)
+    assert sorted(get_random_uids(neuron, k=4, exclude=[3], avoid=[0, 1, 2]).tolist()) == [0, 1, 2]
+
+
+def test_uid_index_raises_without_available_uids():
+    neuron = make_mock_neuron()
+    for axon in neuron.metagraph.axons:
+        axon.is_serving = False
+
+    with pytest.raises(ValueError):
+        get_random_uids(neuron, 2)
+
+
+def make_axons(n: int):
+    return [
+        SimpleNamespace(hotkey=f"hotkey-{uid}", coldkey=f"coldkey-{uid}", ip=f"0.0.0.{uid}", port=8091, is_serving=True)
+        for uid in range(n)
+    ]
+
+
+def test_fingerprint_diff_matches_axon_comparison():
+    rng = random.Random(0)
+    for _ in range(200):
+        axons = make_axons(rng.randint(0, 16))
+        new_axons = copy.deepcopy(axons) + make_axons(rng.randint(0, 2))
+        for axon in rng.sample(new_axons, k=rng.randint(0, len(new_axons))):
+            attribute = rng.choice(["hotkey", "coldkey", "ip", "port"])
+            setattr(axon, attribute, rng.choice(["x", "y", 8092, getattr(axon, attribute)]))
+
+        changed, replaced = changed_uids(
+            metagraph_fingerprint([axon.hotkey for axon in axons], axons),
+            metagraph_fingerprint([axon.hotkey for axon in new_axons], new_axons),
+        )
+        expected = [uid for uid, axon in enumerate(new_axons) if uid >= len(axons) or vars(axon) != vars(axons[uid])]
+        assert changed.tolist() == expected
+        assert replaced.tolist() == [uid for uid in expected if uid < len(axons) and new_axons[uid].hotkey != axons[uid].hotkey]
+
+
+def test_resync_only_resets_changed_uids():
+    axons = make_axons(4)
+    neuron = make_mock_neuron()
+    neuron.metagraph = SimpleNamespace(
+        axons=axons,
+        hotkeys=[axon.hotkey for axon in axons],
+        validator_permit=torch.zeros(4, dtype=torch.bool),
+        S=torch.zeros(4),
+        n=torch.tensor(4),
+    )
+    neuron.uid = 0
+    neuron.subtensor = None
+    neuron.scores_lock = threading.RLock()
+    neuron.moving_average = MovingAverageScores(torch.full((4,), 0.5), alpha=0.1, decay=0.0)
+    neuron.miner_sampler = LatencyAwareSampler(timeout=10)
+    neuron.miner_sampler.update(SimpleNamespace(uids=torch.arange(4), timings=[1.0] * 4, status_codes=[200] * 4))
+    neuron.hotkeys = list(neuron.metagraph.hotkeys)
+    neuron.metagraph_fingerprint = metagraph_fingerprint(neuron.hotkeys, axons)
+
+    def sync(subtensor):
+        # Uid 1 moves to another ip, uid 2 is taken by a new hotkey and uid 4 registers.
+        axons[1].ip = "1.1.1.1"
+        axons[2].hotkey = "new-hotkey"
+        axons.append(make_axons(5)[4])
+        neuron.metagraph.hotkeys = [axon.hotkey for axon in axons]
+        neuron.metagraph.validator_permit = torch.zeros(5, dtype=torch.bool)
+        neuron.metagraph.S = torch.zeros(5)
+        neuron.metagraph.n = torch.tensor(5)
+
+    neuron.metagraph.sync = sync
+    BaseValidatorNeuron.resync_metagraph(neuron)
+
+    assert neuron.moving_average.materialize().tolist() == [0.5, 0.5, 0.0, 0.5, 0.0]
+    assert neuron.miner_sampler.count.tolist() == [1, 1, 0, 1]
+    assert neuron.hotkeys == neuron.metagraph.hotkeys
+    assert neuron.uid_index.uids.tolist() == [1, 2, 3, 4]
+
+    # A sync without changes leaves the state as is.
+    neuron.metagraph.sync = lambda subtensor: None
+    neuron.moving_average.update(torch.tensor([1.0]), [2])
+    BaseValidatorNeuron.resync_metagraph(neuron)
+    assert neuron.moving_average.materialize()[2].item() == pytest.approx(0.1)